@@ -0,0 +1,52 @@
+"""
+Benchmark: scene change scoring on full-resolution vs. downscaled analysis frames
+
+Writes synthetic 720p and 1080p videos, runs the sampled scene analysis once on
+full-size frames and once at ANALYSIS_WIDTH, and prints the per-frame decode and
+feature times reported in the scan plan plus the chosen cut timestamps.
+
+Usage:
+    python benchmarks/analysis_resolution.py [--sizes 1280x720 1920x1080] [--width 160] [--metric correl]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+from frame_extractor import FrameExtractor
+from scene_features import ANALYSIS_WIDTH, CHANGE_METRIC, CHANGE_METRICS
+from synthetic_media import write_synthetic_video
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['1280x720', '1920x1080'])
+    parser.add_argument('--width', type=int, default=ANALYSIS_WIDTH, help='Analysis width')
+    parser.add_argument('--duration', type=float, default=20, help='Video length in seconds')
+    parser.add_argument('--mode', default='sampled', choices=['sampled', 'keyframes'])
+    parser.add_argument('--metric', default=CHANGE_METRIC, choices=CHANGE_METRICS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            width, height = (int(v) for v in size.split('x'))
+            path = os.path.join(tmp, f'{size}.mp4')
+            write_synthetic_video(path, [args.duration / 4] * 4, fps=30, width=width, height=height)
+
+            print(f"\n{size}, {args.mode} analysis, {args.metric}")
+            print(f"{'analysis size':>14} {'frames':>7} {'decode ms':>10} {'feature ms':>11}  cuts")
+            for analysis_width in (width, args.width):
+                extractor = FrameExtractor(tmp, analysis_width=analysis_width, change_metric=args.metric)
+                analysis = extractor.analyze_scene_changes(path, 3, args.mode)
+                scan = analysis['scan']
+                cuts = ', '.join(f"{s['timestamp']:.1f}" for s in analysis['scenes'])
+                print(f"{'x'.join(map(str, scan['analysis_size'])):>14} {scan['frames_analyzed']:>7} "
+                      f"{scan['decode_ms_per_frame']:>10.2f} {scan['feature_ms_per_frame']:>11.2f}  {cuts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: OpenCV, PyAV and ffmpeg-pipe decoding per container and codec
+
+Writes a synthetic video, transcodes it into every (container, codec) pair
+with ffmpeg and prints, per backend: open + metadata time, the reported frame
+count against the real one, time per frame for grabbing (decode only) and for
+reading (decode + BGR conversion) in order, time per random seek + read, and
+whether seeks land on the exact frame. The fastest
+backends go first in decoders.BACKEND_PREFERENCE.
+
+Usage:
+    python benchmarks/decoder_backends.py [--duration 20] [--size 640x360] [--seeks 20]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+from decoders import DECODER_BACKENDS, is_backend_available, open_decoder
+from synthetic_media import write_synthetic_video
+
+# (container, codec, ffmpeg encoder arguments)
+FORMATS = [
+    ('mp4', 'mpeg4', ['-c:v', 'mpeg4', '-q:v', '4']),
+    ('mp4', 'h264', ['-c:v', 'libx264', '-preset', 'veryfast', '-g', '60']),
+    ('webm', 'vp9', ['-c:v', 'libvpx-vp9', '-deadline', 'realtime', '-cpu-used', '8', '-b:v', '1M', '-g', '60']),
+    ('webm', 'vp8', ['-c:v', 'libvpx', '-deadline', 'realtime', '-cpu-used', '8', '-b:v', '1M', '-g', '60']),
+    ('mkv', 'h264', ['-c:v', 'libx264', '-preset', 'veryfast', '-g', '60']),
+]
+
+
+def measure(path, backend, reference, seeks):
+    start = time.perf_counter()
+    cap = open_decoder(path, backend)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    open_ms = (time.perf_counter() - start) * 1000
+    if not cap.isOpened():
+        return None
+
+    # Linear scans grab every frame but retrieve only the samples
+    start = time.perf_counter()
+    decoded = 0
+    while cap.grab():
+        decoded += 1
+    grab_ms = (time.perf_counter() - start) * 1000 / max(decoded, 1)
+
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    start = time.perf_counter()
+    decoded = 0
+    while cap.grab():
+        cap.retrieve()
+        decoded += 1
+    sequential_ms = (time.perf_counter() - start) * 1000 / max(decoded, 1)
+
+    exact = 0
+    start = time.perf_counter()
+    for frame_idx in seeks:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        ret, frame = cap.read()
+        if ret and np.abs(frame.astype(np.int16) - reference[frame_idx]).mean() < 1:
+            exact += 1
+    seek_ms = (time.perf_counter() - start) * 1000 / len(seeks)
+    cap.release()
+    return open_ms, frame_count, grab_ms, sequential_ms, seek_ms, exact
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=20, help='Video length in seconds')
+    parser.add_argument('--size', default='640x360')
+    parser.add_argument('--seeks', type=int, default=20, help='Random seeks per backend')
+    args = parser.parse_args()
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        sys.exit("ffmpeg is needed to write the test formats")
+
+    width, height = (int(v) for v in args.size.split('x'))
+    backends = [backend for backend in DECODER_BACKENDS if is_backend_available(backend)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_synthetic_video(os.path.join(tmp, 'source.mp4'), [args.duration / 4] * 4,
+                                       fps=30, width=width, height=height)
+        rng = np.random.default_rng(0)
+
+        print(f"{args.size}, {args.duration:.0f}s at 30 fps, {args.seeks} random seeks")
+        print(f"{'format':<12} {'backend':<8} {'open ms':>8} {'frames':>7} {'grab ms':>8} {'read ms':>8} {'seek ms':>8} {'exact':>6}")
+        for container, codec, encoder in FORMATS:
+            path = os.path.join(tmp, f'{codec}.{container}')
+            result = subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-i', source['path'], '-an', *encoder, path])
+            if result.returncode != 0:
+                print(f"{container}/{codec}: encoder not available")
+                continue
+
+            # Ground truth: every frame, decoded in order by PyAV or OpenCV
+            cap = open_decoder(path, 'pyav' if is_backend_available('pyav') else 'opencv')
+            reference = []
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                reference.append(frame.astype(np.int16))
+            cap.release()
+            seeks = rng.integers(0, len(reference), args.seeks)
+
+            for backend in backends:
+                row = measure(path, backend, reference, seeks)
+                label = f"{container}/{codec}"
+                if row is None:
+                    print(f"{label:<12} {backend:<8} cannot open")
+                    continue
+                open_ms, frame_count, grab_ms, sequential_ms, seek_ms, exact = row
+                print(f"{label:<12} {backend:<8} {open_ms:>8.1f} {frame_count:>3}/{len(reference):<3} "
+                      f"{grab_ms:>8.2f} {sequential_ms:>8.2f} {seek_ms:>8.1f} {exact:>3}/{len(seeks)}")
+
+
+if __name__ == '__main__':
+    main()
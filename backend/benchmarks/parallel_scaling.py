@@ -0,0 +1,68 @@
+"""
+Benchmark: segment-sharded scene analysis with 1 to 8 worker processes
+
+Writes a synthetic video, samples it the way the scene analysis does and
+prints the wall time of the histogram stage per worker count next to the
+speedup over the in-process sequential scan. Worker pools are warmed up first,
+so process start-up is not counted.
+
+Usage:
+    python benchmarks/parallel_scaling.py [--workers 1 2 4 8] [--duration 600] [--samples 400]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+from frame_scanner import FrameScanner
+from parallel_analysis import ParallelAnalyzer, analyze_segment
+from scene_features import CHANGE_METRIC, analysis_size
+from synthetic_media import write_synthetic_video
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=600, help='Video length in seconds')
+    parser.add_argument('--samples', type=int, default=400, help='Sampled frames')
+    parser.add_argument('--size', default='640x360')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split('x'))
+    size = analysis_size(width, height)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'long.mp4')
+        video = write_synthetic_video(path, [args.duration / 8] * 8, fps=30, width=width, height=height)
+        interval = max(1, video['total_frames'] // args.samples)
+        indices = list(range(0, video['total_frames'], interval))
+        strategy = FrameScanner().choose_strategy(interval, FrameScanner().probe_gop(path))
+
+        print(f"{args.size}, {video['total_frames']} frames, {len(indices)} samples every {interval} frames "
+              f"({strategy} scan), {os.cpu_count()} CPUs")
+
+        start = time.perf_counter()
+        analyze_segment(path, indices, size[0], size[1], CHANGE_METRIC, strategy)
+        sequential = time.perf_counter() - start
+        print(f"{'workers':>7} {'segments':>8} {'wall ms':>9} {'speedup':>8}")
+        print(f"{'-':>7} {1:>8} {sequential * 1000:>9.0f} {1.0:>8.2f}")
+
+        for workers in args.workers:
+            analyzer = ParallelAnalyzer(workers=workers)
+            try:
+                analyzer.analyze(path, indices[:workers], size, CHANGE_METRIC, strategy)  # start the processes
+                start = time.perf_counter()
+                result = analyzer.analyze(path, indices, size, CHANGE_METRIC, strategy)
+                elapsed = time.perf_counter() - start
+            finally:
+                analyzer.shutdown()
+            print(f"{workers:>7} {result['segments']:>8} {elapsed * 1000:>9.0f} {sequential / elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
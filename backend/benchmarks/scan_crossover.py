@@ -0,0 +1,72 @@
+"""
+Benchmark: linear grab() scan vs. seek per sample for sampled frame reads
+
+Writes synthetic 640x360 videos with different keyframe intervals, reads every
+Nth frame both ways and prints the timings next to the strategy FrameScanner
+would choose. The measured crossover is what SEEK_OVERHEAD_FRAMES is fitted to.
+
+Usage:
+    python benchmarks/scan_crossover.py [--gops 12 60 250] [--intervals 2 4 8 16 32 64 128 256]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+from frame_scanner import FrameScanner
+from synthetic_media import write_synthetic_video
+
+
+def time_scan(scanner: FrameScanner, path: str, frame_indices, strategy: str) -> float:
+    cap = cv2.VideoCapture(path)
+    start = time.perf_counter()
+    for _ in scanner.scan(cap, frame_indices, strategy):
+        pass
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gops', type=int, nargs='+', default=[12, 60, 250])
+    parser.add_argument('--intervals', type=int, nargs='+', default=[2, 4, 8, 16, 32, 64, 128, 256])
+    parser.add_argument('--duration', type=float, default=60, help='Video length in seconds')
+    args = parser.parse_args()
+
+    scanner = FrameScanner()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for gop in args.gops:
+            path = os.path.join(tmp, f'gop{gop}.mp4')
+            video = write_synthetic_video(path, [args.duration / 3] * 3, fps=30, width=640, height=360, gop=gop)
+            probed = scanner.probe_gop(path)
+
+            print(f"\nGOP {gop} (probed: {probed}), {video['total_frames']} frames")
+            print(f"{'interval':>8} {'samples':>8} {'linear ms':>10} {'seek ms':>10} {'faster':>7} {'chosen':>7}")
+
+            crossover = None
+            for interval in args.intervals:
+                frame_indices = list(range(0, video['total_frames'], interval))
+                linear = time_scan(scanner, path, frame_indices, 'linear')
+                seek = time_scan(scanner, path, frame_indices, 'seek')
+                faster = 'linear' if linear <= seek else 'seek'
+                chosen = scanner.choose_strategy(interval, probed)
+                if faster == 'seek' and crossover is None:
+                    crossover = interval
+                print(f"{interval:>8} {len(frame_indices):>8} {linear * 1000:>10.1f} {seek * 1000:>10.1f} "
+                      f"{faster:>7} {chosen:>7}")
+
+            model = probed / 2 + scanner.seek_overhead if probed else None
+            print(f"Measured crossover: seek wins from interval {crossover}; model switches above {model}")
+
+
+if __name__ == '__main__':
+    main()
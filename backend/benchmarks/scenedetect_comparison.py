@@ -0,0 +1,94 @@
+"""
+Benchmark: PySceneDetect's AdaptiveDetector against the built-in histogram analysis
+
+Writes synthetic videos with scenes of random length, asks every configuration
+for as many scene changes as the video has cuts and prints the analysis
+latency next to the cut recall: the share of true cuts with a selected frame
+within --tolerance frames (exact) and within half a second (near).
+
+Usage:
+    python benchmarks/scenedetect_comparison.py [--videos 3] [--duration 60] [--size 640x360] [--tolerance 2]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
+
+import frame_extractor as frame_extractor_module
+from frameVideo import AdaptiveSceneDetector
+from frame_extractor import FrameExtractor
+from synthetic_media import write_synthetic_video
+
+# (label, analysis mode, PySceneDetect downscale, PySceneDetect frame skip)
+CONFIGURATIONS = [
+    ('histogram sampled', 'sampled', None, None),
+    ('histogram adaptive', 'adaptive', None, None),
+    ('scenedetect full', 'scenedetect', 1, 0),
+    ('scenedetect auto', 'scenedetect', 0, 0),
+    ('scenedetect auto skip 1', 'scenedetect', 0, 1),
+    ('scenedetect auto skip 2', 'scenedetect', 0, 2),
+    ('scenedetect /4 skip 2', 'scenedetect', 4, 2),
+]
+
+
+def recall(cuts, timestamps, tolerance):
+    """Share of cuts with a selected timestamp within tolerance seconds"""
+    if not cuts:
+        return 1.0
+    return sum(any(abs(t - cut) <= tolerance for t in timestamps) for cut in cuts) / len(cuts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=3)
+    parser.add_argument('--duration', type=float, default=60, help='Video length in seconds')
+    parser.add_argument('--size', default='640x360')
+    parser.add_argument('--tolerance', type=int, default=2, help='Exact recall tolerance in frames')
+    args = parser.parse_args()
+
+    if not AdaptiveSceneDetector().is_available():
+        sys.exit("PySceneDetect is not installed (pip install scenedetect)")
+
+    width, height = (int(v) for v in args.size.split('x'))
+    fps = 30
+    rng = np.random.default_rng(0)
+    totals = {label: [0.0, 0.0, 0.0] for label, *_ in CONFIGURATIONS}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.videos):
+            durations = []
+            while sum(durations) < args.duration:
+                durations.append(float(rng.uniform(2, 10)))
+            path = os.path.join(tmp, f'video_{i}.mp4')
+            video = write_synthetic_video(path, durations, fps=fps, width=width, height=height)
+            cuts = video['cuts']
+
+            for label, mode, downscale, frame_skip in CONFIGURATIONS:
+                if mode == 'scenedetect':
+                    frame_extractor_module.adaptive_scene_detector = AdaptiveSceneDetector(downscale, frame_skip)
+                extractor = FrameExtractor(tmp)
+                start = time.perf_counter()
+                analysis = extractor.analyze_scene_changes(path, len(cuts), mode)
+                elapsed = time.perf_counter() - start
+
+                timestamps = [s['timestamp'] for s in analysis['scenes']]
+                totals[label][0] += elapsed
+                totals[label][1] += recall(cuts, timestamps, args.tolerance / fps)
+                totals[label][2] += recall(cuts, timestamps, 0.5)
+
+    print(f"\n{args.videos} videos, {args.size}, {args.duration:.0f}s, {fps} fps")
+    print(f"{'configuration':<24} {'ms':>8} {'exact recall':>13} {'near recall':>12}")
+    for label, (elapsed, exact, near) in totals.items():
+        print(f"{label:<24} {elapsed * 1000 / args.videos:>8.0f} "
+              f"{exact / args.videos:>13.2f} {near / args.videos:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# Service modules are imported by name, the same way the routers do it
+sys.path.append(os.path.join(os.path.dirname(__file__), 'services'))
+
+from synthetic_media import serve_directory, write_synthetic_video
+
+
+@pytest.fixture
+def scene_video(tmp_path):
+    """Short 4-scene video with cuts at 3s, 6s and 9s"""
+    return write_synthetic_video(str(tmp_path / 'scenes.mp4'), [3, 3, 3, 3], fps=30)
+
+
+@pytest.fixture
+def frame_output_dir(tmp_path):
+    output_dir = tmp_path / 'frames'
+    output_dir.mkdir()
+    return str(output_dir)
+
+
+@pytest.fixture
+def media_server(scene_video):
+    """Serves scene_video over HTTP with Range support; yields (video_url, server)"""
+    directory, file_name = os.path.split(scene_video['path'])
+    with serve_directory(directory) as (base_url, server):
+        yield f"{base_url}/{file_name}", server
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
+import re
 import sys
 from pathlib import Path
 
@@ -9,6 +10,13 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'routers'))
 
 from routers.frame import router as frame_router
+from metrics import render_metrics
+from structured_log import get_logger, request_context
+
+log = get_logger('app')
+
+# Client-supplied correlation IDs are kept only when they are safe to log
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
 
 # Create FastAPI app
 app = FastAPI(
@@ -33,6 +41,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tag every log record of a request with its correlation ID
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """
+    Use the client's X-Request-ID (or a new ID) for the request and echo it back
+    """
+    request_id = request.headers.get("X-Request-ID")
+    if request_id and not REQUEST_ID_PATTERN.match(request_id):
+        request_id = None
+    with request_context(request_id) as request_id:
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Register routers
 app.include_router(frame_router)
 
@@ -51,7 +73,8 @@ async def root():
             "frame_extraction": "/frame/extract-from-youtube",
             "frame_download": "/frame/download/{file_name}",
             "system_info": "/frame/info",
-            "health": "/frame/health"
+            "health": "/frame/health",
+            "metrics": "/metrics"
         },
         "github": "https://github.com/yourrepo/promptsnap",
         "frontend": "http://localhost:3000"
@@ -108,12 +131,21 @@ async def health_check():
             }
         )
 
+# Metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Stage latency histograms and download/cache counters in Prometheus text format
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """
     Global exception handler
     """
+    log.error("Unhandled exception", path=request.url.path, error=str(exc), exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={
@@ -129,14 +161,10 @@ async def startup_event():
     """
     Function executed when server starts
     """
-    print("🚀 PromptSnap API server has started!")
-    print("📖 API Documentation: http://localhost:8000/docs")
-    print("🔗 Frontend: http://localhost:3000")
-    
     # Create required directories
     os.makedirs("temp", exist_ok=True)
     os.makedirs("temp/extracted_frames", exist_ok=True)
-    print("📁 Temporary directories ready")
+    log.info("PromptSnap API server has started", docs="http://localhost:8000/docs", frontend="http://localhost:3000")
 
 # Shutdown event
 @app.on_event("shutdown")
@@ -144,7 +172,7 @@ async def shutdown_event():
     """
     Function executed when server shuts down
     """
-    print("👋 PromptSnap API server is shutting down.")
+    log.info("PromptSnap API server is shutting down")
 
 if __name__ == "__main__":
     import uvicorn
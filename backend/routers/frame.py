@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl
 from typing import List, Optional, Dict
 import os
 import sys
+import json
 import asyncio
 from pathlib import Path
 
@@ -11,16 +12,42 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
 
 from youtube_downloader import download_youtube_video, youtube_downloader, validate_youtube_url
-from frame_extractor import extract_video_frames, frame_extractor
+from frame_extractor import (
+    extract_video_frames, extract_clip_frames, plan_video_frames, plan_storyboard_frames,
+    extract_timestamp_frames, frame_extractor
+)
+from storyboard import has_storyboard
+from executor import extraction_executor
+from single_flight import SingleFlight
+from admission import AdmissionRejected, admission_controller
+from job_queue import job_queue
+from pipeline_progress import is_listening, listen, pipeline_stage, report_frame
+from structured_log import get_logger
 
 router = APIRouter(prefix="/frame", tags=["frame"])
+log = get_logger('router')
+
+# Supported qualities, lowest first
+QUALITY_LEVELS = ["144p", "240p", "360p", "480p", "720p", "1080p"]
+
+# Request coalescing: full pipeline per video_id and every other request field
+# (see _pipeline_key), downloads per (video_id, quality)
+extraction_flight = SingleFlight("extraction")
+download_flight = SingleFlight(
+    "download",
+    share=youtube_downloader.share_download,
+    discard=youtube_downloader.cleanup_download
+)
 
 # Pydantic models
 class YouTubeRequest(BaseModel):
     url: HttpUrl
     quality: str = "360p"
-    method: str = "auto"  # 'time', 'scene', 'auto'
+    method: str = "auto"  # 'time', 'scene', 'adaptive', 'cluster', 'storyboard', 'auto'
     frame_count: int = 4
+    download_mode: str = "auto"  # 'auto', 'full', 'partial', 'stream'
+    analysis_quality: str = "240p"  # Quality used to pick scene-based timestamps
+    analysis_mode: str = "auto"  # Scene candidates: 'sampled', 'keyframes' (I-frames only), 'parallel', 'adaptive', 'scenedetect', 'auto'
 
 class FrameInfo(BaseModel):
     frame_number: int
@@ -29,6 +56,7 @@ class FrameInfo(BaseModel):
     file_name: str
     file_size: int
     change_score: Optional[float] = None
+    cluster_size: Optional[int] = None
 
 class VideoInfo(BaseModel):
     total_frames: int
@@ -38,16 +66,41 @@ class VideoInfo(BaseModel):
     duration: float
     duration_str: str
 
+class DecodeSessionInfo(BaseModel):
+    open_count: int
+    setup_time: float
+    backend: Optional[str] = None  # Decode backend that served the request ('opencv', 'pyav', 'ffmpeg')
+
 class FrameExtractionResponse(BaseModel):
     success: bool
     error: Optional[str] = None
     video_title: Optional[str] = None
     video_info: Optional[VideoInfo] = None
     extraction_method: Optional[str] = None
+    download_mode: Optional[str] = None
     extraction_time: Optional[float] = None
     frames_extracted: Optional[int] = None
     frames: Optional[List[FrameInfo]] = None
     total_size: Optional[int] = None
+    decode_session: Optional[DecodeSessionInfo] = None
+    analysis: Optional[Dict] = None  # Scene analysis scan and per-frame timings
+
+class JobStage(BaseModel):
+    status: str  # 'pending', 'running', 'done', 'failed', 'skipped'
+    progress: Optional[float] = None  # Finished share while running (downloads report bytes)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str  # 'queued', 'running', 'completed', 'failed'
+    stages: Dict[str, JobStage]  # metadata, download, analysis, encode
+    progress: float  # Share of stages finished
+    queue_position: Optional[int] = None  # Jobs ahead of this one while queued
+    result: Optional[FrameExtractionResponse] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
 
 @router.post("/extract-from-youtube", response_model=FrameExtractionResponse)
 async def extract_frames_from_youtube(request: YouTubeRequest, background_tasks: BackgroundTasks):
@@ -56,73 +109,588 @@ async def extract_frames_from_youtube(request: YouTubeRequest, background_tasks:
     
     - **url**: YouTube video URL (supports regular videos and Shorts)
     - **quality**: Video quality (144p, 240p, 360p, 480p, 720p, 1080p)
-    - **method**: Frame extraction method ('time', 'scene', 'auto')
+    - **method**: Frame extraction method ('time', 'scene', 'adaptive', 'cluster', 'storyboard', 'auto');
+      'adaptive' uses PySceneDetect's AdaptiveDetector cuts (when installed), 'cluster'
+      picks one frame per group of visually similar frames, 'storyboard' scores YouTube's
+      thumbnail sprite sheets and fetches only the chosen frames
     - **frame_count**: Number of frames to extract (default: 4)
+    - **download_mode**: 'partial' fetches only short clips around the frames, 'stream' decodes
+      from the media URL without a temp file, 'full' always downloads the whole video,
+      'auto' uses partial (or stream without ffmpeg) when possible
+    - **analysis_quality**: Scene-, adaptive- and cluster-based extraction picks timestamps on this lower quality and
+      then fetches only the chosen frames at `quality` (two-tier)
+    - **analysis_mode**: 'keyframes' scores I-frames only (decoder skips all other frames),
+      'sampled' scores every 1% of the frames, 'parallel' splits those samples across worker
+      processes, 'adaptive' refines a coarse pass to cut-accurate frames, 'scenedetect' takes
+      PySceneDetect's cuts (what method 'adaptive' uses), 'auto' uses keyframes (or parallel without a keyframe decoder) for videos over 5 minutes
     
     Returns:
-        Frame extraction results and individual frame information
+        Frame extraction results and individual frame information (503 with
+        Retry-After while the extraction wait queue is full)
     """
     try:
         # 1. URL validation
         url_str = str(request.url)
-        if not validate_youtube_url(url_str):
-            raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
-        
-        # 2. Video download
-        download_result = download_youtube_video(
-            url_str, 
-            quality=request.quality
-        )
+        is_valid, message = validate_youtube_url(url_str)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=message)
         
-        if not download_result:
-            raise HTTPException(status_code=500, detail="Video download failed.")
+        return await _extract(url_str, request)
         
-        # 3. Frame extraction
-        extraction_result = extract_video_frames(
-            download_result['file_path'],
-            method=request.method,
-            frame_count=request.frame_count
-        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("Extraction failed", url=str(request.url), error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
+
+def _frame_info(frame: Dict) -> FrameInfo:
+    return FrameInfo(
+        frame_number=frame['frame_number'],
+        timestamp=frame['timestamp'],
+        timestamp_str=frame['timestamp_str'],
+        file_name=frame['file_name'],
+        file_size=frame['file_size'],
+        change_score=frame.get('change_score'),
+        cluster_size=frame.get('cluster_size')
+    )
+
+def _pipeline_key(video_id: str, request: YouTubeRequest, bounded: bool) -> tuple:
+    """
+    Coalescing key of a full pipeline run
+    
+    Every request field except the URL (already reduced to the video ID) can
+    change the result, so all of them are part of the key. So is bounded: the
+    leader's admission applies to everyone who joins, and a job must not fail
+    with a synchronous request's 503 (nor a synchronous request skip the bound).
+    """
+    return (video_id, bounded, tuple(sorted(request.model_dump(exclude={'url'}).items())))
+
+async def _extract(url_str: str, request: YouTubeRequest, bounded: bool = True) -> FrameExtractionResponse:
+    """
+    Run the extraction pipeline for a validated URL and build the response
+    
+    Shared by the synchronous endpoint and the job workers.
+    
+    Args:
+        bounded: Answer 503 when the admission wait queue is full (job workers wait instead)
+    
+    Returns:
+        Frame extraction response
+    """
+    # 2-3. Download and extraction; identical concurrent requests with the same
+    # admission rule share one run, so only the first of them needs a turn
+    video_id = youtube_downloader.extract_video_id(url_str) or url_str
+    pipeline_key = _pipeline_key(video_id, request, bounded)
+    log.info("Extraction requested", video_id=video_id, quality=request.quality, method=request.method,
+             frame_count=request.frame_count, download_mode=request.download_mode)
+    pipeline_result = await extraction_flight.do(
+        pipeline_key,
+        lambda: _run_admitted_pipeline(url_str, video_id, request, bounded)
+    )
+    extraction_result = pipeline_result['extraction']
+    log.info("Extraction complete", video_id=video_id, download_mode=pipeline_result['download_mode'],
+             method=extraction_result['extraction_method'], frames=extraction_result['frames_extracted'],
+             extraction_time=extraction_result['extraction_time'])
+    
+    # 4. Build response data
+    frames_info = [_frame_info(frame) for frame in extraction_result['frames']]
+    
+    video_info = VideoInfo(**extraction_result['video_info'])
+    
+    return FrameExtractionResponse(
+        success=True,
+        video_title=pipeline_result['title'],
+        video_info=video_info,
+        extraction_method=extraction_result['extraction_method'],
+        download_mode=pipeline_result['download_mode'],
+        extraction_time=extraction_result['extraction_time'],
+        frames_extracted=extraction_result['frames_extracted'],
+        frames=frames_info,
+        total_size=extraction_result['total_size'],
+        decode_session=extraction_result.get('decode_session'),
+        analysis=extraction_result.get('analysis')
+    )
+
+@router.post("/extract-stream")
+async def extract_frames_stream(request: YouTubeRequest):
+    """
+    Extract frames like extract-from-youtube, streaming progress as newline-delimited JSON.
+    
+    Takes the same body. Every line is one event:
+    - `{"type": "stage", "stage": "download", "status": "running"}` when a stage
+      (metadata, download, analysis, encode) starts or ends ('done', 'failed')
+    - `{"type": "progress", "stage": "download", "progress": 0.42, "downloaded_bytes": ..., "total_bytes": ...}`
+    - `{"type": "frame", "frame": {...}}` with a FrameInfo as soon as its JPEG is written
+    - `{"type": "result", "result": {...}}` with the complete FrameExtractionResponse, always last
+    - `{"type": "error", "status_code": 500, "detail": "..."}` instead of the result on failure
+    
+    Frames from an attempt that a fallback replaced can appear too; the final
+    result lists the frames that count.
+    """
+    url_str = str(request.url)
+    is_valid, message = validate_youtube_url(url_str)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+    
+    # Reject before the 200 status line is sent; a request that loses the race
+    # for the last queue place gets a 503 error event instead
+    if admission_controller.is_full():
+        raise _busy_error(admission_controller.retry_after())
+    
+    return StreamingResponse(_stream_extraction(url_str, request), media_type="application/x-ndjson")
+
+async def _stream_extraction(url_str: str, request: YouTubeRequest):
+    """Run one extraction and yield its progress events as NDJSON lines"""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def listener(event: Dict):
+        # Download progress arrives from I/O threads
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    async def run() -> FrameExtractionResponse:
+        with listen(listener):
+            return await _extract(url_str, request)
+    
+    extraction = asyncio.ensure_future(run())
+    # Queued after every event the extraction reported, so it ends the stream
+    extraction.add_done_callback(lambda _: events.put_nowait(None))
+    
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            if event['type'] == 'frame':
+                event = {'type': 'frame', 'frame': _frame_info(event['frame']).model_dump(mode='json')}
+            yield json.dumps(event) + "\n"
         
-        if not extraction_result['success']:
-            # Clean up downloaded files
-            background_tasks.add_task(youtube_downloader.cleanup_download, download_result)
-            raise HTTPException(status_code=500, detail=f"Frame extraction failed: {extraction_result['error']}")
-        
-        # 4. Build response data
-        frames_info = []
-        for frame in extraction_result['frames']:
-            frames_info.append(FrameInfo(
-                frame_number=frame['frame_number'],
-                timestamp=frame['timestamp'],
-                timestamp_str=frame['timestamp_str'],
-                file_name=frame['file_name'],
-                file_size=frame['file_size'],
-                change_score=frame.get('change_score')
-            ))
-        
-        video_info = VideoInfo(**extraction_result['video_info'])
-        
-        response = FrameExtractionResponse(
-            success=True,
-            video_title=download_result['title'],
-            video_info=video_info,
-            extraction_method=extraction_result['extraction_method'],
-            extraction_time=extraction_result['extraction_time'],
-            frames_extracted=extraction_result['frames_extracted'],
-            frames=frames_info,
-            total_size=extraction_result['total_size']
-        )
+        try:
+            response = extraction.result()
+        except HTTPException as e:
+            error = {'type': 'error', 'status_code': e.status_code, 'detail': e.detail}
+            if e.headers and 'Retry-After' in e.headers:
+                error['retry_after'] = int(e.headers['Retry-After'])
+            yield json.dumps(error) + "\n"
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'status_code': 500, 'detail': f"Server error: {str(e)}"}) + "\n"
+        else:
+            yield json.dumps({'type': 'result', 'result': response.model_dump(mode='json')}) + "\n"
+    finally:
+        # Client went away: stop waiting (coalesced work keeps running for others)
+        if not extraction.done():
+            extraction.cancel()
+
+async def _run_extraction(func, *args, **kwargs) -> Dict:
+    """
+    Run a frame-writing extraction function in the CPU pool
+    
+    While somebody listens for progress (job or stream), every frame is
+    reported as soon as its JPEG is written instead of after the whole call.
+    
+    Returns:
+        Extraction result of func
+    """
+    if not is_listening():
+        return await extraction_executor.run_cpu(func, *args, **kwargs)
+    
+    frame_queue = extraction_executor.create_queue()
+    forwarder = asyncio.ensure_future(extraction_executor.forward_queue(frame_queue, report_frame))
+    try:
+        return await extraction_executor.run_cpu(func, *args, frame_queue=frame_queue, **kwargs)
+    finally:
+        # A managed queue's put is a round trip to the manager process
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, frame_queue.put, None)
+        await forwarder
+
+def _busy_error(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry later.",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+async def _run_admitted_pipeline(url_str: str, video_id: str, request: YouTubeRequest, bounded: bool) -> Dict:
+    """
+    Run _run_extraction_pipeline once admission control gives it a turn
+    
+    Raises:
+        HTTPException: 503 with Retry-After when the wait queue is full
+    """
+    try:
+        async with admission_controller.admit(bounded):
+            return await _run_extraction_pipeline(url_str, video_id, request)
+    except AdmissionRejected as e:
+        log.warning("Extraction rejected, wait queue is full", video_id=video_id, retry_after=e.retry_after)
+        raise _busy_error(e.retry_after)
+
+async def _run_extraction_pipeline(url_str: str, video_id: str, request: YouTubeRequest) -> Dict:
+    """
+    Download a video and extract frames from it
+    
+    The download is coalesced on (video_id, quality) only, so requests that differ
+    in method or frame_count still reuse one in-flight download.
+    
+    Returns:
+        Dictionary with video title, download mode and extraction result
+    """
+    # Streaming decodes straight from the media URL without any temp file
+    if request.download_mode == 'stream':
+        stream_result = await _run_stream_pipeline(url_str, request)
+        if not stream_result:
+            raise HTTPException(status_code=500, detail="Streaming extraction failed.")
+        return stream_result
+    
+    if request.download_mode != 'full':
+        # Long videos: score the storyboard thumbnails instead of downloading for analysis
+        if request.method in ('storyboard', 'auto'):
+            storyboard_result = await _run_storyboard_pipeline(url_str, request)
+            if storyboard_result:
+                return storyboard_result
         
-        # 5. Clean up video files in background (keep frames)
-        background_tasks.add_task(youtube_downloader.cleanup_download, download_result)
+        # Time-based extraction only needs a few frames, so try fetching just the ranges around them
+        if request.method in ('time', 'auto'):
+            partial_result = await _run_partial_pipeline(url_str, request)
+            if partial_result:
+                return partial_result
         
-        return response
+        # Scene analysis on a low-quality copy, output frames fetched at the requested quality
+        if request.method in ('scene', 'adaptive', 'cluster', 'storyboard', 'auto'):
+            two_tier_result = await _run_two_tier_pipeline(url_str, video_id, request)
+            if two_tier_result:
+                return two_tier_result
         
-    except HTTPException:
-        raise
+        if request.download_mode == 'partial' and request.method == 'time':
+            raise HTTPException(status_code=500, detail="Partial download failed.")
+    
+    # Video download (blocking network I/O, runs in the I/O thread pool)
+    with pipeline_stage('download'):
+        download_result = await download_flight.do(
+            (video_id, request.quality),
+            lambda: extraction_executor.run_io(download_youtube_video, url_str, quality=request.quality)
+        )
+    
+    if not download_result:
+        raise HTTPException(status_code=500, detail="Video download failed.")
+    
+    try:
+        # Frame extraction (CPU-bound OpenCV decode, runs in the process pool);
+        # analysis and JPEG encoding happen in the same call
+        with pipeline_stage('analysis'), pipeline_stage('encode'):
+            extraction_result = await _run_extraction(
+                extract_video_frames,
+                download_result['file_path'],
+                method=request.method,
+                frame_count=request.frame_count,
+                output_name=download_result.get('output_name'),
+                analysis_mode=request.analysis_mode
+            )
+    finally:
+        # Release the cached video (keep frames)
+        await extraction_executor.run_io(youtube_downloader.cleanup_download, download_result)
+    
+    if not extraction_result['success']:
+        raise HTTPException(status_code=500, detail=f"Frame extraction failed: {extraction_result['error']}")
+    
+    return {
+        'title': download_result['title'],
+        'download_mode': 'full',
+        'extraction': extraction_result,
+    }
+
+async def _run_partial_pipeline(url_str: str, request: YouTubeRequest) -> Optional[Dict]:
+    """
+    Time-based extraction from clips around the target timestamps only
+    
+    The timestamps depend only on the duration, so they are computed from metadata
+    before anything is downloaded.
+    
+    Returns:
+        Same dictionary as _run_extraction_pipeline, or None when the full download is needed
+    """
+    with pipeline_stage('metadata'):
+        metadata = await extraction_executor.run_io(youtube_downloader.get_video_metadata, url_str)
+    duration = (metadata or {}).get('duration')
+    if not duration or frame_extractor.resolve_method(request.method, duration) != 'time':
+        return None
+    
+    if not youtube_downloader.can_download_sections():
+        # Without ffmpeg, seek to the few frames over HTTP instead
+        return await _run_stream_pipeline(url_str, request) if request.download_mode == 'auto' else None
+    
+    timestamps = frame_extractor.get_time_positions(duration, request.frame_count)
+    with pipeline_stage('download'):
+        sections_result = await extraction_executor.run_io(
+            youtube_downloader.download_sections, url_str, timestamps, quality=request.quality
+        )
+    if not sections_result:
+        return None
+    
+    try:
+        with pipeline_stage('encode'):
+            extraction_result = await _run_extraction(
+                extract_clip_frames,
+                sections_result['clips'],
+                duration,
+                sections_result['output_name']
+            )
+    finally:
+        await extraction_executor.run_io(youtube_downloader.cleanup_download, sections_result)
+    
+    if not extraction_result['success']:
+        log.warning("Partial extraction failed, falling back to full download", error=extraction_result['error'])
+        return None
+    
+    return {
+        'title': sections_result['title'],
+        'download_mode': 'partial',
+        'extraction': extraction_result,
+    }
+
+def _is_higher_quality(quality: str, other: str) -> bool:
+    """Check whether quality is a known level above other"""
+    if quality not in QUALITY_LEVELS or other not in QUALITY_LEVELS:
+        return quality == 'best' and other in QUALITY_LEVELS
+    return QUALITY_LEVELS.index(quality) > QUALITY_LEVELS.index(other)
+
+async def _run_two_tier_pipeline(url_str: str, video_id: str, request: YouTubeRequest) -> Optional[Dict]:
+    """
+    Scene- or cluster-based extraction with analysis and output at different qualities
+    
+    Timestamps are chosen on the (cached) analysis_quality download; only tiny
+    ranges of the requested quality around those timestamps are fetched, so the
+    analysis cost does not grow with the output quality.
+    
+    Returns:
+        Same dictionary as _run_extraction_pipeline, or None when the single-quality path is needed
+    """
+    if not _is_higher_quality(request.quality, request.analysis_quality):
+        return None
+    
+    with pipeline_stage('metadata'):
+        metadata = await extraction_executor.run_io(youtube_downloader.get_video_metadata, url_str)
+    duration = (metadata or {}).get('duration')
+    if not duration:
+        return None
+    method = frame_extractor.resolve_method(request.method, duration)
+    if method not in ('scene', 'adaptive', 'cluster'):
+        return None
+    
+    # 1. Analysis tier (shares downloads with plain requests at that quality)
+    with pipeline_stage('download'):
+        analysis_download = await download_flight.do(
+            (video_id, request.analysis_quality),
+            lambda: extraction_executor.run_io(download_youtube_video, url_str, quality=request.analysis_quality)
+        )
+    if not analysis_download:
+        return None
+    
+    try:
+        with pipeline_stage('analysis'):
+            plan = await extraction_executor.run_cpu(
+                plan_video_frames, analysis_download['file_path'], method=method,
+                frame_count=request.frame_count, analysis_mode=request.analysis_mode
+            )
+    finally:
+        await extraction_executor.run_io(youtube_downloader.cleanup_download, analysis_download)
+    
+    if not plan:
+        return None
+    
+    # 2. Output tier: only the chosen frames at the requested quality
+    extraction_result = await _fetch_planned_frames(url_str, request, plan['targets'], duration, method)
+    if not extraction_result:
+        log.warning("Two-tier extraction failed, falling back to single quality")
+        return None
+    
+    extraction_result['extraction_time'] = round(extraction_result['extraction_time'] + plan['analysis_time'], 2)
+    extraction_result['analysis'] = plan['scan']
+    
+    return {
+        'title': analysis_download['title'],
+        'download_mode': 'two_tier',
+        'extraction': extraction_result,
+    }
+
+async def _run_storyboard_pipeline(url_str: str, request: YouTubeRequest) -> Optional[Dict]:
+    """
+    Pick timestamps from the storyboard sprite sheets, then fetch only those frames
+    
+    No video data is read for the analysis; the winners are fetched at the
+    requested quality like the output tier of two-tier extraction.
+    
+    Returns:
+        Same dictionary as _run_extraction_pipeline, or None when the video must be analyzed
+    """
+    with pipeline_stage('metadata'):
+        metadata = await extraction_executor.run_io(youtube_downloader.get_video_metadata, url_str)
+    duration = (metadata or {}).get('duration')
+    if not duration or frame_extractor.resolve_method(request.method, duration, has_storyboard(metadata)) != 'storyboard':
+        return None
+    
+    with pipeline_stage('download'):
+        storyboard_result = await extraction_executor.run_io(youtube_downloader.download_storyboard, url_str)
+    if not storyboard_result:
+        return None
+    
+    try:
+        with pipeline_stage('analysis'):
+            plan = await extraction_executor.run_cpu(
+                plan_storyboard_frames, storyboard_result['sheets'], storyboard_result['storyboard'],
+                duration, request.frame_count
+            )
+    finally:
+        await extraction_executor.run_io(youtube_downloader.cleanup_download, storyboard_result)
+    
+    if not plan:
+        return None
+    
+    extraction_result = await _fetch_planned_frames(url_str, request, plan['targets'], duration, 'storyboard')
+    if not extraction_result:
+        log.warning("Storyboard extraction failed, falling back to video analysis")
+        return None
+    
+    extraction_result['extraction_time'] = round(extraction_result['extraction_time'] + plan['analysis_time'], 2)
+    
+    return {
+        'title': storyboard_result['title'],
+        'download_mode': 'storyboard',
+        'extraction': extraction_result,
+    }
+
+async def _fetch_planned_frames(url_str: str, request: YouTubeRequest, targets: List[Dict],
+                                duration: float, method: str) -> Optional[Dict]:
+    """
+    Fetch frames at planned timestamps from the requested quality
+    
+    Downloads short clips around the timestamps when ffmpeg is available, and
+    otherwise seeks to them on the stream URL over HTTP range requests.
+    
+    Returns:
+        Successful extraction result, or None
+    """
+    extraction_result = None
+    
+    if youtube_downloader.can_download_sections():
+        with pipeline_stage('download'):
+            sections_result = await extraction_executor.run_io(
+                youtube_downloader.download_sections, url_str,
+                [target['timestamp'] for target in targets], quality=request.quality
+            )
+        if sections_result:
+            scores = {target['timestamp']: target.get('change_score') for target in targets}
+            for clip in sections_result['clips']:
+                clip['change_score'] = scores.get(clip['timestamp'])
+            try:
+                with pipeline_stage('encode'):
+                    extraction_result = await _run_extraction(
+                        extract_clip_frames, sections_result['clips'], duration,
+                        sections_result['output_name'], method=method
+                    )
+            finally:
+                await extraction_executor.run_io(youtube_downloader.cleanup_download, sections_result)
+    
+    if not extraction_result or not extraction_result['success']:
+        # Seek to the frames over HTTP range requests instead
+        with pipeline_stage('download'):
+            stream = await extraction_executor.run_io(youtube_downloader.resolve_stream, url_str, quality=request.quality)
+        if not stream:
+            return None
+        with pipeline_stage('encode'):
+            extraction_result = await _run_extraction(
+                extract_timestamp_frames, stream['stream_url'], targets, stream['output_name'], method=method
+            )
+    
+    if not extraction_result['success']:
+        log.warning("Fetching planned frames failed", error=extraction_result['error'])
+        return None
+    
+    return extraction_result
+
+async def _run_stream_pipeline(url_str: str, request: YouTubeRequest) -> Optional[Dict]:
+    """
+    Extract frames by decoding the direct media URL (HTTP range seeks, no temp file)
+    
+    Returns:
+        Same dictionary as _run_extraction_pipeline, or None on failure
+    """
+    with pipeline_stage('download'):
+        stream = await extraction_executor.run_io(youtube_downloader.resolve_stream, url_str, quality=request.quality)
+    if not stream:
+        return None
+    
+    # Frames are decoded from the network, so reading the video is part of analysis here
+    with pipeline_stage('analysis'), pipeline_stage('encode'):
+        extraction_result = await _run_extraction(
+            extract_video_frames,
+            stream['stream_url'],
+            method=request.method,
+            frame_count=request.frame_count,
+            output_name=stream['output_name'],
+            analysis_mode=request.analysis_mode
+        )
+    
+    if not extraction_result['success']:
+        log.warning("Streaming extraction failed", error=extraction_result['error'])
+        return None
+    
+    return {
+        'title': stream['title'],
+        'download_mode': 'stream',
+        'extraction': extraction_result,
+    }
+
+def _job_response(job: Dict) -> JobResponse:
+    return JobResponse(
+        job_id=job['id'],
+        status=job['status'],
+        stages=job['stages'],
+        progress=job['progress'],
+        queue_position=job['queue_position'],
+        result=job['result'],
+        error=job['error'],
+        created_at=job['created_at'],
+        updated_at=job['updated_at']
+    )
+
+async def _run_job(request_data: Dict) -> Dict:
+    """Job worker entry point: run one queued extraction request"""
+    request = YouTubeRequest(**request_data)
+    response = await _extract(str(request.url), request, bounded=False)
+    return response.model_dump(mode='json')
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_extraction_job(request: YouTubeRequest):
+    """
+    Queue a frame extraction and return at once.
+    
+    Takes the same body as extract-from-youtube. Poll `GET /frame/jobs/{job_id}`
+    (optionally with `wait` to block until the job finishes) for stage progress
+    and the result; jobs survive a server restart.
+    """
+    url_str = str(request.url)
+    is_valid, message = validate_youtube_url(url_str)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+    
+    try:
+        job = await job_queue.submit(request.model_dump(mode='json'))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Job submission error: {str(e)}")
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_extraction_job(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    """
+    Get the status, per-stage progress and result of an extraction job.
+    
+    - **wait**: Seconds to wait for the job to finish before answering (long polling)
+    """
+    job = await job_queue.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return _job_response(job)
 
 @router.get("/download/{file_name}")
 async def download_frame(file_name: str):
@@ -163,9 +731,18 @@ async def get_system_info():
         return {
             "frame_output_directory": temp_dir,
             "temporary_frames": len(temp_files),
-            "supported_qualities": ["144p", "240p", "360p", "480p", "720p", "1080p"],
-            "extraction_methods": ["time", "scene", "auto"],
-            "max_frame_count": 10
+            "supported_qualities": QUALITY_LEVELS,
+            "extraction_methods": ["time", "scene", "adaptive", "cluster", "storyboard", "auto"],
+            "max_frame_count": 10,
+            "executor": extraction_executor.get_stats(),
+            "admission": admission_controller.get_stats(),
+            "jobs": await job_queue.get_stats(),
+            "video_cache": youtube_downloader.video_cache.get_stats(),
+            "metadata_cache": youtube_downloader.metadata_cache.get_stats(),
+            "request_coalescing": {
+                "extraction": extraction_flight.get_stats(),
+                "download": download_flight.get_stats()
+            }
         }
         
     except Exception as e:
@@ -196,6 +773,17 @@ async def cleanup_frames(background_tasks: BackgroundTasks):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File cleanup error: {str(e)}")
 
+@router.on_event("startup")
+async def start_job_workers():
+    """Start the extraction job workers (and resume jobs left from the last run)"""
+    await job_queue.start(_run_job)
+
+@router.on_event("shutdown")
+async def shutdown_executor():
+    """Stop job workers and download and extraction worker pools"""
+    await job_queue.stop()
+    extraction_executor.shutdown(wait=False)
+
 # Endpoints for backward compatibility
 @router.post("/extract", response_model=FrameExtractionResponse)
 async def extract_frames_legacy(request: YouTubeRequest, background_tasks: BackgroundTasks):
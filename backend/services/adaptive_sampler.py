@@ -0,0 +1,155 @@
+import os
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from scene_features import CHANGE_METRIC, consecutive_changes
+
+# Spacing of the coarse pass in seconds
+ADAPTIVE_COARSE_SECONDS = float(os.environ.get('PROMPTSNAP_ADAPTIVE_COARSE_SECONDS', 5))
+
+# Coarse pairs scoring above this are searched for the exact cut
+ADAPTIVE_THRESHOLD = float(os.environ.get('PROMPTSNAP_ADAPTIVE_THRESHOLD', 0.3))
+
+# A cut is located once it is known to within this many frames
+ADAPTIVE_PRECISION_FRAMES = int(os.environ.get('PROMPTSNAP_ADAPTIVE_PRECISION_FRAMES', 1))
+
+# Upper bound on refined pairs (strongest first), which bounds the extra seeks
+MAX_REFINED_PAIRS = 64
+
+
+class AdaptiveSampler:
+    def __init__(self, coarse_seconds: float = ADAPTIVE_COARSE_SECONDS, threshold: float = ADAPTIVE_THRESHOLD,
+                 precision_frames: int = ADAPTIVE_PRECISION_FRAMES, max_refined: int = MAX_REFINED_PAIRS):
+        """
+        Initialize coarse-to-fine scene sampler
+
+        A coarse pass scores frames a few seconds apart. Every pair of adjacent
+        samples whose change score exceeds the threshold holds a cut; it is
+        bisected (the half with the larger change keeps the cut, both halves
+        are searched when both score above the threshold) until each cut is
+        pinned to precision_frames. Locating a cut in an interval of n frames
+        costs about log2(n) extra decoded frames instead of n.
+
+        Args:
+            coarse_seconds: Spacing of the coarse pass
+            threshold: Change score a coarse pair needs to be refined
+            precision_frames: Refine until the cut lies within this many frames
+            max_refined: Maximum number of coarse pairs to refine, and of cuts found in them
+        """
+        self.coarse_seconds = coarse_seconds
+        self.threshold = threshold
+        self.precision_frames = max(1, precision_frames)
+        self.max_refined = max_refined
+
+    def coarse_interval(self, fps: float) -> int:
+        """
+        Get the coarse sample spacing in frames
+
+        Args:
+            fps: Frame rate
+
+        Returns:
+            Frames between coarse samples
+        """
+        return max(self.precision_frames, int(round(self.coarse_seconds * fps)))
+
+    def coarse_indices(self, total_frames: int, fps: float) -> List[int]:
+        """
+        Get the frames of the coarse pass (the last frame included, so a cut
+        after the last regular sample is bracketed too)
+
+        Args:
+            total_frames: Number of frames
+            fps: Frame rate
+
+        Returns:
+            Sorted frame indices
+        """
+        indices = list(range(0, total_frames, self.coarse_interval(fps)))
+        if total_frames > 1 and indices[-1] != total_frames - 1:
+            indices.append(total_frames - 1)
+        return indices
+
+    def refine(self, scene_changes: List[Dict], first_frame: int, histogram_at: Callable[[int], np.ndarray],
+               metric: str = CHANGE_METRIC) -> Tuple[List[Dict], int]:
+        """
+        Locate the cuts inside high-scoring coarse pairs
+
+        A pair can hold more than one cut: while both halves of an interval
+        score above the threshold, both are searched, so the number of cuts
+        found in total is bounded by max_refined.
+
+        Args:
+            scene_changes: Coarse scores in time order; each 'frame_idx' is the
+                later frame of a pair, whose earlier frame is the previous entry's
+            first_frame: Earlier frame of the first pair (the first coarse sample)
+            histogram_at: Returns the histogram of a frame (None if it cannot be read)
+            metric: Change metric the histograms are for
+
+        Returns:
+            (scene_changes, refinements): the coarse list with each refined pair
+            replaced by one entry per cut, on the first frame after it, and the
+            number of pairs refined. A cut keeps the score of the largest interval
+            that held no other cut (the coarse score for a pair's only cut), which
+            ranks cuts against each other better than the score of adjacent frames.
+        """
+        candidates = sorted(
+            (i for i, change in enumerate(scene_changes) if change['change_score'] > self.threshold),
+            key=lambda i: scene_changes[i]['change_score'], reverse=True
+        )[:self.max_refined]
+        # Cuts beyond one per refined pair
+        extra_cuts = [self.max_refined - len(candidates)]
+
+        cuts_by_pair = {}
+        for i in candidates:
+            start = scene_changes[i - 1]['frame_idx'] if i > 0 else first_frame
+            end = scene_changes[i]['frame_idx']
+            cuts_by_pair[i] = self._search(start, end, scene_changes[i]['change_score'],
+                                           histogram_at(start), histogram_at(end), histogram_at, metric, extra_cuts)
+
+        refined = []
+        for i, change in enumerate(scene_changes):
+            cuts = cuts_by_pair.get(i, [(change['frame_idx'], change['change_score'])])
+            for n, (frame_idx, score) in enumerate(cuts):
+                entry = dict(change, frame_idx=frame_idx, change_score=score)
+                if n < len(cuts) - 1:
+                    # The pair's later frame (which the hash is of) lies past the next cut
+                    entry.pop('dhash', None)
+                refined.append(entry)
+        return refined, len(candidates)
+
+    def _search(self, start: int, end: int, score: float, start_hist: np.ndarray, end_hist: np.ndarray,
+                histogram_at: Callable[[int], np.ndarray], metric: str, extra_cuts: List[int]) -> List[Tuple[int, float]]:
+        """
+        Narrow the cuts between frames start and end by bisection
+
+        The half with the larger change keeps the cut; both halves are followed
+        while both score above the threshold and extra_cuts allows another cut.
+
+        Returns:
+            (first frame after the cut, score) for each cut, in time order
+        """
+        while end - start > self.precision_frames:
+            middle = (start + end) // 2
+            middle_hist = histogram_at(middle)
+            if middle_hist is None or start_hist is None or end_hist is None:
+                break
+
+            first, second = consecutive_changes(np.stack([start_hist, middle_hist, end_hist]), metric)
+            if first > self.threshold and second > self.threshold and extra_cuts[0] > 0:
+                extra_cuts[0] -= 1
+                earlier = self._search(start, middle, float(first), start_hist, middle_hist,
+                                       histogram_at, metric, extra_cuts)
+                later = self._search(middle, end, float(second), middle_hist, end_hist,
+                                     histogram_at, metric, extra_cuts)
+                return earlier + later
+            if first >= second:
+                end, end_hist = middle, middle_hist
+            else:
+                start, start_hist = middle, middle_hist
+        return [(end, score)]
+
+
+# Create global instance
+adaptive_sampler = AdaptiveSampler()
@@ -0,0 +1,163 @@
+import asyncio
+import contextlib
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+ADMISSION_MAX_ACTIVE = int(os.environ.get('PROMPTSNAP_MAX_ACTIVE_REQUESTS', 8))
+ADMISSION_MAX_WAITING = int(os.environ.get('PROMPTSNAP_MAX_WAITING_REQUESTS', 16))
+# Retry-After when nothing has finished yet to estimate the drain rate from
+DEFAULT_RETRY_AFTER = 30
+MAX_RETRY_AFTER = 600
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, retry_after: int):
+        """
+        Raised when the wait queue is full
+
+        Args:
+            retry_after: Seconds after which the queue should have room again
+        """
+        super().__init__(f"Server is busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_active: Optional[int] = None, max_waiting: Optional[int] = None,
+                 window: float = 60.0):
+        """
+        Initialize admission control for extraction requests
+
+        At most max_active extractions run at once (each one then competes for the
+        executor's per-stage I/O and CPU slots); up to max_waiting more wait for a
+        turn, and requests beyond that are rejected right away instead of slowing
+        every running request down.
+
+        Args:
+            max_active: Extractions running at once (defaults to PROMPTSNAP_MAX_ACTIVE_REQUESTS or 8)
+            max_waiting: Requests waiting for a turn (defaults to PROMPTSNAP_MAX_WAITING_REQUESTS or 16)
+            window: Seconds of finished requests the drain rate is measured over
+        """
+        self.max_active = max_active or ADMISSION_MAX_ACTIVE
+        self.max_waiting = max_waiting if max_waiting is not None else ADMISSION_MAX_WAITING
+        self.window = window
+
+        self._slots = asyncio.Semaphore(self.max_active)
+        self._active = 0
+        self._waiting = 0  # Bounded (synchronous) requests waiting for a turn
+        self._waiting_jobs = 0  # Unbounded waiters, which the wait queue limit does not apply to
+        self._finished = deque()  # Monotonic finish times within the window
+        self._mean_duration: Optional[float] = None
+        self._stats = {'admitted': 0, 'rejected': 0, 'completed': 0}
+
+    def is_full(self) -> bool:
+        """
+        Check whether a new request would be rejected
+
+        Only bounded waiters count towards max_waiting, so a backlog of queued
+        jobs does not turn synchronous requests away.
+        """
+        return self._active >= self.max_active and self._waiting >= self.max_waiting
+
+    def drain_rate(self) -> Optional[float]:
+        """
+        Requests finished per second recently
+
+        Measured over the finish times in the window, or estimated from the mean
+        request duration when fewer than two requests finished in it.
+
+        Returns:
+            Requests per second, or None before any request finished
+        """
+        now = time.monotonic()
+        while self._finished and now - self._finished[0] > self.window:
+            self._finished.popleft()
+
+        if len(self._finished) >= 2:
+            return len(self._finished) / max(now - self._finished[0], 1.0)
+        if self._mean_duration:
+            return self.max_active / self._mean_duration
+        return None
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the requests waiting now (and one more) should have started
+
+        Returns:
+            Retry-After value in whole seconds
+        """
+        rate = self.drain_rate()
+        if not rate:
+            return DEFAULT_RETRY_AFTER
+        # Jobs waiting ahead also have to start first
+        waiting = self._waiting + self._waiting_jobs
+        return min(max(math.ceil((waiting + 1) / rate), 1), MAX_RETRY_AFTER)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, bounded: bool = True):
+        """
+        Wait for a turn to run one extraction
+
+        Args:
+            bounded: Reject when the wait queue is full; queued jobs pass False to
+                wait regardless, since they already wait in the job queue
+
+        Raises:
+            AdmissionRejected: The wait queue is full
+        """
+        if bounded and self.is_full():
+            self._stats['rejected'] += 1
+            raise AdmissionRejected(self.retry_after())
+
+        if bounded:
+            self._waiting += 1
+        else:
+            self._waiting_jobs += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            if bounded:
+                self._waiting -= 1
+            else:
+                self._waiting_jobs -= 1
+
+        self._active += 1
+        self._stats['admitted'] += 1
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._slots.release()
+
+            finished_at = time.monotonic()
+            duration = finished_at - start_time
+            self._finished.append(finished_at)
+            self._mean_duration = duration if self._mean_duration is None else \
+                0.8 * self._mean_duration + 0.2 * duration
+            self._stats['completed'] += 1
+
+    def get_stats(self) -> Dict:
+        """
+        Get limits, queue depth and in-flight count
+
+        Returns:
+            Statistics dictionary
+        """
+        rate = self.drain_rate()
+        return {
+            'max_active': self.max_active,
+            'max_waiting': self.max_waiting,
+            'active': self._active,
+            'waiting': self._waiting,
+            'waiting_jobs': self._waiting_jobs,
+            'drain_rate': round(rate, 3) if rate else None,
+            'retry_after': self.retry_after() if self.is_full() else 0,
+            **self._stats,
+        }
+
+# Create global instance
+admission_controller = AdmissionController()
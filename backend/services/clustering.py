@@ -0,0 +1,123 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Lloyd iterations; histogram features settle in a handful
+KMEANS_ITERATIONS = 20
+
+
+def histogram_features(histograms: np.ndarray) -> np.ndarray:
+    """
+    Turn colour histograms into vectors for Euclidean clustering
+
+    Square roots of the normalized histograms: their Euclidean distance is the
+    Hellinger distance between the colour distributions, which, unlike raw
+    counts, does not let one dominant colour swamp everything else.
+
+    Args:
+        histograms: (N, bins) histograms
+
+    Returns:
+        (N, bins) float32 feature vectors
+    """
+    histograms = histograms.astype(np.float32)
+    totals = histograms.sum(axis=1, keepdims=True)
+    return np.sqrt(np.divide(histograms, totals, out=np.zeros_like(histograms), where=totals > 0))
+
+
+def _squared_distances(features: np.ndarray, centroids: np.ndarray,
+                       feature_norms: Optional[np.ndarray] = None) -> np.ndarray:
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, one matrix product for all pairs
+    if feature_norms is None:
+        feature_norms = (features ** 2).sum(axis=1)
+    distances = feature_norms[:, None] - 2 * features @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+    return np.maximum(distances, 0)
+
+
+def kmeans(features: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS,
+           seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster feature vectors with k-means (k-means++ seeding, Lloyd iterations)
+
+    Every step works on the whole (N, k) distance matrix, so thousands of
+    samples with 512-bin features take milliseconds. Seeded, so the same
+    video always gives the same frames.
+
+    Args:
+        features: (N, D) feature vectors
+        k: Number of clusters (at most N)
+        iterations: Maximum Lloyd iterations
+        seed: Random seed for the seeding step
+
+    Returns:
+        (labels, centroids): (N,) cluster of every vector and (k, D) centroids
+    """
+    rng = np.random.default_rng(seed)
+    n = len(features)
+    k = min(k, n)
+    # Colour bins no sample uses add nothing to any distance
+    used = features.any(axis=0)
+    dimensions = features.shape[1]
+    features = features[:, used]
+    norms = (features ** 2).sum(axis=1)
+
+    # k-means++: each new centroid is drawn proportionally to the squared
+    # distance from the nearest centroid chosen so far
+    centroids = np.empty((k, features.shape[1]), dtype=features.dtype)
+    centroids[0] = features[rng.integers(n)]
+    nearest = _squared_distances(features, centroids[:1], norms)[:, 0]
+    for c in range(1, k):
+        total = nearest.sum()
+        index = rng.choice(n, p=nearest / total) if total > 0 else rng.integers(n)
+        centroids[c] = features[index]
+        nearest = np.minimum(nearest, _squared_distances(features, centroids[c:c + 1], norms)[:, 0])
+
+    labels = np.zeros(n, dtype=np.int64)
+    for iteration in range(iterations):
+        distances = _squared_distances(features, centroids, norms)
+        new_labels = distances.argmin(axis=1)
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        counts = np.bincount(labels, minlength=k)
+        # Per-cluster sums as one (k, N) x (N, D) product
+        membership = np.zeros((k, n), dtype=features.dtype)
+        membership[labels, np.arange(n)] = 1
+        sums = membership @ features
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            # Restart empty clusters on the points worst served by their centroid
+            worst = np.argsort(distances[np.arange(n), labels])[::-1][:empty.sum()]
+            centroids[empty] = features[worst]
+
+    full_centroids = np.zeros((k, dimensions), dtype=centroids.dtype)
+    full_centroids[:, used] = centroids
+    return labels, full_centroids
+
+
+def representative_indices(features: np.ndarray, k: int, seed: int = 0) -> List[Tuple[int, int]]:
+    """
+    Pick the sample closest to each k-means centroid
+
+    Args:
+        features: (N, D) feature vectors in time order
+        k: Number of representatives
+        seed: Random seed for k-means
+
+    Returns:
+        (sample_index, cluster_size) pairs sorted by sample index
+    """
+    if len(features) == 0 or k <= 0:
+        return []
+
+    labels, centroids = kmeans(features, k, seed=seed)
+    distances = _squared_distances(features, centroids)
+
+    representatives = []
+    for c in range(len(centroids)):
+        members = np.flatnonzero(labels == c)
+        if len(members):
+            representatives.append((int(members[distances[members, c].argmin()]), len(members)))
+    return sorted(representatives)
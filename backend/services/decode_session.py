@@ -0,0 +1,161 @@
+import cv2
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from decoders import DECODER_BACKEND, choose_backend, is_stream_url, open_decoder
+from metrics import STAGE_SECONDS, observe_stage
+from structured_log import get_logger
+
+log = get_logger('decode')
+
+
+def open_capture(source: str, backend: Optional[str] = None):
+    """
+    Open a local file or a remote media URL
+
+    Args:
+        source: Video file path or media URL
+        backend: Decode backend ('opencv', 'pyav', 'ffmpeg'); chosen for the
+            container when not given
+
+    Returns:
+        Capture with the cv2.VideoCapture interface
+    """
+    return open_decoder(source, backend or choose_backend(source))
+
+
+class DecodeSession:
+    def __init__(self, source: str, backend: str = DECODER_BACKEND):
+        """
+        Initialize decode session for one extraction request
+
+        Opens the video once and caches the probed metadata, so the analysis,
+        frame writing and fallback steps share one parsed container and one
+        initialized decoder. Additional opens (raw packet probes, keyframe
+        decoders) are counted too, so the totals show every container parse.
+
+        Args:
+            source: Video file path or media URL
+            backend: Decode backend ('opencv', 'pyav', 'ffmpeg', or 'auto' to pick
+                the fastest one for the container)
+        """
+        self.source = source
+        self.is_stream = is_stream_url(source)
+        # Backend serving this session's decodes
+        self.backend = choose_backend(source, backend=backend)
+
+        # Scan plan and timings of the scene analysis run in this session
+        self.analysis: Optional[Dict] = None
+
+        self._capture = None
+        self._info: Optional[Dict] = None
+        self._gop: Optional[float] = None
+        self._gop_probed = False
+        self._open_count = 0
+        self._setup_time = 0.0
+
+    @property
+    def capture(self):
+        """Shared capture (cv2.VideoCapture interface), opened on first use"""
+        if self._capture is None:
+            start = time.perf_counter()
+            self._capture = open_capture(self.source, self.backend)
+            self.record_open(time.perf_counter() - start)
+        return self._capture
+
+    def record_open(self, setup_time: float):
+        """
+        Count a container open made on behalf of this session
+
+        Args:
+            setup_time: Seconds spent opening and probing
+        """
+        self._open_count += 1
+        self._setup_time += setup_time
+        STAGE_SECONDS.observe(setup_time, stage='probe')
+
+    def get_info(self) -> Optional[Dict]:
+        """
+        Get video information (probed once)
+
+        Returns:
+            Video information dictionary or None if the video cannot be opened
+        """
+        if self._info is None:
+            cap = self.capture
+            if not cap.isOpened():
+                log.warning("Cannot open video file", source=self.source, backend=self.backend)
+                return None
+
+            start = time.perf_counter()
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            duration = total_frames / fps if fps > 0 else 0
+            self._setup_time += time.perf_counter() - start
+
+            self._info = {
+                'total_frames': total_frames,
+                'fps': fps,
+                'width': width,
+                'height': height,
+                'duration': duration,
+                'duration_str': str(timedelta(seconds=int(duration)))
+            }
+        return dict(self._info)
+
+    def get_gop(self, probe) -> Optional[float]:
+        """
+        Get the keyframe interval (probed once)
+
+        Args:
+            probe: Callable taking the source and returning the GOP (opens its own raw capture)
+
+        Returns:
+            Average keyframe interval in frames, or None
+        """
+        if not self._gop_probed:
+            start = time.perf_counter()
+            self._gop = probe(self.source)
+            self.record_open(time.perf_counter() - start)
+            self._gop_probed = True
+        return self._gop
+
+    def read_frame(self, frame_idx: int):
+        """
+        Seek to a frame and decode it
+
+        Args:
+            frame_idx: Frame index
+
+        Returns:
+            (ret, frame) like VideoCapture.read
+        """
+        cap = self.capture
+        with observe_stage('frame_decode'):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            return cap.read()
+
+    def get_stats(self) -> Dict:
+        """
+        Get open count, setup time and decode backend
+
+        Returns:
+            Dictionary with 'open_count', 'setup_time' (seconds) and 'backend'
+        """
+        return {'open_count': self._open_count, 'setup_time': round(self._setup_time, 4), 'backend': self.backend}
+
+    def close(self):
+        """Release the decoder"""
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
@@ -0,0 +1,272 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from metrics import metrics, record_call
+from structured_log import get_logger, get_request_id, run_with_request_id
+
+log = get_logger('executor')
+
+# CPUs the running CPU-bound task may spread its own helper processes over
+_cpu_share: ContextVar[Optional[int]] = ContextVar('promptsnap_cpu_share', default=None)
+
+
+def get_cpu_share() -> Optional[int]:
+    """Get the CPUs run_cpu gave the current task (None outside run_cpu: no limit)"""
+    return _cpu_share.get()
+
+
+def run_with_cpu_share(cpu_share: int, func: Callable, *args, **kwargs) -> Any:
+    """
+    Run func with the given CPU share (see get_cpu_share)
+
+    Module-level so the executor can send it to pool processes, which do not
+    share the caller's context.
+    """
+    token = _cpu_share.set(cpu_share)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _cpu_share.reset(token)
+
+
+class ExtractionExecutor:
+    def __init__(self, io_workers: Optional[int] = None, cpu_workers: Optional[int] = None,
+                 use_processes: Optional[bool] = None):
+        """
+        Initialize execution layer for blocking pipeline stages
+
+        Downloads (network + time.sleep between retries) run in a thread pool,
+        OpenCV decoding runs in a process pool. Each stage has its own concurrency
+        limit so a burst of downloads cannot starve frame extraction and vice versa.
+
+        Args:
+            io_workers: Maximum concurrent I/O-bound tasks (defaults to PROMPTSNAP_IO_WORKERS or 8)
+            cpu_workers: Maximum concurrent CPU-bound tasks (defaults to PROMPTSNAP_CPU_WORKERS or CPU count)
+            use_processes: Run CPU-bound tasks in processes instead of threads
+                (defaults to PROMPTSNAP_CPU_PROCESSES, enabled unless set to '0')
+        """
+        self.io_workers = io_workers or int(os.environ.get('PROMPTSNAP_IO_WORKERS', 8))
+        self.cpu_workers = cpu_workers or int(os.environ.get('PROMPTSNAP_CPU_WORKERS', os.cpu_count() or 1))
+        if use_processes is None:
+            use_processes = os.environ.get('PROMPTSNAP_CPU_PROCESSES', '1') != '0'
+        self.use_processes = use_processes
+
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool = None
+        self._manager = None
+
+        # Semaphores keep waiting requests on the event loop (cancellable, observable)
+        # instead of piling up inside the executor queues
+        self._io_slots = asyncio.Semaphore(self.io_workers)
+        self._cpu_slots = asyncio.Semaphore(self.cpu_workers)
+
+        self._stats = {
+            'io': {'running': 0, 'waiting': 0, 'completed': 0, 'failed': 0},
+            'cpu': {'running': 0, 'waiting': 0, 'completed': 0, 'failed': 0},
+        }
+
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='promptsnap-io')
+        return self._io_pool
+
+    def _get_cpu_pool(self):
+        if self._cpu_pool is None:
+            if self.use_processes:
+                try:
+                    # 'spawn' avoids forking a process that already runs event loop and pool threads
+                    self._cpu_pool = ProcessPoolExecutor(
+                        max_workers=self.cpu_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                except (OSError, NotImplementedError, ImportError) as e:
+                    log.warning("Process pool unavailable, falling back to threads", error=str(e))
+                    self.use_processes = False
+
+            if not self.use_processes:
+                self._cpu_pool = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix='promptsnap-cpu')
+
+        return self._cpu_pool
+
+    async def _run(self, stage: str, semaphore: asyncio.Semaphore, pool, func: Callable, *args, **kwargs) -> Any:
+        stats = self._stats[stage]
+        stats['waiting'] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats['waiting'] -= 1
+
+        stats['running'] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(pool, partial(func, *args, **kwargs))
+            stats['completed'] += 1
+            return result
+        except Exception:
+            stats['failed'] += 1
+            raise
+        finally:
+            stats['running'] -= 1
+            semaphore.release()
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking I/O-bound function (download, metadata) in the thread pool
+
+        func runs in a copy of the caller's context, so context variables such as
+        the progress listener (see pipeline_progress) reach download hooks.
+
+        Args:
+            func: Blocking function to run
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            Return value of func
+        """
+        context = contextvars.copy_context()
+        return await self._run('io', self._io_slots, self._get_io_pool(), context.run, func, *args, **kwargs)
+
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a CPU-bound function (decode, analysis) in the process pool
+
+        func and its arguments must be picklable when the process pool is used,
+        so pass module-level functions such as extract_video_frames. The
+        machine's CPUs are divided by the CPU tasks active at submission, and
+        func may spread over its share (see get_cpu_share).
+
+        Args:
+            func: Blocking function to run
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            Return value of func
+        """
+        pool = self._get_cpu_pool()
+        stats = self._stats['cpu']
+        active = min(self.cpu_workers, stats['running'] + stats['waiting'] + 1)
+        cpu_share = max(1, (os.cpu_count() or 1) // active)
+        try:
+            # Stage timings made in the worker come back with the result; the
+            # request ID goes along so the worker's log records carry it too
+            result, observations = await self._run('cpu', self._cpu_slots, pool, record_call,
+                                                   run_with_request_id, get_request_id(),
+                                                   run_with_cpu_share, cpu_share, func, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM during decode); replace the pool for later requests
+            log.error("CPU process pool is broken, recreating it")
+            self._cpu_pool = None
+            pool.shutdown(wait=False)
+            raise
+        metrics.apply(observations)
+        return result
+
+    def create_queue(self):
+        """
+        Create a queue CPU-bound tasks can report to while they run
+
+        Pass it as an argument to run_cpu; a managed queue is returned when the
+        tasks run in processes, since plain multiprocessing queues cannot be sent
+        to pool workers.
+
+        Returns:
+            Queue with blocking put() and get()
+        """
+        self._get_cpu_pool()
+        if not self.use_processes:
+            return queue.Queue()
+        if self._manager is None:
+            self._manager = multiprocessing.get_context('spawn').Manager()
+        return self._manager.Queue()
+
+    async def forward_queue(self, task_queue, handle: Callable[[Any], Any]):
+        """
+        Hand each item a running CPU-bound task puts on a create_queue() queue to handle
+
+        A thread of its own blocks on the queue, outside the I/O pool and its
+        limit, so waiting for the reports of a long task never competes with
+        downloads. handle runs on the event loop, in a copy of the caller's
+        context, in the order the items were put.
+
+        Args:
+            task_queue: Queue from create_queue; put None on it to stop forwarding
+            handle: Function called with every item
+
+        Returns:
+            None, once None was taken off the queue and every item before it handled
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        finished = loop.create_future()
+
+        def finish(error: Optional[BaseException]):
+            if finished.done():
+                return
+            if error is None:
+                finished.set_result(None)
+            else:
+                finished.set_exception(error)
+
+        def read():
+            try:
+                for item in iter(task_queue.get, None):
+                    loop.call_soon_threadsafe(handle, item, context=context)
+            except Exception as e:
+                # E.g. the manager process of a managed queue went away
+                loop.call_soon_threadsafe(finish, e)
+            else:
+                loop.call_soon_threadsafe(finish, None)
+
+        threading.Thread(target=read, name='promptsnap-queue-reader', daemon=True).start()
+        await finished
+
+    def get_stats(self) -> Dict:
+        """
+        Get current pool limits and per-stage task counts
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'io_workers': self.io_workers,
+            'cpu_workers': self.cpu_workers,
+            'cpu_backend': 'process' if self.use_processes else 'thread',
+            'io': dict(self._stats['io']),
+            'cpu': dict(self._stats['cpu']),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut down worker pools
+
+        Args:
+            wait: Wait for running tasks to finish
+        """
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=wait)
+            self._io_pool = None
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=wait)
+            self._cpu_pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+# Create global instance
+extraction_executor = ExtractionExecutor()
+
+# Convenience functions
+async def run_io_task(func: Callable, *args, **kwargs) -> Any:
+    return await extraction_executor.run_io(func, *args, **kwargs)
+
+async def run_cpu_task(func: Callable, *args, **kwargs) -> Any:
+    return await extraction_executor.run_cpu(func, *args, **kwargs)
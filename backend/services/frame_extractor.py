@@ -1,280 +1,824 @@
 import cv2
 import os
+import contextlib
+import itertools
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import time
+from contextvars import ContextVar
 from datetime import timedelta
 from PIL import Image
+from storyboard import iter_storyboard_tiles
+from frame_scanner import frame_scanner
+from keyframe_reader import keyframe_reader
+from decode_session import DecodeSession, open_capture
+from scene_features import (ANALYSIS_WIDTH, CHANGE_METRIC, FeatureBatcher, FrameResizer, analysis_size,
+                            batch_histograms, consecutive_changes)
+from parallel_analysis import parallel_analyzer
+from adaptive_sampler import adaptive_sampler
+from selection import DUPLICATE_DISTANCE, SCENE_SELECTOR, select_scenes, suppress_duplicates
+from clustering import histogram_features, representative_indices
+from frameVideo import adaptive_scene_detector
+from metrics import SCENE_TIME_FALLBACKS, observe_stage
+from structured_log import get_logger
+
+log = get_logger('extractor')
+
+# Queue written frames are reported to while an extraction runs (see extract_video_frames)
+_frame_queue: ContextVar = ContextVar('promptsnap_frame_queue', default=None)
 
 class FrameExtractor:
-    def __init__(self, output_dir: str = None):
+    def __init__(self, output_dir: str = None, analysis_width: int = ANALYSIS_WIDTH,
+                 change_metric: str = CHANGE_METRIC, selector: str = SCENE_SELECTOR,
+                 duplicate_distance: int = DUPLICATE_DISTANCE):
         """
         Initialize frame extractor
         
         Args:
             output_dir: Directory to save extracted frames
+            analysis_width: Width frames are scaled to for scene change scoring
+            change_metric: Histogram distance used as change score ('correl', 'chisqr',
+                'bhattacharyya', 'hsv_l1')
+            selector: Scene change selection ('nms' greedy, 'dp' maximum total score)
+            duplicate_distance: dHash bits within which a candidate duplicates a stronger
+                one (negative keeps near-duplicates)
         """
         self.output_dir = output_dir or os.path.join(os.getcwd(), "temp", "extracted_frames")
+        self.analysis_width = analysis_width
+        self.change_metric = change_metric
+        self.selector = selector
+        self.duplicate_distance = duplicate_distance
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def get_video_info(self, video_path: str) -> Optional[Dict]:
+    @contextlib.contextmanager
+    def _session_for(self, video_path: str, session: Optional[DecodeSession] = None):
+        """
+        Use the caller's decode session, or open one just for this call
+        """
+        if session is not None:
+            yield session
+            return
+        with DecodeSession(video_path) as own_session:
+            yield own_session
+    
+    def get_video_info(self, video_path: str, session: Optional[DecodeSession] = None) -> Optional[Dict]:
         """
         Extract basic video information
         
         Args:
             video_path: Video file path
+            session: Decode session to probe through (metadata is cached there)
             
         Returns:
             Video information dictionary or None
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            
-            if not cap.isOpened():
-                print(f"Cannot open video file: {video_path}")
-                return None
-            
-            # Get video properties
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            duration = total_frames / fps if fps > 0 else 0
-            
-            cap.release()
-            
-            return {
-                'total_frames': total_frames,
-                'fps': fps,
-                'width': width,
-                'height': height,
-                'duration': duration,
-                'duration_str': str(timedelta(seconds=int(duration)))
-            }
+            with self._session_for(video_path, session) as session:
+                return session.get_info()
             
         except Exception as e:
-            print(f"Failed to extract video information: {str(e)}")
+            log.error("Failed to extract video information", video_path=video_path, error=str(e))
             return None
     
-    def extract_frames_by_time(self, video_path: str, frame_count: int = 4) -> List[Dict]:
+    def _get_output_name(self, video_path: str, output_name: Optional[str] = None) -> str:
+        """
+        Get base name for frame files (cached videos are shared, so callers pass a per-request name)
+        """
+        return output_name or os.path.splitext(os.path.basename(video_path))[0]
+    
+    def get_time_positions(self, duration: float, frame_count: int = 4) -> List[float]:
+        """
+        Get timestamps used by time-based extraction
+        
+        Only depends on the duration, so callers can compute them from metadata
+        before anything is downloaded.
+        
+        Args:
+            duration: Video duration in seconds
+            frame_count: Number of frames to extract
+            
+        Returns:
+            List of timestamps in seconds
+        """
+        # Exclude first and last 10% for even distribution
+        start_time = duration * 0.1
+        end_time = duration * 0.9
+        effective_duration = end_time - start_time
+        
+        time_intervals = []
+        for i in range(frame_count):
+            timestamp = start_time + (effective_duration / (frame_count - 1)) * i if frame_count > 1 else duration / 2
+            time_intervals.append(timestamp)
+        
+        return time_intervals
+    
+    def extract_frames_by_time(self, video_path: str, frame_count: int = 4, output_name: Optional[str] = None,
+                               session: Optional[DecodeSession] = None) -> List[Dict]:
         """
         Extract frames by time intervals (even distribution)
         
         Args:
             video_path: Video file path
             frame_count: Number of frames to extract
+            output_name: Base name for frame files (defaults to video file name)
+            session: Decode session shared with the other steps of the request
             
         Returns:
             List of extracted frame information
         """
         try:
-            video_info = self.get_video_info(video_path)
-            if not video_info:
-                return []
+            with self._session_for(video_path, session) as session:
+                return self._extract_frames_by_time(session, frame_count, output_name)
             
-            cap = cv2.VideoCapture(video_path)
-            duration = video_info['duration']
-            fps = video_info['fps']
+        except Exception as e:
+            log.error("Time-based frame extraction failed", video_path=video_path, error=str(e))
+            return []
+    
+    def _extract_frames_by_time(self, session: DecodeSession, frame_count: int, output_name: Optional[str]) -> List[Dict]:
+        """
+        Time-based extraction through an open decode session
+        """
+        video_path = session.source
+        video_info = session.get_info()
+        if not video_info:
+            return []
+        
+        duration = video_info['duration']
+        fps = video_info['fps']
+        
+        time_intervals = self.get_time_positions(duration, frame_count)
+        
+        extracted_frames = []
+        video_name = self._get_output_name(video_path, output_name)
+        
+        for i, timestamp in enumerate(time_intervals):
+            # Move to frame at specified time
+            frame_number = int(timestamp * fps)
+            ret, frame = session.read_frame(frame_number)
+            if ret:
+                # Save frame
+                frame_filename = f"{video_name}_frame_{i+1:02d}_{int(timestamp):03d}s.jpg"
+                frame_path = os.path.join(self.output_dir, frame_filename)
+                
+                # Optimize image quality
+                success = self._write_jpeg(frame_path, frame)
+                
+                if success:
+                    extracted_frames.append({
+                        'frame_number': i + 1,
+                        'timestamp': timestamp,
+                        'timestamp_str': str(timedelta(seconds=int(timestamp))),
+                        'file_path': frame_path,
+                        'file_name': frame_filename,
+                        'file_size': os.path.getsize(frame_path)
+                    })
+                    self._publish_frames(extracted_frames[-1:])
+                    log.debug("Frame extracted", file_name=frame_filename, timestamp=int(timestamp))
+        
+        return extracted_frames
+
+    def resolve_analysis_mode(self, analysis_mode: str, duration: float) -> str:
+        """
+        Resolve 'auto' to a concrete scene analysis mode
+        
+        Args:
+            analysis_mode: Requested mode ('sampled', 'keyframes', 'parallel', 'adaptive',
+                'scenedetect', 'auto')
+            duration: Video duration in seconds
             
-            # Exclude first and last 10% for even distribution
-            start_time = duration * 0.1
-            end_time = duration * 0.9
-            effective_duration = end_time - start_time
+        Returns:
+            'sampled', 'adaptive', 'keyframes' (only when a keyframe decoder is
+            available), 'parallel' (only with more than one analysis worker) or
+            'scenedetect' (only with PySceneDetect installed)
+        """
+        has_keyframes = keyframe_reader.get_backend() is not None
+        has_workers = parallel_analyzer.workers > 1
+        if analysis_mode == 'auto':
+            # Keyframe decoding pays off once there are far more frames than samples
+            if duration <= 300:
+                return 'sampled'
+            if has_keyframes:
+                return 'keyframes'
+            return 'parallel' if has_workers else 'sampled'
+        if analysis_mode == 'keyframes' and not has_keyframes:
+            return 'sampled'
+        if analysis_mode == 'parallel' and not has_workers:
+            return 'sampled'
+        if analysis_mode == 'scenedetect' and not adaptive_scene_detector.is_available():
+            return 'sampled'
+        return analysis_mode
+    
+    def analyze_scene_changes(self, video_path: str, frame_count: int = 4, analysis_mode: str = 'auto',
+                              session: Optional[DecodeSession] = None) -> Optional[Dict]:
+        """
+        Pick scene change points without writing any frames
+        
+        Histograms are coarse, so this can run on a low-resolution copy of the
+        video while the output frames come from a higher-quality source.
+        
+        Args:
+            video_path: Video file path or media URL
+            frame_count: Number of scene changes to select
+            analysis_mode: 'sampled' (every 1% of frames), 'keyframes' (I-frames only),
+                'parallel' (the sampled frames, split across worker processes),
+                'adaptive' (coarse pass refined to cut-accurate frames), 'scenedetect'
+                (PySceneDetect's AdaptiveDetector on every frame) or 'auto'
+            session: Decode session shared with the other steps of the request
             
-            time_intervals = []
-            for i in range(frame_count):
-                timestamp = start_time + (effective_duration / (frame_count - 1)) * i if frame_count > 1 else duration / 2
-                time_intervals.append(timestamp)
+        Returns:
+            Dictionary with 'video_info', 'scenes' (sorted by time) and 'scan' (strategy used,
+            analysis frame size and per-frame decode/feature time), or None
+        """
+        try:
+            with observe_stage('analysis'), self._session_for(video_path, session) as session:
+                video_info = session.get_info()
+                if not video_info:
+                    return None
+                
+                scene_changes = None
+                actual_mode = self.resolve_analysis_mode(analysis_mode, video_info['duration'])
+                if actual_mode == 'keyframes':
+                    scene_changes, scan_plan = self._score_keyframes(session, video_info)
+                elif actual_mode == 'parallel':
+                    scene_changes, scan_plan = self._score_parallel_segments(session, video_info)
+                elif actual_mode == 'adaptive':
+                    scene_changes, scan_plan = self._score_adaptive(session, video_info)
+                elif actual_mode == 'scenedetect':
+                    scene_changes, scan_plan = self._score_scenedetect(session, video_info)
+                if scene_changes is None:
+                    scene_changes, scan_plan = self._score_sampled_frames(session, video_info)
+                session.analysis = scan_plan
+                
+                return {
+                    'video_info': video_info,
+                    'scenes': self._select_scene_changes(scene_changes, frame_count, video_info['duration'], scan_plan),
+                    'scan': scan_plan
+                }
             
-            extracted_frames = []
-            video_name = os.path.splitext(os.path.basename(video_path))[0]
+        except Exception as e:
+            log.error("Scene change analysis failed", video_path=video_path, error=str(e))
+            return None
+    
+    def _score_histogram_changes(self, samples, video_info: Dict, scan_plan: Dict) -> List[Dict]:
+        """
+        Score (frame_idx, timestamp, frame) samples by histogram change to the previous sample
+        
+        The change scores of all consecutive pairs are computed in one matrix
+        operation.
+        """
+        positions, histograms, hashes = self._collect_histograms(samples, video_info, scan_plan)
+        
+        # Histogram comparison for scene change detection (higher value means bigger change)
+        feature_start = time.perf_counter()
+        change_scores = consecutive_changes(histograms, self.change_metric)
+        self._add_feature_time(scan_plan, time.perf_counter() - feature_start)
+        
+        return [
+            {'frame_idx': frame_idx, 'timestamp': timestamp, 'change_score': float(score), 'dhash': int(dhash)}
+            for (frame_idx, timestamp), score, dhash in zip(positions[1:], change_scores, hashes[1:])
+        ]
+    
+    def _add_feature_time(self, scan_plan: Dict, seconds: float):
+        """
+        Spread extra feature time over the analyzed frames in scan_plan
+        """
+        frames = max(scan_plan['frames_analyzed'], 1)
+        scan_plan['feature_ms_per_frame'] = round(scan_plan['feature_ms_per_frame'] + seconds * 1000 / frames, 3)
+    
+    def _collect_histograms(self, samples, video_info: Dict,
+                            scan_plan: Dict) -> Tuple[List[Tuple[int, float]], np.ndarray, np.ndarray]:
+        """
+        Compute the histograms and perceptual hashes of (frame_idx, timestamp, frame) samples
+        
+        Frames are scaled to the analysis size straight into a preallocated
+        batch (a plain copy when the decoder already delivered them that
+        small). Frame count, decode time and feature time per frame are added
+        to scan_plan.
+        
+        Returns:
+            ((frame_idx, timestamp) of every sample, (N, bins) histograms, (N,) dHashes)
+        """
+        width, height = analysis_size(video_info['width'], video_info['height'], self.analysis_width)
+        batcher = FeatureBatcher(width, height, self.change_metric)
+        
+        positions = []
+        feature_time = 0.0
+        loop_start = time.perf_counter()
+        
+        for frame_idx, timestamp, frame in samples:
+            feature_start = time.perf_counter()
+            batcher.add(frame)
+            positions.append((frame_idx, timestamp))
+            feature_time += time.perf_counter() - feature_start
+        
+        decode_time = time.perf_counter() - loop_start - feature_time
+        
+        feature_start = time.perf_counter()
+        histograms = batcher.histograms()
+        hashes = batcher.hashes()
+        feature_time += time.perf_counter() - feature_start
+        
+        ms_per_frame = 1000 / max(len(positions), 1)
+        scan_plan.update({
+            'analysis_size': [width, height],
+            'change_metric': self.change_metric,
+            'frames_analyzed': len(positions),
+            'decode_ms_per_frame': round(decode_time * ms_per_frame, 3),
+            'feature_ms_per_frame': round(feature_time * ms_per_frame, 3)
+        })
+        
+        return positions, histograms, hashes
+    
+    def _get_sample_interval(self, video_info: Dict) -> int:
+        """
+        Sample every 1% of total frames for performance optimization
+        """
+        return max(1, video_info['total_frames'] // 100)
+    
+    def _score_sampled_frames(self, session: DecodeSession, video_info: Dict,
+                              sample_indices: Optional[List[int]] = None) -> Tuple[List[Dict], Dict]:
+        """
+        Score every 1% of the frames (or the given evenly spaced frames)
+        """
+        samples, scan_plan = self._sample_frames(session, video_info, sample_indices)
+        return self._score_histogram_changes(samples, video_info, scan_plan), scan_plan
+    
+    def _sample_frames(self, session: DecodeSession, video_info: Dict, sample_indices: Optional[List[int]] = None):
+        """
+        Read every 1% of the frames (or the given evenly spaced frames)
+        
+        Returns:
+            ((frame_idx, timestamp, frame) generator, scan_plan)
+        """
+        total_frames = video_info['total_frames']
+        fps = video_info['fps']
+        if sample_indices is None:
+            sample_interval = self._get_sample_interval(video_info)
+            sample_indices = list(range(0, total_frames, sample_interval))
+        else:
+            sample_interval = sample_indices[1] - sample_indices[0] if len(sample_indices) > 1 else 1
+        
+        # Walk the video once or seek per sample, whichever decodes less
+        scan_plan = frame_scanner.plan_scan(session, sample_interval)
+        log.debug("Sampling frames", strategy=scan_plan['strategy'], gop=scan_plan['gop'],
+                  sample_interval=sample_interval)
+        
+        samples = (
+            (frame_idx, frame_idx / fps, frame)
+            for frame_idx, frame in frame_scanner.scan(session.capture, sample_indices, scan_plan['strategy'])
+        )
+        return samples, scan_plan
+    
+    def _score_adaptive(self, session: DecodeSession, video_info: Dict) -> Tuple[List[Dict], Dict]:
+        """
+        Score a coarse pass, then bisect the high-scoring pairs down to the cut
+        
+        Refinement seeks through the session capture; its frames are counted
+        in 'frames_analyzed' and reported under 'adaptive'.
+        """
+        fps = video_info['fps']
+        coarse_indices = adaptive_sampler.coarse_indices(video_info['total_frames'], fps)
+        scene_changes, scan_plan = self._score_sampled_frames(session, video_info, coarse_indices)
+        
+        width, height = analysis_size(video_info['width'], video_info['height'], self.analysis_width)
+        resizer = FrameResizer(width, height)
+        histograms = {}
+        
+        def histogram_at(frame_idx: int):
+            if frame_idx not in histograms:
+                ret, frame = session.read_frame(frame_idx)
+                histograms[frame_idx] = (
+                    batch_histograms(resizer.resize(frame)[None], self.change_metric)[0] if ret else None
+                )
+            return histograms[frame_idx]
+        
+        start = time.perf_counter()
+        scene_changes, refinements = adaptive_sampler.refine(
+            scene_changes, coarse_indices[0], histogram_at, self.change_metric
+        )
+        refine_time = time.perf_counter() - start
+        
+        for change in scene_changes:
+            change['timestamp'] = change['frame_idx'] / fps
+        
+        scan_plan['frames_analyzed'] += len(histograms)
+        scan_plan['adaptive'] = {
+            'coarse_interval': scan_plan['sample_interval'],
+            'refined_pairs': refinements,
+            'refine_frames': len(histograms),
+            'refine_ms_per_frame': round(refine_time * 1000 / max(len(histograms), 1), 3)
+        }
+        log.debug("Adaptive sampling refined cuts", refinements=refinements, extra_frames=len(histograms))
+        return scene_changes, scan_plan
+    
+    def _score_parallel_segments(self, session: DecodeSession, video_info: Dict) -> Tuple[Optional[List[Dict]], Dict]:
+        """
+        Score the sampled frames in timeline segments, one worker process each
+        
+        Workers return histograms only; the change scores are computed on the
+        merged matrix, so the pair across each segment boundary is scored like
+        any other. Every worker's open is counted in the session.
+        
+        Returns:
+            (scene_changes, scan_plan); scene_changes is None when the sampled scan is needed
+        """
+        total_frames = video_info['total_frames']
+        fps = video_info['fps']
+        sample_interval = self._get_sample_interval(video_info)
+        sample_indices = list(range(0, total_frames, sample_interval))
+        
+        scan_plan = frame_scanner.plan_scan(session, sample_interval)
+        if parallel_analyzer.segment_count(len(sample_indices)) < 2:
+            return None, scan_plan
+        
+        width, height = analysis_size(video_info['width'], video_info['height'], self.analysis_width)
+        log.debug("Analyzing scene changes in parallel", strategy=scan_plan['strategy'],
+                  workers=parallel_analyzer.workers, sample_interval=sample_interval)
+        
+        try:
+            start = time.perf_counter()
+            result = parallel_analyzer.analyze(
+                session.source, sample_indices, (width, height), self.change_metric, scan_plan['strategy'],
+                session.backend
+            )
+            wall_time = time.perf_counter() - start
+        except Exception as e:
+            log.warning("Parallel analysis failed, using sampled frames", error=str(e))
+            return None, scan_plan
+        
+        for open_time in result['open_times']:
+            session.record_open(open_time)
+        
+        frame_indices = result['frame_indices']
+        change_scores = consecutive_changes(result['histograms'], self.change_metric)
+        scene_changes = [
+            {'frame_idx': frame_idx, 'timestamp': frame_idx / fps, 'change_score': float(score), 'dhash': int(dhash)}
+            for frame_idx, score, dhash in zip(frame_indices[1:], change_scores, result['hashes'][1:])
+        ]
+        
+        ms_per_frame = 1000 / max(len(frame_indices), 1)
+        scan_plan.update({
+            'workers': parallel_analyzer.workers,
+            'segments': result['segments'],
+            'analysis_size': [width, height],
+            'change_metric': self.change_metric,
+            'frames_analyzed': len(frame_indices),
+            'decode_ms_per_frame': round(result['decode_time'] * ms_per_frame, 3),
+            'feature_ms_per_frame': round(result['feature_time'] * ms_per_frame, 3),
+            'wall_ms_per_frame': round(wall_time * ms_per_frame, 3)
+        })
+        return scene_changes, scan_plan
+    
+    def _score_keyframes(self, session: DecodeSession, video_info: Dict) -> Tuple[Optional[List[Dict]], Dict]:
+        """
+        Score I-frames only (the decoder skips all other frames)
+        
+        Keyframes are scaled by the decoder (FFmpeg scale filter, PyAV
+        reformat), so full-size frames are never copied out. The keyframe
+        decoder opens the container itself; that open is counted in the
+        session with the time until the first keyframe arrives.
+        
+        Returns:
+            (scene_changes, scan_plan); scene_changes is None when the sampled scan is needed
+        """
+        fps = video_info['fps']
+        scan_plan = {'strategy': 'keyframes', 'backend': keyframe_reader.get_backend()}
+        log.debug("Analyzing scene changes from keyframes", backend=scan_plan['backend'])
+        
+        try:
+            width, height = analysis_size(video_info['width'], video_info['height'], self.analysis_width)
+            keyframes = keyframe_reader.iter_keyframes(session.source, width, height)
+            open_start = time.perf_counter()
+            first_keyframe = next(keyframes, None)
+            session.record_open(time.perf_counter() - open_start)
+            if first_keyframe is None:
+                return None, scan_plan
             
-            for i, timestamp in enumerate(time_intervals):
-                # Move to frame at specified time
-                frame_number = int(timestamp * fps)
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            samples = (
+                (int(round(timestamp * fps)), timestamp, frame)
+                for timestamp, frame in itertools.chain([first_keyframe], keyframes)
+            )
+            scene_changes = self._score_histogram_changes(samples, video_info, scan_plan)
+        except Exception as e:
+            log.warning("Keyframe analysis failed, using sampled frames", error=str(e))
+            return None, scan_plan
+        
+        scan_plan['keyframes'] = len(scene_changes) + 1
+        if len(scene_changes) < 2:
+            # A single long GOP gives nothing to compare
+            return None, scan_plan
+        return scene_changes, scan_plan
+    
+    def _score_scenedetect(self, session: DecodeSession, video_info: Dict) -> Tuple[Optional[List[Dict]], Dict]:
+        """
+        Take the cuts PySceneDetect's AdaptiveDetector finds as scene changes
+        
+        PySceneDetect opens and decodes the video itself (downscaled, skipping
+        frames as configured); that open is counted in the session.
+        
+        Returns:
+            (scene_changes, scan_plan); scene_changes is None when the sampled scan is needed
+        """
+        detector = adaptive_scene_detector
+        scan_plan = {'strategy': 'scenedetect', 'downscale': detector.downscale, 'frame_skip': detector.frame_skip}
+        log.debug("Analyzing scene changes with PySceneDetect", downscale=detector.downscale or 'auto',
+                  frame_skip=detector.frame_skip)
+        
+        try:
+            start = time.perf_counter()
+            result = detector.detect_cuts(session.source, video_info['fps'])
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            log.warning("PySceneDetect analysis failed, using sampled frames", error=str(e))
+            return None, scan_plan
+        
+        session.record_open(result['open_time'])
+        frames_analyzed = -(-result['frames_read'] // (detector.frame_skip + 1))
+        scan_plan.update({
+            'frames_analyzed': frames_analyzed,
+            'cuts': len(result['cuts']),
+            'ms_per_frame': round(elapsed * 1000 / max(frames_analyzed, 1), 3)
+        })
+        return result['cuts'], scan_plan
+    
+    def _select_scene_changes(self, scene_changes: List[Dict], frame_count: int, duration: float,
+                              scan_plan: Optional[Dict] = None) -> List[Dict]:
+        """
+        Pick the largest changes, spaced out over the duration, sorted by time
+        
+        Candidates that look like a stronger candidate (dHash of the analysis
+        frame) are dropped first, so near-identical pictures never reach the
+        full-resolution decode and JPEG encode. The number dropped is recorded
+        in scan_plan.
+        """
+        distinct = suppress_duplicates(scene_changes, self.duplicate_distance)
+        if scan_plan is not None:
+            scan_plan['duplicates_suppressed'] = len(scene_changes) - len(distinct)
+        return select_scenes(distinct, frame_count, duration, self.selector)
+    
+    def analyze_clusters(self, video_path: str, frame_count: int = 4,
+                         session: Optional[DecodeSession] = None) -> Optional[Dict]:
+        """
+        Pick visually distinct frames by clustering the sampled frames
+        
+        The colour histograms of every 1% of the frames are clustered with
+        k-means (k = frame_count) and the sample closest to each centroid is
+        picked, so each frame stands for a different look of the video rather
+        than for its biggest jumps. Pure NumPy; no model is needed.
+        
+        Args:
+            video_path: Video file path or media URL
+            frame_count: Number of frames to select
+            session: Decode session shared with the other steps of the request
+            
+        Returns:
+            Dictionary with 'video_info', 'scenes' (dicts with 'frame_idx', 'timestamp'
+            and 'cluster_size', sorted by time) and 'scan', or None
+        """
+        try:
+            with observe_stage('analysis'), self._session_for(video_path, session) as session:
+                video_info = session.get_info()
+                if not video_info:
+                    return None
                 
-                ret, frame = cap.read()
-                if ret:
-                    # Save frame
-                    frame_filename = f"{video_name}_frame_{i+1:02d}_{int(timestamp):03d}s.jpg"
-                    frame_path = os.path.join(self.output_dir, frame_filename)
-                    
-                    # Optimize image quality
-                    success = cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                    
-                    if success:
-                        extracted_frames.append({
-                            'frame_number': i + 1,
-                            'timestamp': timestamp,
-                            'timestamp_str': str(timedelta(seconds=int(timestamp))),
-                            'file_path': frame_path,
-                            'file_name': frame_filename,
-                            'file_size': os.path.getsize(frame_path)
-                        })
-                        print(f"Frame extraction complete: {frame_filename} (time: {int(timestamp)}s)")
+                samples, scan_plan = self._sample_frames(session, video_info)
+                positions, histograms, _ = self._collect_histograms(samples, video_info, scan_plan)
+                
+                cluster_start = time.perf_counter()
+                representatives = representative_indices(histogram_features(histograms), frame_count)
+                scan_plan['cluster_ms'] = round((time.perf_counter() - cluster_start) * 1000, 3)
+                session.analysis = scan_plan
+                
+                return {
+                    'video_info': video_info,
+                    'scenes': [
+                        {'frame_idx': positions[i][0], 'timestamp': positions[i][1], 'cluster_size': size}
+                        for i, size in representatives
+                    ],
+                    'scan': scan_plan
+                }
             
-            cap.release()
-            return extracted_frames
+        except Exception as e:
+            log.error("Cluster analysis failed", video_path=video_path, error=str(e))
+            return None
+    
+    def analyze_storyboard(self, sheet_paths: List[str], storyboard: Dict, duration: float,
+                           frame_count: int = 4) -> Optional[Dict]:
+        """
+        Choose frame timestamps from storyboard sprite sheets
+        
+        Scores the thumbnails with the same histogram change metric as
+        analyze_scene_changes, so no video has to be downloaded or decoded.
+        
+        Args:
+            sheet_paths: Downloaded sprite sheet images in fragment order
+            storyboard: Storyboard format dictionary (see storyboard.select_storyboard_format)
+            duration: Video duration in seconds
+            frame_count: Number of frames to plan
+            
+        Returns:
+            Same dictionary as plan_frame_timestamps (without 'video_info'), or None
+        """
+        start_time = time.time()
+        
+        try:
+            with observe_stage('analysis'):
+                batcher = None
+                timestamps = []
+                
+                for timestamp, tile in iter_storyboard_tiles(sheet_paths, storyboard, duration):
+                    if batcher is None:
+                        width, height = analysis_size(tile.shape[1], tile.shape[0], self.analysis_width)
+                        batcher = FeatureBatcher(width, height, self.change_metric)
+                    batcher.add(tile)
+                    timestamps.append(timestamp)
+                
+                if batcher is None:
+                    return None
+                
+                change_scores = consecutive_changes(batcher.histograms(), self.change_metric)
+                scene_changes = [
+                    {'timestamp': timestamp, 'change_score': float(score), 'dhash': int(dhash)}
+                    for timestamp, score, dhash in zip(timestamps[1:], change_scores, batcher.hashes()[1:])
+                ]
+                
+                if not scene_changes:
+                    return None
+                
+                scan_plan = {}
+                targets = [
+                    {'timestamp': s['timestamp'], 'change_score': s['change_score']}
+                    for s in self._select_scene_changes(scene_changes, frame_count, duration, scan_plan)
+                ]
+                
+                # Supplement with time-based positions if insufficient
+                if len(targets) < frame_count and not scan_plan['duplicates_suppressed']:
+                    SCENE_TIME_FALLBACKS.inc(source='storyboard')
+                    for timestamp in self.get_time_positions(duration, frame_count - len(targets)):
+                        targets.append({'timestamp': timestamp})
+                    targets.sort(key=lambda x: x['timestamp'])
+                
+                log.debug("Storyboard analysis complete", thumbnails=len(scene_changes) + 1)
+                
+                return {
+                    'extraction_method': 'storyboard',
+                    'analysis_time': round(time.time() - start_time, 2),
+                    'targets': targets
+                }
             
         except Exception as e:
-            print(f"Time-based frame extraction failed: {str(e)}")
-            return []
+            log.warning("Storyboard analysis failed", error=str(e))
+            return None
     
-    def extract_frames_by_scene_change(self, video_path: str, frame_count: int = 4) -> List[Dict]:
+    def extract_frames_by_scene_change(self, video_path: str, frame_count: int = 4, output_name: Optional[str] = None,
+                                       analysis_mode: str = 'auto', session: Optional[DecodeSession] = None) -> List[Dict]:
         """
         Extract frames based on scene changes (more intelligent)
         
         Args:
             video_path: Video file path
             frame_count: Number of frames to extract
+            output_name: Base name for frame files (defaults to video file name)
+            analysis_mode: Candidate frames ('sampled', 'keyframes', 'auto')
+            session: Decode session shared with the other steps of the request
             
         Returns:
             List of extracted frame information
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            video_info = self.get_video_info(video_path)
+            with self._session_for(video_path, session) as session:
+                return self._extract_frames_by_scene_change(session, frame_count, output_name, analysis_mode)
             
-            if not video_info:
-                return []
-            
-            total_frames = video_info['total_frames']
-            fps = video_info['fps']
-            
-            # Histogram comparison for scene change detection
-            scene_changes = []
-            prev_hist = None
+        except Exception as e:
+            log.error("Scene-based frame extraction failed", video_path=video_path, error=str(e))
+            return []
+    
+    def _extract_frames_by_scene_change(self, session: DecodeSession, frame_count: int, output_name: Optional[str],
+                                        analysis_mode: str) -> List[Dict]:
+        """
+        Scene-based extraction through an open decode session
+        """
+        video_path = session.source
+        analysis = self.analyze_scene_changes(video_path, frame_count, analysis_mode, session)
+        if not analysis:
+            return []
+        
+        fps = analysis['video_info']['fps']
+        selected_scenes = analysis['scenes']
+        
+        # Supplement with time-based method if insufficient; after near-duplicates
+        # were suppressed, filler frames would only repeat pictures already selected
+        if len(selected_scenes) < frame_count and not analysis['scan'].get('duplicates_suppressed'):
+            log.info("Supplementing scene-based frames with time-based frames", scenes=len(selected_scenes),
+                     frame_count=frame_count)
+            SCENE_TIME_FALLBACKS.inc(source='scene')
+            time_based_frames = self._extract_frames_by_time(session, frame_count - len(selected_scenes), output_name)
             
-            # Sample every 1% of total frames for performance optimization
-            sample_interval = max(1, total_frames // 100)
+            # Merge results
+            extracted_frames = []
+            for scene in selected_scenes:
+                frames = self._extract_frame_at_timestamp(
+                    video_path, scene['timestamp'], len(extracted_frames) + 1, output_name, session
+                )
+                self._publish_frames(frames)
+                extracted_frames.extend(frames)
             
-            print("Analyzing scene changes...")
+            for frame in time_based_frames:
+                if len(extracted_frames) < frame_count:
+                    extracted_frames.append(frame)
             
-            for frame_idx in range(0, total_frames, sample_interval):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-                
-                if not ret:
-                    break
+            return extracted_frames
+        
+        # Extract frames at selected scene change points
+        extracted_frames = []
+        video_name = self._get_output_name(video_path, output_name)
+        
+        for i, scene in enumerate(selected_scenes):
+            timestamp = scene['timestamp']
+            frame_number = int(timestamp * fps)
+            ret, frame = session.read_frame(frame_number)
+            if ret:
+                # Save frame
+                frame_filename = f"{video_name}_frame_{i+1:02d}_{int(timestamp):03d}s.jpg"
+                frame_path = os.path.join(self.output_dir, frame_filename)
                 
-                # Calculate RGB histogram
-                hist = cv2.calcHist([frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
+                success = self._write_jpeg(frame_path, frame)
                 
-                if prev_hist is not None:
-                    # Calculate histogram difference (scene change degree)
-                    diff = cv2.compareHist(hist, prev_hist, cv2.HISTCMP_CORREL)
-                    scene_changes.append({
-                        'frame_idx': frame_idx,
-                        'timestamp': frame_idx / fps,
-                        'change_score': 1 - diff  # Higher value means bigger change
+                if success:
+                    extracted_frames.append({
+                        'frame_number': i + 1,
+                        'timestamp': timestamp,
+                        'timestamp_str': str(timedelta(seconds=int(timestamp))),
+                        'file_path': frame_path,
+                        'file_name': frame_filename,
+                        'file_size': os.path.getsize(frame_path),
+                        'change_score': scene['change_score']
                     })
-                
-                prev_hist = hist
-            
-            # Select points with largest scene changes
-            scene_changes.sort(key=lambda x: x['change_score'], reverse=True)
-            
-            # Remove frames too close in time (minimum 10 seconds apart)
-            min_interval = 10  # seconds
-            selected_scenes = []
-            
-            for scene in scene_changes:
-                is_too_close = False
-                for selected in selected_scenes:
-                    if abs(scene['timestamp'] - selected['timestamp']) < min_interval:
-                        is_too_close = True
-                        break
-                
-                if not is_too_close:
-                    selected_scenes.append(scene)
-                    
-                if len(selected_scenes) >= frame_count:
-                    break
-            
-            # Sort by time
-            selected_scenes.sort(key=lambda x: x['timestamp'])
+                    self._publish_frames(extracted_frames[-1:])
+                    log.debug("Frame extracted", file_name=frame_filename, change_score=round(scene['change_score'], 3))
+        
+        return extracted_frames
+    
+    def extract_frames_by_cluster(self, video_path: str, frame_count: int = 4, output_name: Optional[str] = None,
+                                  session: Optional[DecodeSession] = None) -> List[Dict]:
+        """
+        Extract the frame closest to each cluster of visually similar frames
+        
+        Args:
+            video_path: Video file path
+            frame_count: Number of frames to extract
+            output_name: Base name for frame files (defaults to video file name)
+            session: Decode session shared with the other steps of the request
             
-            # Supplement with time-based method if insufficient
-            if len(selected_scenes) < frame_count:
-                print(f"Scene-based method found only {len(selected_scenes)} frames, supplementing with time-based method")
-                time_based_frames = self.extract_frames_by_time(video_path, frame_count - len(selected_scenes))
+        Returns:
+            List of extracted frame information
+        """
+        try:
+            with self._session_for(video_path, session) as session:
+                analysis = self.analyze_clusters(video_path, frame_count, session)
+                if not analysis:
+                    return []
                 
-                # Merge results
                 extracted_frames = []
-                for scene in selected_scenes:
-                    extracted_frames.extend(self._extract_frame_at_timestamp(video_path, scene['timestamp'], len(extracted_frames) + 1))
-                
-                for frame in time_based_frames:
-                    if len(extracted_frames) < frame_count:
-                        extracted_frames.append(frame)
-                
-                cap.release()
+                for scene in analysis['scenes']:
+                    frames = self._extract_frame_at_timestamp(
+                        video_path, scene['timestamp'], len(extracted_frames) + 1, output_name, session
+                    )
+                    for frame in frames:
+                        frame['cluster_size'] = scene['cluster_size']
+                        log.debug("Frame extracted", file_name=frame['file_name'], cluster_size=scene['cluster_size'])
+                    self._publish_frames(frames)
+                    extracted_frames.extend(frames)
                 return extracted_frames
             
-            # Extract frames at selected scene change points
-            extracted_frames = []
-            video_name = os.path.splitext(os.path.basename(video_path))[0]
-            
-            for i, scene in enumerate(selected_scenes):
-                timestamp = scene['timestamp']
-                frame_number = int(timestamp * fps)
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-                
-                ret, frame = cap.read()
-                if ret:
-                    # Save frame
-                    frame_filename = f"{video_name}_frame_{i+1:02d}_{int(timestamp):03d}s.jpg"
-                    frame_path = os.path.join(self.output_dir, frame_filename)
-                    
-                    success = cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                    
-                    if success:
-                        extracted_frames.append({
-                            'frame_number': i + 1,
-                            'timestamp': timestamp,
-                            'timestamp_str': str(timedelta(seconds=int(timestamp))),
-                            'file_path': frame_path,
-                            'file_name': frame_filename,
-                            'file_size': os.path.getsize(frame_path),
-                            'change_score': scene['change_score']
-                        })
-                        print(f"Scene-based frame extraction complete: {frame_filename} (change score: {scene['change_score']:.3f})")
-            
-            cap.release()
-            return extracted_frames
-            
         except Exception as e:
-            print(f"Scene-based frame extraction failed: {str(e)}")
+            log.error("Cluster-based frame extraction failed", video_path=video_path, error=str(e))
             return []
     
-    def _extract_frame_at_timestamp(self, video_path: str, timestamp: float, frame_number: int) -> List[Dict]:
+    def _extract_frame_at_timestamp(self, video_path: str, timestamp: float, frame_number: int, output_name: Optional[str] = None,
+                                    session: Optional[DecodeSession] = None) -> List[Dict]:
         """
         Extract a single frame at specified timestamp
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            video_info = self.get_video_info(video_path)
-            
-            if not video_info:
-                cap.release()
-                return []
-            
-            fps = video_info['fps']
-            frame_idx = int(timestamp * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            with self._session_for(video_path, session) as session:
+                video_info = session.get_info()
+                if not video_info:
+                    return []
+                
+                fps = video_info['fps']
+                frame_idx = int(timestamp * fps)
+                ret, frame = session.read_frame(frame_idx)
             
-            ret, frame = cap.read()
             if ret:
-                video_name = os.path.splitext(os.path.basename(video_path))[0]
+                video_name = self._get_output_name(video_path, output_name)
                 frame_filename = f"{video_name}_frame_{frame_number:02d}_{int(timestamp):03d}s.jpg"
                 frame_path = os.path.join(self.output_dir, frame_filename)
                 
-                success = cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                success = self._write_jpeg(frame_path, frame)
                 
                 if success:
-                    cap.release()
                     return [{
                         'frame_number': frame_number,
                         'timestamp': timestamp,
@@ -284,30 +828,127 @@ class FrameExtractor:
                         'file_size': os.path.getsize(frame_path)
                     }]
             
-            cap.release()
             return []
             
         except Exception as e:
-            print(f"Single frame extraction failed: {str(e)}")
+            log.warning("Single frame extraction failed", timestamp=timestamp, error=str(e))
             return []
     
-    def extract_representative_frames(self, video_path: str, method: str = 'auto', frame_count: int = 4) -> Dict:
+    def resolve_method(self, method: str, duration: float, has_storyboard: bool = False) -> str:
+        """
+        Resolve 'auto' to a concrete extraction method
+        
+        Args:
+            method: Requested extraction method
+            duration: Video duration in seconds
+            has_storyboard: Whether storyboard sprite sheets are available (remote videos only)
+            
+        Returns:
+            Extraction method
+        """
+        if method == 'auto':
+            # Use scene-based for videos longer than 5 minutes, time-based for shorter videos;
+            # long videos with a storyboard are scored on its thumbnails
+            if duration > 300:
+                return 'storyboard' if has_storyboard else 'scene'
+            return 'time'
+        if method == 'storyboard' and not has_storyboard:
+            return 'scene'
+        if method == 'adaptive' and not adaptive_scene_detector.is_available():
+            return 'scene'
+        return method
+    
+    def plan_frame_timestamps(self, video_path: str, method: str = 'auto', frame_count: int = 4,
+                              analysis_mode: str = 'auto', session: Optional[DecodeSession] = None) -> Optional[Dict]:
+        """
+        Choose frame timestamps without writing any frames
+        
+        First tier of two-tier extraction: runs on a low-quality copy of the video,
+        so the analysis cost does not depend on the requested output quality.
+        
+        Args:
+            video_path: Video file path or media URL (analysis quality)
+            method: Extraction method ('time', 'scene', 'adaptive', 'cluster', 'auto')
+            frame_count: Number of frames to plan
+            analysis_mode: Scene candidate frames ('sampled', 'keyframes', 'auto')
+            session: Decode session to analyze through (opened here if not given)
+            
+        Returns:
+            Dictionary with 'video_info', 'extraction_method', 'analysis_time',
+            'targets' (dicts with 'timestamp' and optional 'change_score' or 'cluster_size'),
+            'scan' (scene and cluster analysis only) and 'decode_session' stats, or None
+        """
+        start_time = time.time()
+        
+        with self._session_for(video_path, session) as session:
+            video_info = session.get_info()
+            if not video_info:
+                return None
+            
+            duration = video_info['duration']
+            actual_method = self.resolve_method(method, duration)
+            
+            scan_plan = None
+            if actual_method in ('scene', 'adaptive'):
+                if actual_method == 'adaptive':
+                    analysis_mode = 'scenedetect'
+                analysis = self.analyze_scene_changes(video_path, frame_count, analysis_mode, session)
+                if not analysis:
+                    return None
+                scan_plan = analysis['scan']
+                targets = [{'timestamp': s['timestamp'], 'change_score': s['change_score']} for s in analysis['scenes']]
+                
+                # Supplement with time-based positions if insufficient
+                if len(targets) < frame_count and not scan_plan.get('duplicates_suppressed'):
+                    SCENE_TIME_FALLBACKS.inc(source='plan')
+                    for timestamp in self.get_time_positions(duration, frame_count - len(targets)):
+                        targets.append({'timestamp': timestamp})
+                    targets.sort(key=lambda x: x['timestamp'])
+            elif actual_method == 'cluster':
+                analysis = self.analyze_clusters(video_path, frame_count, session)
+                if not analysis:
+                    return None
+                scan_plan = analysis['scan']
+                targets = [{'timestamp': s['timestamp'], 'cluster_size': s['cluster_size']} for s in analysis['scenes']]
+            else:
+                targets = [{'timestamp': t} for t in self.get_time_positions(duration, frame_count)]
+            
+            return {
+                'video_info': video_info,
+                'extraction_method': actual_method,
+                'analysis_time': round(time.time() - start_time, 2),
+                'targets': targets,
+                'scan': scan_plan,
+                'decode_session': session.get_stats()
+            }
+    
+    def extract_representative_frames(self, video_path: str, method: str = 'auto', frame_count: int = 4,
+                                      output_name: Optional[str] = None, analysis_mode: str = 'auto') -> Dict:
         """
         Extract representative frames using specified method
         
         Args:
             video_path: Video file path
-            method: Extraction method ('time', 'scene', 'auto')
+            method: Extraction method ('time', 'scene', 'adaptive', 'cluster', 'storyboard', 'auto');
+                'adaptive' selects among PySceneDetect's AdaptiveDetector cuts (scene detection
+                without PySceneDetect), local files have no storyboard, so 'storyboard' runs
+                scene detection
             frame_count: Number of frames to extract
+            output_name: Base name for frame files (defaults to video file name)
+            analysis_mode: Scene candidate frames ('sampled', 'keyframes', 'auto')
             
         Returns:
-            Extraction result dictionary
+            Extraction result dictionary ('decode_session' holds open count and setup time,
+            'analysis' the scene or cluster analysis scan and per-frame timings)
         """
         start_time = time.time()
         
+        # Every step below decodes through this one open video
+        session = DecodeSession(video_path)
+        
         try:
             # Get video information
-            video_info = self.get_video_info(video_path)
+            video_info = self.get_video_info(video_path, session)
             if not video_info:
                 return {
                     'success': False,
@@ -316,16 +957,17 @@ class FrameExtractor:
                 }
             
             # Determine extraction method
-            actual_method = method
-            if method == 'auto':
-                # Use scene-based for videos longer than 5 minutes, time-based for shorter videos
-                actual_method = 'scene' if video_info['duration'] > 300 else 'time'
+            actual_method = self.resolve_method(method, video_info['duration'])
             
             # Extract frames
             if actual_method == 'scene':
-                frames = self.extract_frames_by_scene_change(video_path, frame_count)
+                frames = self.extract_frames_by_scene_change(video_path, frame_count, output_name, analysis_mode, session)
+            elif actual_method == 'adaptive':
+                frames = self.extract_frames_by_scene_change(video_path, frame_count, output_name, 'scenedetect', session)
+            elif actual_method == 'cluster':
+                frames = self.extract_frames_by_cluster(video_path, frame_count, output_name, session)
             else:  # time
-                frames = self.extract_frames_by_time(video_path, frame_count)
+                frames = self.extract_frames_by_time(video_path, frame_count, output_name, session)
             
             if not frames:
                 return {
@@ -344,7 +986,117 @@ class FrameExtractor:
                 'extraction_time': round(time.time() - start_time, 2),
                 'frames_extracted': len(frames),
                 'frames': frames,
-                'total_size': total_size
+                'total_size': total_size,
+                'decode_session': session.get_stats(),
+                'analysis': session.analysis
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'extraction_time': time.time() - start_time
+            }
+        finally:
+            session.close()
+    
+    def extract_frames_from_clips(self, clips: List[Dict], duration: float, output_name: str,
+                                  method: str = 'time') -> Dict:
+        """
+        Extract one frame per clip from a partial (time range) download
+        
+        Args:
+            clips: Clip dictionaries with 'timestamp', 'start', 'file_path' and optional
+                'change_score' or 'cluster_size'
+            duration: Full video duration in seconds (from metadata)
+            output_name: Base name for frame files
+            method: Method that chose the timestamps (reported in the result)
+            
+        Returns:
+            Extraction result dictionary (same format as extract_representative_frames)
+        """
+        start_time = time.time()
+        
+        try:
+            extracted_frames = []
+            clip_info = None
+            decode_stats = {'open_count': 0, 'setup_time': 0.0, 'backend': None}
+            
+            for i, clip in enumerate(clips):
+                timestamp = clip['timestamp']
+                # Every clip is its own file, so each one is opened once
+                with DecodeSession(clip['file_path']) as clip_session:
+                    cap = clip_session.capture
+                    if not cap.isOpened():
+                        log.warning("Cannot open clip", file_path=clip['file_path'])
+                        continue
+                    
+                    if clip_info is None:
+                        clip_info = clip_session.get_info()
+                    
+                    # Clips are cut to start exactly at clip['start']
+                    cap.set(cv2.CAP_PROP_POS_MSEC, max(0.0, timestamp - clip['start']) * 1000)
+                    ret, frame = cap.read()
+                    if not ret:
+                        # Seeking past the last decodable frame of a short clip
+                        ret, frame = clip_session.read_frame(0)
+                    
+                    stats = clip_session.get_stats()
+                    decode_stats['open_count'] += stats['open_count']
+                    decode_stats['setup_time'] += stats['setup_time']
+                    decode_stats['backend'] = stats['backend']
+                
+                if ret:
+                    frame_filename = f"{output_name}_frame_{i+1:02d}_{int(timestamp):03d}s.jpg"
+                    frame_path = os.path.join(self.output_dir, frame_filename)
+                    
+                    success = self._write_jpeg(frame_path, frame)
+                    
+                    if success:
+                        extracted_frames.append({
+                            'frame_number': i + 1,
+                            'timestamp': timestamp,
+                            'timestamp_str': str(timedelta(seconds=int(timestamp))),
+                            'file_path': frame_path,
+                            'file_name': frame_filename,
+                            'file_size': os.path.getsize(frame_path)
+                        })
+                        for key in ('change_score', 'cluster_size'):
+                            if clip.get(key) is not None:
+                                extracted_frames[-1][key] = clip[key]
+                        self._publish_frames(extracted_frames[-1:])
+                        log.debug("Frame extracted", file_name=frame_filename, timestamp=int(timestamp))
+            
+            if not extracted_frames:
+                return {
+                    'success': False,
+                    'error': 'No frames extracted',
+                    'extraction_time': time.time() - start_time
+                }
+            
+            fps = clip_info['fps']
+            video_info = {
+                'total_frames': int(duration * fps),
+                'fps': fps,
+                'width': clip_info['width'],
+                'height': clip_info['height'],
+                'duration': duration,
+                'duration_str': str(timedelta(seconds=int(duration)))
+            }
+            
+            return {
+                'success': True,
+                'video_info': video_info,
+                'extraction_method': method,
+                'extraction_time': round(time.time() - start_time, 2),
+                'frames_extracted': len(extracted_frames),
+                'frames': extracted_frames,
+                'total_size': sum(frame['file_size'] for frame in extracted_frames),
+                'decode_session': {
+                    'open_count': decode_stats['open_count'],
+                    'setup_time': round(decode_stats['setup_time'], 4),
+                    'backend': decode_stats['backend']
+                }
             }
             
         except Exception as e:
@@ -354,6 +1106,106 @@ class FrameExtractor:
                 'extraction_time': time.time() - start_time
             }
     
+    def extract_frames_at_timestamps(self, video_path: str, targets: List[Dict], output_name: str,
+                                     method: str = 'time') -> Dict:
+        """
+        Extract frames at already chosen timestamps
+        
+        Second tier of two-tier extraction: only seeks to the planned positions, so
+        a high-quality stream is read just around those frames.
+        
+        Args:
+            video_path: Video file path or media URL (output quality)
+            targets: Dicts with 'timestamp' and optional 'change_score' or 'cluster_size'
+                (see plan_frame_timestamps)
+            output_name: Base name for frame files
+            method: Method that chose the timestamps (reported in the result)
+            
+        Returns:
+            Extraction result dictionary (same format as extract_representative_frames)
+        """
+        start_time = time.time()
+        
+        session = DecodeSession(video_path)
+        
+        try:
+            video_info = session.get_info()
+            if not video_info:
+                return {
+                    'success': False,
+                    'error': 'Failed to open video',
+                    'extraction_time': time.time() - start_time
+                }
+            
+            fps = video_info['fps']
+            extracted_frames = []
+            for i, target in enumerate(targets):
+                timestamp = target['timestamp']
+                ret, frame = session.read_frame(int(timestamp * fps))
+                if ret:
+                    frame_filename = f"{output_name}_frame_{i+1:02d}_{int(timestamp):03d}s.jpg"
+                    frame_path = os.path.join(self.output_dir, frame_filename)
+                    
+                    success = self._write_jpeg(frame_path, frame)
+                    
+                    if success:
+                        extracted_frames.append({
+                            'frame_number': i + 1,
+                            'timestamp': timestamp,
+                            'timestamp_str': str(timedelta(seconds=int(timestamp))),
+                            'file_path': frame_path,
+                            'file_name': frame_filename,
+                            'file_size': os.path.getsize(frame_path)
+                        })
+                        for key in ('change_score', 'cluster_size'):
+                            if target.get(key) is not None:
+                                extracted_frames[-1][key] = target[key]
+                        self._publish_frames(extracted_frames[-1:])
+                        log.debug("Frame extracted", file_name=frame_filename, timestamp=int(timestamp))
+            
+            if not extracted_frames:
+                return {
+                    'success': False,
+                    'error': 'No frames extracted',
+                    'extraction_time': time.time() - start_time
+                }
+            
+            return {
+                'success': True,
+                'video_info': video_info,
+                'extraction_method': method,
+                'extraction_time': round(time.time() - start_time, 2),
+                'frames_extracted': len(extracted_frames),
+                'frames': extracted_frames,
+                'total_size': sum(frame['file_size'] for frame in extracted_frames),
+                'decode_session': session.get_stats()
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'extraction_time': time.time() - start_time
+            }
+        finally:
+            session.close()
+    
+    def _write_jpeg(self, frame_path: str, frame: np.ndarray) -> bool:
+        """
+        Encode and save an output frame (timed as the 'jpeg_encode' stage)
+        """
+        with observe_stage('jpeg_encode'):
+            return cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    
+    def _publish_frames(self, frames: List[Dict]):
+        """
+        Report frames whose JPEG was just written to the running extraction's queue, if any
+        """
+        frame_queue = _frame_queue.get()
+        if frame_queue is not None:
+            for frame in frames:
+                frame_queue.put(frame)
+    
     def cleanup_frames(self, frame_paths: List[str]) -> bool:
         """
         Clean up extracted frame files
@@ -366,24 +1218,52 @@ class FrameExtractor:
         """
         try:
             success_count = 0
-            for file_path in frame_paths:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    success_count += 1
+            with observe_stage('cleanup'):
+                for file_path in frame_paths:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                        success_count += 1
             
-            print(f"Frame cleanup complete: {success_count} files deleted")
+            log.debug("Frame cleanup complete", files=success_count)
             return success_count > 0
             
         except Exception as e:
-            print(f"Frame cleanup failed: {str(e)}")
+            log.warning("Frame cleanup failed", error=str(e))
             return False
 
 # Create global instance
 frame_extractor = FrameExtractor()
 
-# Convenience functions
-def extract_video_frames(video_path: str, method: str = 'auto', frame_count: int = 4) -> Dict:
-    return frame_extractor.extract_representative_frames(video_path, method, frame_count)
+@contextlib.contextmanager
+def _publishing_to(frame_queue):
+    token = _frame_queue.set(frame_queue)
+    try:
+        yield
+    finally:
+        _frame_queue.reset(token)
+
+# Convenience functions; frame_queue (see ExtractionExecutor.create_queue) receives
+# each frame information dict as soon as its JPEG is written
+def extract_video_frames(video_path: str, method: str = 'auto', frame_count: int = 4, output_name: Optional[str] = None,
+                         analysis_mode: str = 'auto', frame_queue=None) -> Dict:
+    with _publishing_to(frame_queue):
+        return frame_extractor.extract_representative_frames(video_path, method, frame_count, output_name, analysis_mode)
 
 def get_video_info(video_path: str) -> Optional[Dict]:
-    return frame_extractor.get_video_info(video_path) 
\ No newline at end of file
+    return frame_extractor.get_video_info(video_path) 
+
+def extract_clip_frames(clips: List[Dict], duration: float, output_name: str, method: str = 'time',
+                        frame_queue=None) -> Dict:
+    with _publishing_to(frame_queue):
+        return frame_extractor.extract_frames_from_clips(clips, duration, output_name, method)
+
+def plan_video_frames(video_path: str, method: str = 'auto', frame_count: int = 4, analysis_mode: str = 'auto') -> Optional[Dict]:
+    return frame_extractor.plan_frame_timestamps(video_path, method, frame_count, analysis_mode)
+
+def extract_timestamp_frames(video_path: str, targets: List[Dict], output_name: str, method: str = 'time',
+                             frame_queue=None) -> Dict:
+    with _publishing_to(frame_queue):
+        return frame_extractor.extract_frames_at_timestamps(video_path, targets, output_name, method)
+
+def plan_storyboard_frames(sheet_paths: List[str], storyboard: Dict, duration: float, frame_count: int = 4) -> Optional[Dict]:
+    return frame_extractor.analyze_storyboard(sheet_paths, storyboard, duration, frame_count)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import cv2
+import os
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+from decode_session import DecodeSession
+
+# Seek cost beyond decoding from the previous keyframe, in frame decodes. OpenCV
+# seeks 16 frames before the target and decodes forward, plus demuxer seek and
+# decoder flush; calibrated with benchmarks/scan_crossover.py
+SEEK_OVERHEAD_FRAMES = float(os.environ.get('PROMPTSNAP_SEEK_OVERHEAD_FRAMES', 20))
+
+# Remote sources pay a range request per seek
+STREAM_SEEK_OVERHEAD_FRAMES = float(os.environ.get('PROMPTSNAP_STREAM_SEEK_OVERHEAD_FRAMES', 60))
+
+# Packets read when probing the keyframe interval
+GOP_PROBE_PACKETS = 600
+
+
+class FrameScanner:
+    def __init__(self, seek_overhead: float = SEEK_OVERHEAD_FRAMES,
+                 stream_seek_overhead: float = STREAM_SEEK_OVERHEAD_FRAMES):
+        """
+        Initialize sampled frame scanner
+
+        Reading every Nth frame can be done two ways: seek to each sample (the
+        decoder restarts at the previous keyframe and decodes forward), or walk
+        the video once with grab() and only retrieve the samples. Which is cheaper
+        depends on the keyframe interval (GOP) and the sample spacing.
+
+        Args:
+            seek_overhead: Fixed cost of one seek on a local file, in frame decodes
+            stream_seek_overhead: Fixed cost of one seek on a remote URL, in frame decodes
+        """
+        self.seek_overhead = seek_overhead
+        self.stream_seek_overhead = stream_seek_overhead
+
+    def probe_gop(self, source: str, max_packets: int = GOP_PROBE_PACKETS) -> Optional[float]:
+        """
+        Measure the average keyframe interval from packet flags (nothing is decoded)
+
+        Args:
+            source: Video file path or media URL
+            max_packets: Number of packets to inspect
+
+        Returns:
+            Average distance between keyframes in frames, or None if unknown
+        """
+        cap = cv2.VideoCapture(source)
+        try:
+            if not cap.isOpened() or not cap.set(cv2.CAP_PROP_FORMAT, -1):
+                return None
+
+            keyframes = []
+            packets = 0
+            while packets < max_packets and cap.grab():
+                if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                    keyframes.append(packets)
+                packets += 1
+        except cv2.error:
+            return None
+        finally:
+            cap.release()
+
+        if not keyframes or packets == 0:
+            return None
+        if len(keyframes) == 1:
+            # Only the first keyframe seen: the GOP is at least the probed length
+            return float(packets)
+        return (keyframes[-1] - keyframes[0]) / (len(keyframes) - 1)
+
+    def choose_strategy(self, sample_interval: int, gop: Optional[float], is_stream: bool = False) -> str:
+        """
+        Pick the cheaper way to read every sample_interval-th frame
+
+        Per sample, a linear scan decodes sample_interval frames, while a seek
+        decodes on average half a GOP plus the fixed seek overhead, however
+        close the samples are.
+
+        Args:
+            sample_interval: Distance between sampled frames
+            gop: Average keyframe interval in frames (None: unknown)
+            is_stream: Whether the source is a remote URL
+
+        Returns:
+            'linear' or 'seek'
+        """
+        overhead = self.stream_seek_overhead if is_stream else self.seek_overhead
+        if gop is None:
+            # Unknown GOP: assume the common 2-second interval at 30 fps
+            gop = 60
+        return 'linear' if sample_interval <= gop / 2 + overhead else 'seek'
+
+    def scan(self, cap: cv2.VideoCapture, frame_indices: List[int], strategy: str) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Read the given frames in increasing order
+
+        Args:
+            cap: Open VideoCapture
+            frame_indices: Sorted frame indices to read
+            strategy: 'linear' (grab every frame, retrieve samples) or 'seek'
+
+        Yields:
+            (frame_index, frame) pairs; stops early at the end of the stream
+        """
+        if strategy == 'linear':
+            # A shared capture may already be past the first sample
+            position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if frame_indices and position > frame_indices[0]:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_indices[0])
+                position = frame_indices[0]
+            for frame_idx in frame_indices:
+                while position < frame_idx:
+                    if not cap.grab():
+                        return
+                    position += 1
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                position += 1
+                yield frame_idx, frame
+        else:
+            for frame_idx in frame_indices:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                yield frame_idx, frame
+
+    def plan_scan(self, session: DecodeSession, sample_interval: int) -> Dict:
+        """
+        Probe the source and choose a scan strategy
+
+        Args:
+            session: Decode session of the video (caches the GOP probe)
+            sample_interval: Distance between sampled frames
+
+        Returns:
+            Dictionary with 'strategy', 'gop' and 'sample_interval'
+        """
+        if sample_interval <= 1:
+            # Every frame is needed, seeking can only add work
+            return {'strategy': 'linear', 'gop': None, 'sample_interval': sample_interval}
+
+        # Probing a remote source would download the packets it reads
+        gop = None if session.is_stream else session.get_gop(self.probe_gop)
+        return {
+            'strategy': self.choose_strategy(sample_interval, gop, session.is_stream),
+            'gop': round(gop, 1) if gop else None,
+            'sample_interval': sample_interval,
+        }
+
+
+# Create global instance
+frame_scanner = FrameScanner()
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pipeline_progress import PIPELINE_STAGES, listen
+from structured_log import get_logger, request_context
+
+log = get_logger('jobs')
+
+JOB_DB_PATH = os.environ.get('PROMPTSNAP_JOB_DB', os.path.join('temp', 'jobs.sqlite3'))
+JOB_WORKERS = int(os.environ.get('PROMPTSNAP_JOB_WORKERS', 2))
+# Finished jobs (and their results) are kept this many seconds
+JOB_TTL = float(os.environ.get('PROMPTSNAP_JOB_TTL', 86400))
+# Progress of a running stage is stored at most once per this many seconds
+JOB_PROGRESS_INTERVAL = float(os.environ.get('PROMPTSNAP_JOB_PROGRESS_INTERVAL', 0.5))
+
+
+class JobQueue:
+    def __init__(self, db_path: Optional[str] = None, workers: Optional[int] = None, ttl: Optional[float] = None,
+                 progress_interval: Optional[float] = None):
+        """
+        Initialize persistent extraction job queue
+
+        Jobs are stored in SQLite so that queued work and finished results survive
+        a restart; jobs that were running when the server stopped are queued again.
+        A pool of worker tasks on the event loop takes jobs off the queue, while the
+        blocking stages still go through the extraction executor's limits. All
+        database access runs on one thread of its own, never on the event loop;
+        progress writes are queued there without waiting for them.
+
+        Args:
+            db_path: SQLite database file (defaults to PROMPTSNAP_JOB_DB or temp/jobs.sqlite3)
+            workers: Number of jobs processed at the same time (defaults to PROMPTSNAP_JOB_WORKERS or 2)
+            ttl: Seconds finished jobs are kept (defaults to PROMPTSNAP_JOB_TTL or 86400)
+            progress_interval: Minimum seconds between stored progress updates of a stage
+                (defaults to PROMPTSNAP_JOB_PROGRESS_INTERVAL or 0.5); stage starts and ends are always stored
+        """
+        self.db_path = db_path or JOB_DB_PATH
+        self.workers = workers or JOB_WORKERS
+        self.ttl = ttl if ttl is not None else JOB_TTL
+        self.progress_interval = progress_interval if progress_interval is not None else JOB_PROGRESS_INTERVAL
+
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # Runs every database call, in submission order
+        self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='promptsnap-jobs')
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._done_events: Dict[str, asyncio.Event] = {}
+        # When the progress of a (job, stage) was last stored
+        self._progress_written: Dict[tuple, float] = {}
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'requeued': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory and self.db_path != ':memory:':
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, stages TEXT NOT NULL, "
+                "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        return self._db
+
+    async def _run_db(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_thread, partial(func, *args, **kwargs))
+
+    def _write_later(self, func, *args, **kwargs):
+        """Queue a database write without waiting for it (callable from any thread)"""
+        def log_failure(future: Future):
+            if future.exception() is not None:
+                log.warning("Job database write failed", error=str(future.exception()))
+        self._db_thread.submit(func, *args, **kwargs).add_done_callback(log_failure)
+
+    async def submit(self, request: Dict) -> Dict:
+        """
+        Store a new job and queue it for the workers
+
+        Args:
+            request: JSON-serializable job parameters passed to the runner
+
+        Returns:
+            Job dictionary (see get)
+        """
+        job_id = uuid.uuid4().hex
+        await self._run_db(self._insert, job_id, request)
+        self._stats['submitted'] += 1
+
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    def _insert(self, job_id: str, request: Dict):
+        now = time.time()
+        stages = {stage: {'status': 'pending'} for stage in PIPELINE_STAGES}
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, status, request, stages, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(request), json.dumps(stages), now, now)
+            )
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job
+
+        Args:
+            job_id: Job ID returned by submit
+
+        Returns:
+            Dictionary with id, status ('queued', 'running', 'completed', 'failed'),
+            request, per-stage progress, overall progress, result, error and
+            queue position, or None for an unknown (or expired) job
+        """
+        return await self._run_db(self._read, job_id)
+
+    def _read(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, status, request, stages, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row[1] == 'queued':
+                position = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (row[6],)
+                ).fetchone()[0]
+
+        stages = json.loads(row[3])
+        finished = sum(
+            1.0 if stage['status'] in ('done', 'skipped') else
+            (stage.get('progress') or 0.0) if stage['status'] == 'running' else 0.0
+            for stage in stages.values()
+        )
+        return {
+            'id': row[0],
+            'status': row[1],
+            'request': json.loads(row[2]),
+            'stages': stages,
+            'progress': 1.0 if row[1] == 'completed' else round(finished / len(stages), 2),
+            'queue_position': position,
+            'result': json.loads(row[4]) if row[4] else None,
+            'error': row[5],
+            'created_at': row[6],
+            'updated_at': row[7],
+        }
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """
+        Wait until a job finishes or the timeout passes
+
+        Args:
+            job_id: Job ID
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Job dictionary as it is after waiting, or None for an unknown job
+        """
+        job = await self.get(job_id)
+        if job is None or job['status'] in ('completed', 'failed') or timeout <= 0:
+            return job
+
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await self.get(job_id)
+
+    def _update_stage(self, job_id: str, stage: str, **fields):
+        with self._lock:
+            db = self._connect()
+            row = db.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row[0])
+            stages.setdefault(stage, {}).update(fields)
+            db.execute("UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                       (json.dumps(stages), time.time(), job_id))
+
+    def _on_progress(self, job_id: str, event: Dict):
+        """Queue the write of a pipeline progress event (see pipeline_progress.listen) of a running job"""
+        if event['type'] == 'stage':
+            self._progress_written.pop((job_id, event['stage']), None)
+
+        if event['type'] == 'stage' and event['status'] == 'running':
+            # Again, when a pipeline falls back and repeats the stage
+            self._write_later(self._update_stage, job_id, event['stage'], status='running', progress=None,
+                              started_at=time.time(), finished_at=None)
+        elif event['type'] == 'stage' and event['status'] == 'done':
+            self._write_later(self._update_stage, job_id, event['stage'], status='done', progress=1.0,
+                              finished_at=time.time())
+        elif event['type'] == 'stage':
+            self._write_later(self._update_stage, job_id, event['stage'], status=event['status'],
+                              finished_at=time.time())
+        elif event['type'] == 'progress':
+            # Downloads report every chunk; each update is a database write
+            now = time.monotonic()
+            key = (job_id, event['stage'])
+            if now - self._progress_written.get(key, float('-inf')) < self.progress_interval:
+                return
+            self._progress_written[key] = now
+            self._write_later(self._update_stage, job_id, event['stage'], progress=event['progress'])
+
+    async def _finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        # Queued behind the job's pending progress writes
+        await self._run_db(self._store_outcome, job_id, status, result, error)
+        self._stats[status] += 1
+
+        event = self._done_events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def _store_outcome(self, job_id: str, status: str, result: Optional[Dict], error: Optional[str]):
+        with self._lock:
+            db = self._connect()
+            row = db.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None:
+                stages = json.loads(row[0])
+                for stage in stages.values():
+                    # Stages the chosen pipeline never needed (e.g. no metadata lookup for full downloads)
+                    if status == 'completed' and stage['status'] == 'pending':
+                        stage['status'] = 'skipped'
+                db.execute(
+                    "UPDATE jobs SET status = ?, stages = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (status, json.dumps(stages), json.dumps(result) if result is not None else None,
+                     error, time.time(), job_id)
+                )
+
+    def _claim(self, job_id: str) -> Optional[Dict]:
+        """Mark a queued job running; returns its request (None if it is not queued any more)"""
+        with self._lock:
+            db = self._connect()
+            row = db.execute("SELECT request FROM jobs WHERE id = ? AND status = 'queued'", (job_id,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (time.time(), job_id))
+        return json.loads(row[0])
+
+    async def _run_job(self, job_id: str, runner: Callable[[Dict], Awaitable[Dict]]):
+        request = await self._run_db(self._claim, job_id)
+        if request is None:
+            return
+
+        try:
+            # Log records of the job carry the job ID as correlation ID
+            with listen(partial(self._on_progress, job_id)), request_context(job_id):
+                log.info("Job started", job_id=job_id)
+                result = await runner(request)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job 'running' so the next start queues it again
+            raise
+        except Exception as e:
+            error = getattr(e, 'detail', None) or str(e)
+            log.warning("Job failed", job_id=job_id, error=error)
+            await self._finish(job_id, 'failed', error=error)
+        else:
+            log.info("Job completed", job_id=job_id)
+            await self._finish(job_id, 'completed', result=result)
+
+    async def _worker(self, runner: Callable[[Dict], Awaitable[Dict]]):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id, runner)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("Job could not be processed", job_id=job_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def start(self, runner: Callable[[Dict], Awaitable[Dict]]):
+        """
+        Start the worker pool on the running event loop
+
+        Expired finished jobs are deleted and unfinished jobs from a previous run
+        are queued again, oldest first.
+
+        Args:
+            runner: Coroutine function that takes a job's request and returns its result
+        """
+        if self._tasks:
+            return
+
+        requeued, pending = await self._run_db(self._recover)
+        self._stats['requeued'] += requeued
+
+        self._queue = asyncio.Queue()
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.ensure_future(self._worker(runner)) for _ in range(self.workers)]
+
+    def _recover(self) -> Tuple[int, List[str]]:
+        """Delete expired jobs and queue interrupted ones again; returns (requeued, pending job IDs)"""
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                       (time.time() - self.ttl,))
+            requeued = db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+            pending = [row[0] for row in db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            )]
+        return requeued, pending
+
+    async def stop(self):
+        """Cancel the workers; interrupted jobs are picked up again by the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def get_stats(self) -> Dict:
+        """
+        Get job counts
+
+        Returns:
+            Worker count, jobs per status and counters since start
+        """
+        counts = await self._run_db(self._count_by_status)
+        return {
+            'workers': self.workers,
+            'queued': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            **self._stats,
+        }
+
+    def _count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+# Create global instance
+job_queue = JobQueue()
+
+# Convenience functions
+async def submit_job(request: Dict) -> Dict:
+    return await job_queue.submit(request)
+
+async def get_job(job_id: str) -> Optional[Dict]:
+    return await job_queue.get(job_id)
@@ -0,0 +1,120 @@
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    import av
+except ImportError:
+    av = None
+
+# Seconds to wait for the next keyframe from the ffmpeg pipe
+PIPE_TIMEOUT = 30
+
+_SHOWINFO_PTS = re.compile(r'\bn:\s*(\d+)\b.*\bpts_time:(-?[\d.]+)')
+
+
+class KeyframeReader:
+    def __init__(self, ffmpeg_path: Optional[str] = None):
+        """
+        Initialize keyframe-only decoder
+
+        Decodes I-frames only: the decoder skips every other frame without
+        reconstructing it, so reading the keyframes of a long video costs a small
+        fraction of decoding it. Uses PyAV when installed, otherwise an ffmpeg
+        pipe (`-skip_frame nokey`).
+
+        Args:
+            ffmpeg_path: ffmpeg executable (defaults to the one on PATH)
+        """
+        self.ffmpeg_path = ffmpeg_path or shutil.which('ffmpeg')
+
+    def get_backend(self) -> Optional[str]:
+        """
+        Get the backend keyframes are read with
+
+        Returns:
+            'pyav', 'ffmpeg' or None if keyframe-only decoding is unavailable
+        """
+        if av is not None:
+            return 'pyav'
+        if self.ffmpeg_path:
+            return 'ffmpeg'
+        return None
+
+    def iter_keyframes(self, source: str, width: int, height: int) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Decode the keyframes of a video in order
+
+        Args:
+            source: Video file path or media URL
+            width, height: Output frame size (BGR)
+
+        Yields:
+            (timestamp, frame) pairs
+        """
+        backend = self.get_backend()
+        if backend == 'pyav':
+            yield from self._iter_pyav(source, width, height)
+        elif backend == 'ffmpeg':
+            yield from self._iter_ffmpeg(source, width, height)
+        else:
+            raise RuntimeError("Keyframe decoding needs PyAV or ffmpeg")
+
+    def _iter_pyav(self, source: str, width: int, height: int) -> Iterator[Tuple[float, np.ndarray]]:
+        container = av.open(source)
+        try:
+            stream = container.streams.video[0]
+            stream.codec_context.skip_frame = 'NONKEY'
+            for frame in container.decode(stream):
+                if frame.time is None:
+                    continue
+                yield frame.time, frame.to_ndarray(format='bgr24', width=width, height=height)
+        finally:
+            container.close()
+
+    def _iter_ffmpeg(self, source: str, width: int, height: int) -> Iterator[Tuple[float, np.ndarray]]:
+        command = [
+            self.ffmpeg_path, '-hide_banner', '-nostats', '-loglevel', 'info',
+            '-skip_frame', 'nokey', '-i', source,
+            '-an', '-sn', '-vf', f'scale={width}:{height},showinfo',
+            '-fps_mode', 'passthrough', '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1',
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        # showinfo logs each frame's timestamp on stderr before the frame reaches stdout
+        timestamps: queue.Queue = queue.Queue()
+
+        def read_timestamps():
+            for line in process.stderr:
+                match = _SHOWINFO_PTS.search(line.decode('utf-8', 'replace'))
+                if match:
+                    timestamps.put(float(match.group(2)))
+            timestamps.put(None)
+
+        reader = threading.Thread(target=read_timestamps, daemon=True)
+        reader.start()
+
+        frame_size = width * height * 3
+        try:
+            while True:
+                data = process.stdout.read(frame_size)
+                if len(data) < frame_size:
+                    break
+                timestamp = timestamps.get(timeout=PIPE_TIMEOUT)
+                if timestamp is None:
+                    break
+                yield timestamp, np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            reader.join(timeout=1)
+
+
+# Create global instance
+keyframe_reader = KeyframeReader()
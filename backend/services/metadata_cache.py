@@ -0,0 +1,89 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class MetadataCache:
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 512):
+        """
+        Initialize in-memory TTL cache for yt-dlp info dicts
+
+        Stream URLs inside an info dict expire after a few hours, so entries
+        live much shorter than that by default.
+
+        Args:
+            ttl: Entry lifetime in seconds (defaults to PROMPTSNAP_METADATA_TTL or 1800)
+            max_entries: Maximum number of cached videos (oldest dropped first)
+        """
+        self.ttl = ttl if ttl is not None else float(os.environ.get('PROMPTSNAP_METADATA_TTL', 1800))
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0}
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """
+        Get cached info dict
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Copy of the info dict (safe to mutate) or None
+        """
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            stored_at, info = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[video_id]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(video_id)
+            self._stats['hits'] += 1
+
+        return copy.deepcopy(info)
+
+    def put(self, video_id: str, info: Dict):
+        """
+        Store info dict
+
+        Args:
+            video_id: YouTube video ID
+            info: Sanitized yt-dlp info dict
+        """
+        info = copy.deepcopy(info)
+        with self._lock:
+            self._entries[video_id] = (time.monotonic(), info)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, video_id: str):
+        """
+        Drop an entry (e.g. after its stream URLs failed)
+
+        Args:
+            video_id: YouTube video ID
+        """
+        with self._lock:
+            self._entries.pop(video_id, None)
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Hit/miss/expiry counts and number of entries
+        """
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries), 'ttl': self.ttl}
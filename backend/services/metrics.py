@@ -0,0 +1,258 @@
+import bisect
+import contextlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds; wide enough for per-frame JPEG encodes and whole downloads
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Observations of the CPU task running in this context (see record_call)
+_buffer: ContextVar[Optional[List[Tuple]]] = ContextVar('promptsnap_metrics_buffer', default=None)
+
+
+def _format_labels(label_names: Sequence[str], label_values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> Tuple:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def _record(self, value: float, labels: Dict[str, Any]):
+        label_values = self._label_values(labels)
+        buffer = _buffer.get()
+        if buffer is not None:
+            buffer.append((self.name, label_values, value))
+        else:
+            self._apply(label_values, value)
+
+    @abstractmethod
+    def _apply(self, label_values: Tuple, value: float):
+        """Add one observation to the series of label_values"""
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Render the samples (without HELP and TYPE lines)"""
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the counter
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        self._record(amount, labels)
+
+    def _apply(self, label_values: Tuple, value: float):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+                for labels, value in values]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one +Inf), sum]
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, **labels):
+        """
+        Record one observation
+
+        Args:
+            value: Observed value (seconds for latencies)
+            **labels: Label values
+        """
+        self._record(value, labels)
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _apply(self, label_values: Tuple, value: float):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                bucket_labels = _format_labels(self.label_names, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Initialize in-process metrics registry
+
+        Metrics are rendered in the Prometheus text exposition format. Observations
+        made inside CPU pool workers are buffered and applied in the server
+        process once the task returns (see record_call).
+        """
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        """
+        Register a counter
+
+        Args:
+            name: Metric name (ending in _total by convention)
+            help_text: HELP line
+            labels: Label names
+
+        Returns:
+            Counter
+        """
+        metric = Counter(self, name, help_text, labels)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """
+        Register a histogram
+
+        Args:
+            name: Metric name
+            help_text: HELP line
+            labels: Label names
+            buckets: Bucket upper bounds (+Inf is added)
+
+        Returns:
+            Histogram
+        """
+        metric = Histogram(self, name, help_text, labels, buckets=buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def apply(self, observations: Optional[List[Tuple]]):
+        """
+        Apply observations buffered in another process
+
+        Args:
+            observations: (metric name, label values, value) tuples from record_call
+        """
+        for name, label_values, value in observations or ():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric._apply(label_values, value)
+
+    def render(self) -> str:
+        """
+        Render all metrics
+
+        Returns:
+            Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def record_call(func: Callable, *args, **kwargs) -> Tuple[Any, List[Tuple]]:
+    """
+    Run func and return its result together with the observations it made
+
+    Module-level so the executor can send it to pool processes, whose own
+    registry is never scraped.
+
+    Returns:
+        (return value of func, observations for MetricsRegistry.apply)
+    """
+    observations = []
+    token = _buffer.set(observations)
+    try:
+        return func(*args, **kwargs), observations
+    finally:
+        _buffer.reset(token)
+
+# Create global instance
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    'promptsnap_stage_duration_seconds',
+    'Duration of pipeline stages: metadata, download, probe, analysis, frame_decode, jpeg_encode, cleanup',
+    labels=('stage',)
+)
+DOWNLOADED_BYTES = metrics.counter(
+    'promptsnap_downloaded_bytes_total', 'Bytes written by video, clip and storyboard downloads', labels=('kind',)
+)
+CACHE_HITS = metrics.counter(
+    'promptsnap_cache_hits_total', 'Downloads and metadata lookups served from cache', labels=('cache',)
+)
+CACHE_MISSES = metrics.counter(
+    'promptsnap_cache_misses_total', 'Downloads and metadata lookups that missed the cache', labels=('cache',)
+)
+SIMPLE_DOWNLOAD_FALLBACKS = metrics.counter(
+    'promptsnap_simple_download_fallbacks_total', 'Downloads that fell back to the simplest yt-dlp options'
+)
+SCENE_TIME_FALLBACKS = metrics.counter(
+    'promptsnap_scene_time_fallbacks_total',
+    'Scene-based selections topped up with time-based frames for lack of scene changes', labels=('source',)
+)
+
+# Convenience functions
+def observe_stage(stage: str):
+    return STAGE_SECONDS.time(stage=stage)
+
+def render_metrics() -> str:
+    return metrics.render()
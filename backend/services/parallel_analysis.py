@@ -0,0 +1,206 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from decode_session import open_capture
+from executor import get_cpu_share
+from frame_scanner import frame_scanner
+from scene_features import FeatureBatcher
+
+# Most worker processes per analysis (0 = one per CPU, see ParallelAnalyzer)
+ANALYSIS_WORKERS = int(os.environ.get('PROMPTSNAP_ANALYSIS_WORKERS', 0))
+
+# Fewer samples than this per segment are not worth a seek and a process hop
+MIN_SEGMENT_SAMPLES = 8
+
+
+def split_segments(frame_indices: List[int], segments: int) -> List[List[int]]:
+    """
+    Split sorted sample indices into contiguous, nearly equal segments
+
+    Args:
+        frame_indices: Sorted frame indices
+        segments: Number of segments wanted
+
+    Returns:
+        Non-empty index lists in timeline order
+    """
+    segments = max(1, min(segments, len(frame_indices)))
+    bounds = np.linspace(0, len(frame_indices), segments + 1).astype(int)
+    return [frame_indices[bounds[i]:bounds[i + 1]] for i in range(segments) if bounds[i] < bounds[i + 1]]
+
+
+def analyze_segment(source: str, frame_indices: List[int], width: int, height: int,
+                    metric: str, strategy: str, backend: Optional[str] = None) -> Dict:
+    """
+    Read one segment of samples with its own decoder (runs in a worker process)
+
+    Args:
+        source: Video file path or media URL
+        frame_indices: Sorted frame indices of the segment
+        width, height: Analysis frame size
+        metric: Change metric the histograms are for
+        strategy: Scan strategy ('linear' or 'seek')
+        backend: Decode backend (chosen for the container when not given)
+
+    Returns:
+        Dictionary with 'frame_indices' (read), 'histograms', 'hashes' (dHash),
+        'open_time', 'decode_time' and 'feature_time' (seconds)
+    """
+    open_start = time.perf_counter()
+    cap = open_capture(source, backend)
+    open_time = time.perf_counter() - open_start
+
+    batcher = FeatureBatcher(width, height, metric)
+    read_indices = []
+    feature_time = 0.0
+    loop_start = time.perf_counter()
+    try:
+        if cap.isOpened() and frame_indices:
+            # Linear scans walk on from here, so skip everything before the segment
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_indices[0])
+            for frame_idx, frame in frame_scanner.scan(cap, frame_indices, strategy):
+                feature_start = time.perf_counter()
+                batcher.add(frame)
+                read_indices.append(frame_idx)
+                feature_time += time.perf_counter() - feature_start
+    finally:
+        cap.release()
+
+    decode_time = time.perf_counter() - loop_start - feature_time
+    feature_start = time.perf_counter()
+    histograms = batcher.histograms()
+    hashes = batcher.hashes()
+    return {
+        'frame_indices': read_indices,
+        'histograms': histograms,
+        'hashes': hashes,
+        'open_time': open_time,
+        'decode_time': decode_time,
+        'feature_time': feature_time + time.perf_counter() - feature_start,
+    }
+
+
+class ParallelAnalyzer:
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize segment-sharded scene analysis
+
+        The sampled frames are split into contiguous timeline segments; every
+        segment is decoded by its own process with its own VideoCapture, which
+        seeks straight to the segment start. Workers return histograms only,
+        so the caller scores all consecutive pairs, including the pairs that
+        straddle segment boundaries, on the merged matrix.
+
+        Each analysis runs inside a CPU worker of the extraction executor, and
+        every CPU worker has its own analyzer, so an analysis splits into no
+        more segments than its share of the CPUs (see executor.get_cpu_share):
+        a single long analysis uses the machine, while concurrent ones divide
+        it instead of each starting a process per CPU.
+
+        Args:
+            workers: Most worker processes (defaults to PROMPTSNAP_ANALYSIS_WORKERS,
+                or the CPU count)
+        """
+        self.workers = workers or ANALYSIS_WORKERS or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # 'spawn' like the extraction executor: the caller may run threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def segment_count(self, sample_count: int) -> int:
+        """
+        Get the number of segments a scan of sample_count frames is split into
+
+        Args:
+            sample_count: Number of sampled frames
+
+        Returns:
+            Segment count (1 means a parallel scan is not worthwhile or no CPU is free)
+        """
+        segments = min(self.workers, sample_count // MIN_SEGMENT_SAMPLES)
+        cpu_share = get_cpu_share()
+        if cpu_share is not None:
+            segments = min(segments, cpu_share)
+        return max(1, segments)
+
+    def analyze(self, source: str, frame_indices: List[int], size: Tuple[int, int],
+                metric: str, strategy: str, backend: Optional[str] = None) -> Dict:
+        """
+        Compute the histograms of the sampled frames across worker processes
+
+        Args:
+            source: Video file path or media URL
+            frame_indices: Sorted frame indices to sample
+            size: Analysis frame size (width, height)
+            metric: Change metric the histograms are for
+            strategy: Scan strategy every worker uses within its segment
+            backend: Decode backend every worker opens the source with
+
+        Returns:
+            Dictionary with 'frame_indices', 'histograms' and 'hashes' in timeline order,
+            'segments', 'open_times' (per worker) and summed 'decode_time' and
+            'feature_time' (CPU seconds across workers)
+        """
+        segments = split_segments(frame_indices, self.segment_count(len(frame_indices)))
+        pool = self._get_pool()
+        futures = [
+            pool.submit(analyze_segment, source, segment, size[0], size[1], metric, strategy, backend)
+            for segment in segments
+        ]
+
+        try:
+            results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM during decode); start a new pool next time
+            self._pool = None
+            pool.shutdown(wait=False)
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+        read_indices = []
+        for i, result in enumerate(results):
+            read_indices.extend(result['frame_indices'])
+            if len(result['frame_indices']) < len(segments[i]):
+                # Stop at the first short read, like a sequential scan does
+                results = results[:i + 1]
+                break
+
+        return {
+            'frame_indices': read_indices,
+            'histograms': np.concatenate([result['histograms'] for result in results]),
+            'hashes': np.concatenate([result['hashes'] for result in results]),
+            'segments': len(segments),
+            'open_times': [result['open_time'] for result in results],
+            'decode_time': sum(result['decode_time'] for result in results),
+            'feature_time': sum(result['feature_time'] for result in results),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut down the worker processes
+
+        Args:
+            wait: Wait for running segments to finish
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+# Create global instance
+parallel_analyzer = ParallelAnalyzer()
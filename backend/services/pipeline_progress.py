@@ -0,0 +1,154 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from structured_log import get_logger
+
+log = get_logger('progress')
+
+# Pipeline stages, in the order they usually run
+PIPELINE_STAGES = ['metadata', 'download', 'analysis', 'encode']
+
+# Receives the progress events of the request the current task (or I/O thread,
+# see ExtractionExecutor.run_io) works on
+_listener: ContextVar[Optional[Callable[[Dict], None]]] = ContextVar('promptsnap_progress_listener', default=None)
+
+
+@contextmanager
+def listen(listener: Callable[[Dict], None]):
+    """
+    Send the progress events of the pipeline run inside this block to listener
+
+    Events are dictionaries with a 'type':
+    - 'stage': 'stage' started ('status': 'running') or ended ('done', 'failed')
+    - 'progress': fraction ('progress') of a running stage, e.g. downloaded bytes
+    - 'frame': an output frame ('frame') was written
+
+    The listener may be called from I/O threads, so it has to be thread-safe.
+
+    Args:
+        listener: Callable taking one event dictionary
+    """
+    token = _listener.set(listener)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+class ListenerGroup:
+    def __init__(self):
+        """
+        Fan progress events out to a changing set of listeners
+
+        Used as the listener of coalesced work (see SingleFlight), whose waiters
+        join and leave while it runs. Listeners that join late first receive the
+        stage and frame events they missed. Groups are falsy while nobody listens,
+        so is_listening() reflects the current waiters.
+        """
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict], None]] = []
+        # Stage and frame events so far ('progress' events are only useful live)
+        self._history: List[Dict] = []
+
+    def add(self, listener: Callable[[Dict], None]):
+        """
+        Start sending events to listener, beginning with the missed stage and frame events
+
+        Args:
+            listener: Callable taking one event dictionary
+        """
+        with self._lock:
+            for event in self._history:
+                self._deliver(listener, event)
+            self._listeners.append(listener)
+
+    def remove(self, listener: Callable[[Dict], None]):
+        """Stop sending events to listener"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def __bool__(self) -> bool:
+        # Nested groups (a coalesced download inside a coalesced extraction) count only with listeners
+        return any(self._listeners)
+
+    def __call__(self, event: Dict):
+        with self._lock:
+            if event['type'] != 'progress':
+                self._history.append(event)
+            for listener in self._listeners:
+                self._deliver(listener, event)
+
+    @staticmethod
+    def _deliver(listener: Callable[[Dict], None], event: Dict):
+        try:
+            listener(event)
+        except Exception as e:
+            # One failing listener must not keep the event from the others
+            log.warning("Progress listener failed", error=str(e))
+
+
+def current_listener() -> Optional[Callable[[Dict], None]]:
+    """Get the listener of the current context, if any"""
+    return _listener.get()
+
+
+def is_listening() -> bool:
+    """Check whether anybody receives progress events in the current context"""
+    return bool(_listener.get())
+
+
+def _emit(event: Dict):
+    listener = _listener.get()
+    if not listener:
+        return
+    try:
+        listener(event)
+    except Exception as e:
+        # Progress reporting must never break the extraction itself
+        log.warning("Progress listener failed", error=str(e))
+
+
+@contextmanager
+def pipeline_stage(stage: str):
+    """
+    Report the start and end of a pipeline stage
+
+    Args:
+        stage: One of PIPELINE_STAGES
+    """
+    if not is_listening():
+        yield
+        return
+
+    _emit({'type': 'stage', 'stage': stage, 'status': 'running'})
+    try:
+        yield
+    except BaseException:
+        _emit({'type': 'stage', 'stage': stage, 'status': 'failed'})
+        raise
+    _emit({'type': 'stage', 'stage': stage, 'status': 'done'})
+
+
+def report_progress(stage: str, progress: float, **details):
+    """
+    Report how far a running stage is
+
+    Args:
+        stage: One of PIPELINE_STAGES
+        progress: Finished share between 0 and 1
+        **details: Extra fields such as downloaded_bytes and total_bytes
+    """
+    _emit({'type': 'progress', 'stage': stage, 'progress': round(progress, 3), **details})
+
+
+def report_frame(frame: Dict):
+    """
+    Report an output frame as soon as its image file is written
+
+    Args:
+        frame: Frame information dictionary (as in extraction results)
+    """
+    _emit({'type': 'frame', 'frame': frame})
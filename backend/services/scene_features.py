@@ -0,0 +1,268 @@
+import cv2
+import os
+import numpy as np
+from typing import Optional, Tuple
+
+# Width analysis frames are scaled to; an 8x8x8 histogram is practically the
+# same at this size as at full resolution
+ANALYSIS_WIDTH = int(os.environ.get('PROMPTSNAP_ANALYSIS_WIDTH', 160))
+
+# Distance between consecutive frames used as change score
+CHANGE_METRICS = ('correl', 'chisqr', 'bhattacharyya', 'hsv_l1')
+CHANGE_METRIC = os.environ.get('PROMPTSNAP_CHANGE_METRIC', 'correl')
+
+# Frames packed into one array before their histograms are computed, and the
+# memory cap of that array (analysis frames of full-size video are large)
+HIST_BATCH_FRAMES = 256
+HIST_BATCH_BYTES = 64 * 1024 * 1024
+
+# dHash grid: each row of DHASH_SIZE + 1 block means gives DHASH_SIZE bits
+DHASH_SIZE = 8
+
+
+def analysis_size(width: int, height: int, max_width: int = ANALYSIS_WIDTH) -> Tuple[int, int]:
+    """
+    Get the frame size used for change scoring
+
+    Keeps the aspect ratio and rounds the height to an even number, which the
+    FFmpeg scale filter requires for most pixel formats.
+
+    Args:
+        width, height: Source frame size
+        max_width: Analysis width (frames narrower than this are left alone)
+
+    Returns:
+        (width, height) of analysis frames
+    """
+    if width <= max_width or width <= 0:
+        return width, height
+    scaled_height = max(2, int(round(height * max_width / width / 2)) * 2)
+    return max_width, scaled_height
+
+
+class FrameResizer:
+    def __init__(self, width: int, height: int):
+        """
+        Initialize resizer writing into one reused buffer
+
+        Every resized frame overwrites the previous one, so callers must be
+        done with a frame before resizing the next.
+
+        Args:
+            width, height: Output frame size
+        """
+        self.size = (width, height)
+        self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+
+    def resize(self, frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Scale a BGR frame to the analysis size
+
+        Frames that already have that size (decoded at reduced size) are
+        returned as they are, or copied when out is given.
+
+        Args:
+            frame: BGR frame
+            out: Contiguous array to write into instead of the reused buffer
+
+        Returns:
+            Frame of the analysis size
+        """
+        if frame.shape[1] == self.size[0] and frame.shape[0] == self.size[1]:
+            if out is None:
+                return frame
+            np.copyto(out, frame)
+            return out
+        # Bilinear reads only a few source pixels per output pixel: a histogram
+        # needs a pixel sample, not an antialiased image (INTER_AREA costs more
+        # than the full-size histogram at 1080p)
+        return cv2.resize(frame, self.size, dst=self._buffer if out is None else out,
+                          interpolation=cv2.INTER_LINEAR)
+
+
+def batch_histograms(frames: np.ndarray, metric: str = CHANGE_METRIC) -> np.ndarray:
+    """
+    Compute colour histograms of a stack of frames into one matrix
+
+    The colour conversion for 'hsv_l1' runs once on the whole stack. Binning
+    stays with calcHist per frame: at analysis size it is about twice as fast
+    as a NumPy bincount over the stack, which has to build an index array
+    for every pixel.
+
+    Args:
+        frames: (N, H, W, 3) uint8 BGR frames
+        metric: Change metric the histograms are for ('hsv_l1' counts 8x4x4
+            HSV bins, the others 8x8x8 BGR bins)
+
+    Returns:
+        (N, bins) float32 histograms (pixel counts)
+    """
+    if metric == 'hsv_l1':
+        # One cvtColor call for the whole stack, viewed as a single tall image
+        frames = cv2.cvtColor(frames.reshape(-1, frames.shape[2], 3), cv2.COLOR_BGR2HSV).reshape(frames.shape)
+        bins, ranges = [8, 4, 4], [0, 180, 0, 256, 0, 256]
+    else:
+        bins, ranges = [8, 8, 8], [0, 256, 0, 256, 0, 256]
+
+    histograms = np.empty((frames.shape[0], int(np.prod(bins))), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        histograms[i] = cv2.calcHist([frame], [0, 1, 2], None, bins, ranges).ravel()
+    return histograms
+
+
+def consecutive_changes(histograms: np.ndarray, metric: str = CHANGE_METRIC) -> np.ndarray:
+    """
+    Score the change between each histogram and the one before it
+
+    Computed for all pairs at once on the (N, bins) matrix. 'correl' and
+    'chisqr' match cv2.compareHist (HISTCMP_CORREL as 1 - correlation,
+    HISTCMP_CHISQR on normalized histograms); 'bhattacharyya' and 'hsv_l1'
+    (half the L1 distance of normalized HSV histograms) lie in [0, 1].
+
+    Args:
+        histograms: (N, bins) histograms in time order
+        metric: One of CHANGE_METRICS
+
+    Returns:
+        (N - 1,) change scores, higher meaning a bigger change
+    """
+    if metric not in CHANGE_METRICS:
+        raise ValueError(f"Unknown change metric: {metric}")
+    if len(histograms) < 2:
+        return np.zeros(0, dtype=np.float64)
+
+    hists = histograms.astype(np.float64)
+    prev, curr = hists[:-1], hists[1:]
+
+    if metric == 'correl':
+        prev_c = prev - prev.mean(axis=1, keepdims=True)
+        curr_c = curr - curr.mean(axis=1, keepdims=True)
+        denom = np.sqrt((prev_c ** 2).sum(axis=1) * (curr_c ** 2).sum(axis=1))
+        correl = np.divide((prev_c * curr_c).sum(axis=1), denom, out=np.ones(len(denom)), where=denom > 0)
+        return 1 - correl
+
+    # The remaining metrics compare distributions
+    totals = hists.sum(axis=1, keepdims=True)
+    dist = np.divide(hists, totals, out=np.zeros_like(hists), where=totals > 0)
+    prev, curr = dist[:-1], dist[1:]
+
+    if metric == 'chisqr':
+        return np.divide((curr - prev) ** 2, prev, out=np.zeros_like(prev), where=prev > 0).sum(axis=1)
+    if metric == 'bhattacharyya':
+        return np.sqrt(np.clip(1 - np.sqrt(prev * curr).sum(axis=1), 0, None))
+    return 0.5 * np.abs(curr - prev).sum(axis=1)
+
+
+def batch_dhash(frames: np.ndarray) -> np.ndarray:
+    """
+    Compute 64-bit difference hashes (dHash) of a stack of frames
+
+    Each frame is reduced to the means of an 8x9 grid of grey blocks and every
+    bit tells whether a block is brighter than its left neighbour, so the hash
+    follows the structure of the image and ignores small shifts, noise and
+    re-encoding. The grey conversion and the block means (two reduceat
+    passes) run on the whole stack at once.
+
+    Args:
+        frames: (N, H, W, 3) uint8 BGR frames
+
+    Returns:
+        (N,) uint64 hashes
+    """
+    count, height, width = frames.shape[:3]
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    gray = cv2.cvtColor(frames.reshape(-1, width, 3), cv2.COLOR_BGR2GRAY).reshape(count, height, width)
+    row_edges = np.linspace(0, height, DHASH_SIZE + 1).astype(int)
+    col_edges = np.linspace(0, width, DHASH_SIZE + 2).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(gray, row_edges[:-1], axis=1, dtype=np.uint32),
+                           col_edges[:-1], axis=2)
+    # Blocks differ in size by a pixel where the frame does not divide evenly
+    areas = np.maximum(np.outer(np.diff(row_edges), np.diff(col_edges)), 1)
+    means = sums / areas
+
+    bits = (means[:, :, 1:] > means[:, :, :-1]).reshape(count, DHASH_SIZE * DHASH_SIZE)
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def hamming_distances(hashes: np.ndarray, reference: int) -> np.ndarray:
+    """
+    Count the bits each hash differs in from a reference hash
+
+    Args:
+        hashes: (N,) uint64 hashes
+        reference: Hash to compare against
+
+    Returns:
+        (N,) bit counts
+    """
+    return np.bitwise_count(hashes ^ np.uint64(reference))
+
+
+class FeatureBatcher:
+    def __init__(self, width: int, height: int, metric: str = CHANGE_METRIC,
+                 batch_frames: int = HIST_BATCH_FRAMES):
+        """
+        Initialize batched histogram stage
+
+        Sampled frames are resized straight into a preallocated
+        (batch_frames, H, W, 3) array; each full batch is reduced to histograms
+        and perceptual hashes, so only those are kept for a long video.
+
+        Args:
+            width, height: Analysis frame size
+            metric: Change metric the histograms are for
+            batch_frames: Frames per batch (fewer if they would exceed HIST_BATCH_BYTES)
+        """
+        batch_frames = max(1, min(batch_frames, HIST_BATCH_BYTES // (width * height * 3)))
+        self.metric = metric
+        self._resizer = FrameResizer(width, height)
+        self._frames = np.empty((batch_frames, height, width, 3), dtype=np.uint8)
+        self._filled = 0
+        self._histograms = []
+        self._hashes = []
+
+    def add(self, frame: np.ndarray):
+        """
+        Add a frame (any size, BGR) to the batch
+
+        Args:
+            frame: BGR frame
+        """
+        self._resizer.resize(frame, out=self._frames[self._filled])
+        self._filled += 1
+        if self._filled == len(self._frames):
+            self._flush()
+
+    def _flush(self):
+        if self._filled:
+            self._histograms.append(batch_histograms(self._frames[:self._filled], self.metric))
+            self._hashes.append(batch_dhash(self._frames[:self._filled]))
+            self._filled = 0
+
+    def histograms(self) -> np.ndarray:
+        """
+        Get the histograms of every frame added so far
+
+        Returns:
+            (N, bins) histograms in the order the frames were added
+        """
+        self._flush()
+        if not self._histograms:
+            return batch_histograms(self._frames[:0], self.metric)
+        if len(self._histograms) > 1:
+            self._histograms = [np.concatenate(self._histograms)]
+        return self._histograms[0]
+
+    def hashes(self) -> np.ndarray:
+        """
+        Get the dHash of every frame added so far
+
+        Returns:
+            (N,) uint64 hashes in the order the frames were added
+        """
+        self._flush()
+        if len(self._hashes) != 1:
+            self._hashes = [np.concatenate(self._hashes) if self._hashes else np.zeros(0, dtype=np.uint64)]
+        return self._hashes[0]
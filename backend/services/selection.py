@@ -0,0 +1,196 @@
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from scene_features import hamming_distances
+
+# Default selector for scene change points ('nms' or 'dp')
+SCENE_SELECTOR = os.environ.get('PROMPTSNAP_SCENE_SELECTOR', 'nms')
+
+# Selected frames are at least this fraction of an even share of the video apart
+SPACING_FRACTION = 0.5
+
+# Candidates whose 64-bit dHash differs in at most this many bits from a
+# stronger candidate are treated as the same picture (negative disables)
+DUPLICATE_DISTANCE = int(os.environ.get('PROMPTSNAP_DUPLICATE_DISTANCE', 8))
+
+
+def min_spacing(duration: float, frame_count: int) -> float:
+    """
+    Get the minimum distance between selected frames
+
+    Half of what evenly spaced frames would be apart: frames can still gather
+    where the changes are, but never all in one busy section, and short videos
+    are not ruled out the way a fixed 10-second gap rules them out.
+
+    Args:
+        duration: Video duration in seconds
+        frame_count: Number of frames to select
+
+    Returns:
+        Minimum spacing in seconds
+    """
+    return SPACING_FRACTION * duration / max(frame_count, 1)
+
+
+def _as_arrays(scene_changes: List[Dict]):
+    times = np.array([s['timestamp'] for s in scene_changes], dtype=np.float64)
+    scores = np.array([s['change_score'] for s in scene_changes], dtype=np.float64)
+    return times, scores
+
+
+def select_nms(scene_changes: List[Dict], frame_count: int, spacing: float) -> List[Dict]:
+    """
+    Greedy non-maximum suppression: take the largest change, suppress its neighbours, repeat
+
+    Candidates are indexed by time once; each pick clears its +-spacing window
+    with two binary searches and a slice assignment, so the whole selection is
+    O(n log n) instead of checking every candidate against every pick.
+
+    Args:
+        scene_changes: Dicts with 'timestamp' and 'change_score'
+        frame_count: Number of frames to select
+        spacing: Minimum distance between picks in seconds
+
+    Returns:
+        Selected scene changes sorted by time
+    """
+    if not scene_changes or frame_count <= 0:
+        return []
+
+    times, scores = _as_arrays(scene_changes)
+    by_time = np.argsort(times, kind='stable')
+    sorted_times = times[by_time]
+    # Rank of every candidate in the time index
+    position = np.empty(len(times), dtype=np.int64)
+    position[by_time] = np.arange(len(times))
+
+    suppressed = np.zeros(len(times), dtype=bool)
+    selected = []
+    for i in np.argsort(-scores, kind='stable'):
+        if suppressed[position[i]]:
+            continue
+        selected.append(i)
+        if len(selected) >= frame_count:
+            break
+        lo = np.searchsorted(sorted_times, times[i] - spacing, side='right')
+        hi = np.searchsorted(sorted_times, times[i] + spacing, side='left')
+        suppressed[lo:hi] = True
+
+    return [scene_changes[i] for i in sorted(selected, key=lambda i: times[i])]
+
+
+def select_dp(scene_changes: List[Dict], frame_count: int, spacing: float) -> List[Dict]:
+    """
+    Exact selection: the frames with the largest total change score, at least spacing apart
+
+    Dynamic programming over candidates sorted by time. Level c holds, for
+    every prefix of the candidates, the best total with c picks; a level is a
+    running maximum over "take candidate j after the best c - 1 picks that end
+    spacing before it", so it is one vectorized pass, O(frame_count * n).
+
+    Args:
+        scene_changes: Dicts with 'timestamp' and 'change_score'
+        frame_count: Number of frames to select
+        spacing: Minimum distance between picks in seconds
+
+    Returns:
+        Selected scene changes sorted by time (fewer than frame_count only if
+        no more fit)
+    """
+    if not scene_changes or frame_count <= 0:
+        return []
+
+    times, scores = _as_arrays(scene_changes)
+    order = np.argsort(times, kind='stable')
+    times, scores = times[order], scores[order]
+    n = len(times)
+
+    # Candidates that end at least spacing before candidate j (a prefix length)
+    compatible = np.searchsorted(times, times - spacing, side='right')
+    # A pick is compatible with itself only at zero spacing; never reuse it
+    compatible = np.minimum(compatible, np.arange(n))
+
+    best = np.zeros(n + 1)  # Best total of each prefix with the previous number of picks
+    choices = []
+    for _ in range(min(frame_count, n)):
+        take = best[compatible] + scores
+        running = np.maximum.accumulate(take)
+        # Last candidate reaching the running maximum, per prefix
+        argmax = np.maximum.accumulate(np.where(take == running, np.arange(n), 0))
+        if np.isneginf(running[-1]):
+            break
+        best = np.concatenate(([-np.inf], running))
+        choices.append(argmax)
+
+    # Walk back from the full prefix through the recorded choices
+    picks = []
+    prefix = n
+    for argmax in reversed(choices):
+        j = argmax[prefix - 1]
+        picks.append(j)
+        prefix = compatible[j]
+
+    return [scene_changes[order[j]] for j in sorted(picks)]
+
+
+def suppress_duplicates(scene_changes: List[Dict], max_distance: int = DUPLICATE_DISTANCE) -> List[Dict]:
+    """
+    Drop candidates that look like a stronger candidate
+
+    Candidates are visited by decreasing change score; each one is compared
+    with all kept hashes in one vectorized popcount, so a static intro or a
+    slide shown twice occupies one candidate instead of several output slots.
+    Candidates without a 'dhash' are always kept.
+
+    Args:
+        scene_changes: Dicts with 'change_score' and optional 'dhash'
+        max_distance: Largest Hamming distance that still counts as a duplicate
+
+    Returns:
+        Remaining scene changes in their original order
+    """
+    if max_distance < 0 or not scene_changes:
+        return scene_changes
+
+    kept_hashes = np.empty(len(scene_changes), dtype=np.uint64)
+    kept_count = 0
+    keep = np.ones(len(scene_changes), dtype=bool)
+    scores = np.array([s['change_score'] for s in scene_changes], dtype=np.float64)
+    for i in np.argsort(-scores, kind='stable'):
+        dhash = scene_changes[i].get('dhash')
+        if dhash is None:
+            continue
+        if kept_count and hamming_distances(kept_hashes[:kept_count], dhash).min() <= max_distance:
+            keep[i] = False
+            continue
+        kept_hashes[kept_count] = dhash
+        kept_count += 1
+
+    return [change for change, kept in zip(scene_changes, keep) if kept]
+
+
+SELECTORS = {
+    'nms': select_nms,
+    'dp': select_dp,
+}
+
+
+def select_scenes(scene_changes: List[Dict], frame_count: int, duration: float,
+                  selector: str = SCENE_SELECTOR) -> List[Dict]:
+    """
+    Pick temporally diverse scene change points
+
+    Args:
+        scene_changes: Dicts with 'timestamp' and 'change_score'
+        frame_count: Number of frames to select
+        duration: Video duration in seconds (sets the minimum spacing)
+        selector: 'nms' (greedy, fast) or 'dp' (maximum total score)
+
+    Returns:
+        Selected scene changes sorted by time
+    """
+    if selector not in SELECTORS:
+        raise ValueError(f"Unknown scene selector: {selector}")
+    return SELECTORS[selector](scene_changes, frame_count, min_spacing(duration, frame_count))
@@ -0,0 +1,142 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from pipeline_progress import ListenerGroup, current_listener, listen
+from structured_log import get_logger
+
+log = get_logger('single_flight')
+
+
+def _copy_exception(e: Exception) -> Exception:
+    """
+    New instance of e with the same arguments and attributes
+
+    Every waiter raises its own copy; raising the one instance in several tasks
+    would pile all their tracebacks onto it.
+    """
+    try:
+        copy = e.__class__.__new__(e.__class__, *e.args)
+        copy.args = e.args
+        copy.__dict__.update(e.__dict__)
+    except Exception:
+        return e
+    return copy
+
+
+class _Call:
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Running work; the event loop itself only keeps a weak reference to tasks
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.results: List[Any] = []
+        # Progress listeners of all waiters; the work reports to this group
+        self.listeners = ListenerGroup()
+
+
+class SingleFlight:
+    def __init__(self, name: str, share: Optional[Callable[[Any], Any]] = None,
+                 discard: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize request coalescing group
+
+        Concurrent calls with the same key run the work once; followers await the
+        leader's in-flight result instead of starting their own. Progress events
+        of the work (see pipeline_progress) reach the listener of every waiter.
+
+        Args:
+            name: Group name used in statistics
+            share: Makes an independent copy of a result for each extra waiter
+                (e.g. takes another cache lease); defaults to returning the same object
+            discard: Releases a result nobody is waiting for any more (all waiters cancelled)
+        """
+        self.name = name
+        self._share = share
+        self._discard = discard
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {'leaders': 0, 'followers': 0, 'failures': 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func once per key among concurrent callers
+
+        Args:
+            key: Coalescing key
+            func: Coroutine function producing the result
+
+        Returns:
+            Result of func (shared copy for followers)
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call()
+            self._calls[key] = call
+            self._stats['leaders'] += 1
+            # The work runs in its own task so that a disconnecting leader
+            # does not cancel it for the followers
+            call.task = asyncio.ensure_future(self._run(key, call, func))
+        else:
+            self._stats['followers'] += 1
+
+        call.waiters += 1
+        listener = current_listener()
+        if listener is not None:
+            call.listeners.add(listener)
+        try:
+            await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            call.waiters -= 1
+            if call.future.done() and not call.future.cancelled() and call.future.exception() is None:
+                # Our share was already handed out
+                self._release(call.results.pop())
+            raise
+        except Exception as e:
+            raise _copy_exception(e) from e
+        finally:
+            if listener is not None:
+                call.listeners.remove(listener)
+
+        return call.results.pop()
+
+    async def _run(self, key: Hashable, call: _Call, func: Callable[[], Awaitable[Any]]):
+        try:
+            with listen(call.listeners):
+                result = await func()
+        except asyncio.CancelledError:
+            del self._calls[key]
+            call.future.cancel()
+            raise
+        except Exception as e:
+            self._stats['failures'] += 1
+            del self._calls[key]
+            call.future.set_exception(e)
+            # Retrieve the exception so it is not reported as unhandled when nobody waits
+            call.future.exception()
+            return
+
+        # Remove the key and prepare every waiter's share in one step, so
+        # late arrivals start a new flight instead of joining a finished one
+        del self._calls[key]
+        if call.waiters == 0:
+            self._release(result)
+        else:
+            call.results = [result]
+            for _ in range(call.waiters - 1):
+                call.results.append(self._share(result) if self._share and result is not None else result)
+        call.future.set_result(None)
+
+    def _release(self, result: Any):
+        if self._discard and result is not None:
+            try:
+                self._discard(result)
+            except Exception as e:
+                log.warning("Releasing unused result failed", flight=self.name, error=str(e))
+
+    def get_stats(self) -> Dict:
+        """
+        Get coalescing statistics
+
+        Returns:
+            Leader/follower counts and number of flights currently in progress
+        """
+        return {**self._stats, 'in_flight': len(self._calls)}
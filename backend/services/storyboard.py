@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from structured_log import get_logger
+
+log = get_logger('storyboard')
+
+
+def select_storyboard_format(info: Dict) -> Optional[Dict]:
+    """
+    Pick the most detailed storyboard format from a yt-dlp info dict
+
+    YouTube storyboards are sprite sheets of small thumbnails taken at a fixed
+    interval; yt-dlp lists every level as a format with format_note 'storyboard'.
+
+    Args:
+        info: yt-dlp info dict
+
+    Returns:
+        Storyboard format dictionary or None
+    """
+    storyboards = [
+        f for f in (info or {}).get('formats') or []
+        if f.get('format_note') == 'storyboard' and f.get('fragments')
+        and f.get('rows') and f.get('columns') and f.get('fps')
+    ]
+    if not storyboards:
+        return None
+    return max(storyboards, key=lambda f: (f.get('width') or 0) * (f.get('height') or 0))
+
+
+def has_storyboard(info: Dict) -> bool:
+    """Check whether the info dict lists any usable storyboard"""
+    return select_storyboard_format(info) is not None
+
+
+def iter_storyboard_tiles(sheet_paths: List[str], storyboard: Dict, duration: float) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Split sprite sheets into thumbnails
+
+    Tiles are stored row by row; tile k of the whole storyboard shows the video
+    at k / fps seconds. The last sheet is usually only partly filled.
+
+    Args:
+        sheet_paths: Sprite sheet images in fragment order
+        storyboard: Storyboard format dictionary (rows, columns, width, height, fps)
+        duration: Video duration in seconds
+
+    Yields:
+        (timestamp, tile) pairs in time order
+    """
+    rows, columns = storyboard['rows'], storyboard['columns']
+    interval = 1.0 / storyboard['fps']
+    tiles_per_sheet = rows * columns
+
+    for sheet_index, sheet_path in enumerate(sheet_paths):
+        sheet = cv2.imread(sheet_path)
+        if sheet is None:
+            log.warning("Cannot read storyboard sheet", sheet_path=sheet_path)
+            continue
+
+        tile_width = storyboard.get('width') or sheet.shape[1] // columns
+        tile_height = storyboard.get('height') or sheet.shape[0] // rows
+
+        for tile_index in range(tiles_per_sheet):
+            timestamp = (sheet_index * tiles_per_sheet + tile_index) * interval
+            if timestamp >= duration:
+                return
+
+            row, column = divmod(tile_index, columns)
+            y, x = row * tile_height, column * tile_width
+            if y + tile_height > sheet.shape[0] or x + tile_width > sheet.shape[1]:
+                # Partly filled last sheet
+                break
+
+            yield timestamp, sheet[y:y + tile_height, x:x + tile_width]
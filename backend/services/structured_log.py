@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+LOG_LEVEL = os.environ.get('PROMPTSNAP_LOG_LEVEL', 'INFO').upper()
+# 'text' (message followed by key=value fields) or 'json' (one object per line)
+LOG_FORMAT = os.environ.get('PROMPTSNAP_LOG_FORMAT', 'text').lower()
+# Share of requests whose debug and info records are kept; warnings and errors always are
+LOG_SAMPLE_RATE = float(os.environ.get('PROMPTSNAP_LOG_SAMPLE_RATE', 1.0))
+
+ROOT_LOGGER = 'promptsnap'
+
+# Correlation ID of the request the current task (or I/O thread) works on
+_request_id: ContextVar[Optional[str]] = ContextVar('promptsnap_request_id', default=None)
+
+# Keyword arguments that belong to logging itself rather than to the structured fields
+_LOGGING_KWARGS = ('exc_info', 'stack_info', 'stacklevel', 'extra')
+
+
+def new_request_id() -> str:
+    """Generate a short correlation ID"""
+    return uuid.uuid4().hex[:12]
+
+
+def get_request_id() -> Optional[str]:
+    """Get the correlation ID of the current request, if any"""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None):
+    """
+    Tag the log records written inside this block with a correlation ID
+
+    Args:
+        request_id: Correlation ID (a new one is generated when omitted)
+    """
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+def run_with_request_id(request_id: Optional[str], func: Callable, *args, **kwargs) -> Any:
+    """
+    Run func under the given correlation ID
+
+    Module-level so the executor can send it to pool processes, which do not
+    share the caller's context.
+    """
+    if request_id is None:
+        return func(*args, **kwargs)
+    with request_context(request_id):
+        return func(*args, **kwargs)
+
+
+def is_sampled(request_id: Optional[str], sample_rate: Optional[float] = None) -> bool:
+    """
+    Decide whether a request's debug and info records are kept
+
+    The decision depends only on the ID, so a sampled request is logged
+    completely, also by pool processes and later retries.
+
+    Args:
+        request_id: Correlation ID (records outside requests are always kept)
+        sample_rate: Share of requests to keep (defaults to PROMPTSNAP_LOG_SAMPLE_RATE)
+
+    Returns:
+        True if the records should be written
+    """
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    if request_id is None or rate >= 1.0:
+        return True
+    return zlib.crc32(request_id.encode()) % 10000 < rate * 10000
+
+
+class _RequestFilter(logging.Filter):
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = getattr(record, 'request_id', None) or _request_id.get()
+        if record.levelno >= logging.WARNING:
+            return True
+        return is_sampled(record.request_id, self.sample_rate)
+
+
+def _format_field(value: Any) -> str:
+    text = str(value)
+    return json.dumps(text) if not text or any(c in text for c in ' ="') else text
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        parts = [
+            time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)),
+            record.levelname,
+            record.name,
+        ]
+        if record.request_id:
+            parts.append(f"[{record.request_id}]")
+        parts.append(record.getMessage())
+        parts.extend(f"{key}={_format_field(value)}" for key, value in getattr(record, 'fields', {}).items())
+        line = ' '.join(parts)
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'request_id': record.request_id,
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    Logger taking structured fields as keyword arguments
+
+    log.info("Download complete", video_id=video_id, file_size=size)
+    """
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _LOGGING_KWARGS}
+        kwargs['extra'] = {**kwargs.get('extra', {}), 'fields': fields}
+        return msg, kwargs
+
+
+class YtDlpLogger:
+    def __init__(self, log: StructuredLogger):
+        """
+        Route yt-dlp's output through a structured logger
+
+        yt-dlp's own debug and progress lines are only written at debug level.
+
+        Args:
+            log: Logger to write to
+        """
+        self.log = log
+
+    def debug(self, msg: str):
+        # Also receives yt-dlp's regular screen output
+        self.log.debug(msg, source='yt-dlp')
+
+    def info(self, msg: str):
+        self.log.debug(msg, source='yt-dlp')
+
+    def warning(self, msg: str):
+        self.log.warning(msg, source='yt-dlp')
+
+    def error(self, msg: str):
+        self.log.error(msg, source='yt-dlp')
+
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None,
+                      sample_rate: Optional[float] = None, stream=None):
+    """
+    Set up the promptsnap logger (replaces an earlier configuration)
+
+    Args:
+        level: Minimum level name (defaults to PROMPTSNAP_LOG_LEVEL or INFO)
+        log_format: 'text' or 'json' (defaults to PROMPTSNAP_LOG_FORMAT or text)
+        sample_rate: Share of requests with debug/info records (defaults to PROMPTSNAP_LOG_SAMPLE_RATE or 1)
+        stream: Output stream (defaults to stderr)
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if (log_format or LOG_FORMAT) == 'json' else TextFormatter())
+    handler.addFilter(_RequestFilter(LOG_SAMPLE_RATE if sample_rate is None else sample_rate))
+    logger.addHandler(handler)
+    logger.setLevel(level or LOG_LEVEL)
+    logger.propagate = False
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """
+    Get a structured logger below the promptsnap logger
+
+    Args:
+        name: Component name, e.g. 'downloader'
+
+    Returns:
+        StructuredLogger
+    """
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+# Configured on import so pool processes log the same way as the server
+if not logging.getLogger(ROOT_LOGGER).handlers:
+    configure_logging()
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from structured_log import get_logger
+
+log = get_logger('video_cache')
+
+
+class VideoCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize on-disk video cache with size-bounded LRU eviction
+
+        Entries are keyed by video ID plus the resolved format selector. Readers
+        take a lease on an entry while they use the file; leased entries are never
+        evicted, so a popular video can be read by many requests at once.
+
+        Args:
+            cache_dir: Directory holding cached videos (defaults to PROMPTSNAP_VIDEO_CACHE_DIR or temp/video_cache)
+            max_bytes: Total size limit (defaults to PROMPTSNAP_VIDEO_CACHE_MAX_MB, 2048MB)
+        """
+        self.cache_dir = cache_dir or os.environ.get('PROMPTSNAP_VIDEO_CACHE_DIR', os.path.join('temp', 'video_cache'))
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('PROMPTSNAP_VIDEO_CACHE_MAX_MB', 2048)) * 1024 * 1024
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total_bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'bytes_served': 0, 'insertions': 0, 'evictions': 0}
+
+        self._load_existing()
+
+    @staticmethod
+    def make_key(video_id: str, format_selector: str) -> str:
+        """
+        Build cache key from video ID and resolved format selector
+
+        Args:
+            video_id: YouTube video ID
+            format_selector: yt-dlp format selector used for the download
+
+        Returns:
+            Filesystem-safe cache key
+        """
+        format_hash = hashlib.sha1(format_selector.encode('utf-8')).hexdigest()[:10]
+        return f"{video_id}_{format_hash}"
+
+    def _load_existing(self):
+        """Rebuild the index from files left by a previous run (oldest first)"""
+        found = []
+        for file_name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, file_name)
+            key, ext = os.path.splitext(file_name)
+            if ext in ('.json', '') or not os.path.isfile(path):
+                continue
+            if ext == '.part':
+                # Interrupted insert
+                os.remove(path)
+                continue
+
+            metadata = {}
+            meta_path = os.path.join(self.cache_dir, f"{key}.json")
+            if os.path.exists(meta_path):
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    metadata = {}
+
+            found.append((os.path.getmtime(path), key, path, metadata))
+
+        for mtime, key, path, metadata in sorted(found):
+            size = os.path.getsize(path)
+            self._entries[key] = {'path': path, 'size': size, 'leases': 0, 'last_access': mtime, 'metadata': metadata}
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict_locked()
+
+    def acquire(self, key: str) -> Optional[Dict]:
+        """
+        Look up an entry and lease it
+
+        Every successful acquire must be paired with release(key).
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Entry dictionary (path, size, metadata) or None on miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry['path']):
+                if entry is not None:
+                    self._drop_locked(key)
+                self._stats['misses'] += 1
+                return None
+
+            entry['leases'] += 1
+            entry['last_access'] = time.time()
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            self._stats['bytes_served'] += entry['size']
+            return {'key': key, 'path': entry['path'], 'size': entry['size'], 'metadata': dict(entry['metadata'])}
+
+    def put(self, key: str, source_path: str, metadata: Optional[Dict] = None) -> Dict:
+        """
+        Move a downloaded file into the cache and lease it
+
+        If another request inserted the same key first, the new file is discarded
+        and the existing entry is leased instead.
+
+        Args:
+            key: Cache key
+            source_path: Freshly downloaded file
+            metadata: Small JSON-serializable dictionary stored next to the file (title, duration)
+
+        Returns:
+            Entry dictionary (path, size, metadata)
+        """
+        metadata = metadata or {}
+        ext = os.path.splitext(source_path)[1] or '.mp4'
+        final_path = os.path.join(self.cache_dir, f"{key}{ext}")
+        # Own temporary name per writer: the same key can be inserted by
+        # concurrent downloads that were not coalesced (different quality, same format)
+        fd, part_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix='.part')
+        os.close(fd)
+
+        # Move outside the lock; the rename to the final name is atomic so
+        # readers never see a partially written file
+        shutil.move(source_path, part_path)
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None and os.path.exists(existing['path']):
+                os.remove(part_path)
+                existing['leases'] += 1
+                self._entries.move_to_end(key)
+                return {'key': key, 'path': existing['path'], 'size': existing['size'], 'metadata': dict(existing['metadata'])}
+
+            os.replace(part_path, final_path)
+            try:
+                with open(os.path.join(self.cache_dir, f"{key}.json"), 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f)
+            except OSError:
+                pass
+
+            size = os.path.getsize(final_path)
+            self._entries[key] = {'path': final_path, 'size': size, 'leases': 1, 'last_access': time.time(), 'metadata': metadata}
+            self._total_bytes += size
+            self._stats['insertions'] += 1
+            self._evict_locked()
+
+            return {'key': key, 'path': final_path, 'size': size, 'metadata': dict(metadata)}
+
+    def lease(self, key: str) -> bool:
+        """
+        Take an additional lease on an entry that is already leased
+
+        Used when one download result is handed to several requests.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if the entry exists
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry['leases'] += 1
+            return True
+
+    def release(self, key: str):
+        """
+        Release a lease taken by acquire() or put()
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['leases'] = max(0, entry['leases'] - 1)
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """Evict least recently used, unleased entries until the cache fits"""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        for key in list(self._entries.keys()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if self._entries[key]['leases'] > 0:
+                continue
+            self._drop_locked(key)
+            self._stats['evictions'] += 1
+
+    def _drop_locked(self, key: str):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry['size']
+        for path in (entry['path'], os.path.join(self.cache_dir, f"{key}.json")):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                log.warning("Cache file deletion failed", path=path, error=str(e))
+
+    def clear(self):
+        """
+        Remove every unleased entry
+        """
+        with self._lock:
+            for key in list(self._entries.keys()):
+                if self._entries[key]['leases'] == 0:
+                    self._drop_locked(key)
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Hit/miss counts, bytes served from cache and current usage
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'leased_entries': sum(1 for e in self._entries.values() if e['leases'] > 0),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -1,72 +1,71 @@
 import os
 import tempfile
 import shutil
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import yt_dlp
 import re
 from datetime import datetime
 import time
 import sys
+import itertools
+import logging
+import uuid
+from video_cache import VideoCache
+from metadata_cache import MetadataCache
+from storyboard import select_storyboard_format
+from pipeline_progress import is_listening, report_progress
+from metrics import CACHE_HITS, CACHE_MISSES, DOWNLOADED_BYTES, SIMPLE_DOWNLOAD_FALLBACKS, observe_stage
+from structured_log import YtDlpLogger, get_logger
+
+log = get_logger('downloader')
 
 class YouTubeDownloader:
-    def __init__(self, download_dir: str = "temp"):
+    def __init__(self, download_dir: str = "temp", video_cache: Optional[VideoCache] = None,
+                 metadata_cache: Optional[MetadataCache] = None):
         """
         Initialize YouTube downloader
         
         Args:
             download_dir: Directory to save downloaded videos
+            video_cache: Cache for downloaded videos (defaults to one inside download_dir)
+            metadata_cache: Cache for yt-dlp info dicts shared by get_video_info and download_video
         """
         self.download_dir = download_dir
         
         # Create download directory if it doesn't exist
         os.makedirs(download_dir, exist_ok=True)
         
-        print(f"🔧 [INIT] YouTube Downloader initialized:")
-        print(f"  - Download directory: {os.path.abspath(download_dir)}")
-        print(f"  - Directory exists: {os.path.exists(download_dir)}")
-        print(f"  - Directory writable: {os.access(download_dir, os.W_OK)}")
-        
-        # Check system information
-        print(f"🖥️ [SYSTEM] System information:")
-        print(f"  - Python version: {sys.version}")
-        print(f"  - Platform: {sys.platform}")
-        print(f"  - Current working directory: {os.getcwd()}")
+        self._share_counter = itertools.count(1)
+        self.metadata_cache = metadata_cache or MetadataCache()
+        self.video_cache = video_cache or VideoCache(
+            os.environ.get('PROMPTSNAP_VIDEO_CACHE_DIR') or os.path.join(download_dir, 'video_cache')
+        )
         
-        # Check yt-dlp version
-        try:
-            import yt_dlp
-            print(f"  - yt-dlp version: {yt_dlp.version.__version__}")
-        except Exception as e:
-            print(f"  - yt-dlp version check failed: {e}")
+        self._ydl_logger = YtDlpLogger(get_logger('yt_dlp'))
+        self._server_environment: Optional[bool] = None
         
         # Check disk space
         try:
-            import shutil
-            total, used, free = shutil.disk_usage(download_dir)
-            print(f"💾 [DISK] Disk space:")
-            print(f"  - Total: {total / 1024 / 1024 / 1024:.1f}GB")
-            print(f"  - Used: {used / 1024 / 1024 / 1024:.1f}GB")
-            print(f"  - Free: {free / 1024 / 1024 / 1024:.1f}GB")
-        except Exception as e:
-            print(f"  - Disk space check failed: {e}")
+            free_gb = round(shutil.disk_usage(download_dir).free / 1024 / 1024 / 1024, 1)
+        except Exception:
+            free_gb = None
         
-        # Check environment variables
-        print(f"🔑 [ENV] Environment variables:")
         proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy']
-        for var in proxy_vars:
-            if var in os.environ:
-                print(f"  - {var}: {os.environ[var]}")
-        
-        # Check if server environment
-        is_server = self._is_server_environment()
-        print(f"🌐 [ENV] Server environment: {is_server}")
-        
-        print(f"✅ [INIT] Initialization complete")
-        print("-" * 50)
+        log.info("YouTube downloader initialized",
+                 download_dir=os.path.abspath(download_dir),
+                 writable=os.access(download_dir, os.W_OK),
+                 free_gb=free_gb,
+                 yt_dlp_version=yt_dlp.version.__version__,
+                 proxies=[var for var in proxy_vars if var in os.environ],
+                 server_environment=self._is_server_environment())
+        log.debug("System information", python_version=sys.version.split()[0], platform=sys.platform, cwd=os.getcwd())
     
     def _is_server_environment(self) -> bool:
-        """Check if running in server environment"""
+        """Check if running in server environment (detected once)"""
+        if self._server_environment is not None:
+            return self._server_environment
+        
         server_indicators = [
             'RENDER',
             'HEROKU',
@@ -78,36 +77,53 @@ class YouTubeDownloader:
             'AZURE_FUNCTIONS_WORKER_RUNTIME',
         ]
         
-        is_server = any(indicator in os.environ for indicator in server_indicators)
-        
-        print(f"🌐 [ENV] Server environment detection:")
-        print(f"  - Is server: {is_server}")
-        
-        if is_server:
-            detected_envs = [env for env in server_indicators if env in os.environ]
-            print(f"  - Detected environments: {detected_envs}")
+        detected_envs = [env for env in server_indicators if env in os.environ]
         
         # Check for common server paths
         server_paths = ['/app', '/tmp', '/var/task']
         current_path = os.getcwd()
         path_indicates_server = any(path in current_path for path in server_paths)
         
-        print(f"  - Current path: {current_path}")
-        print(f"  - Path indicates server: {path_indicates_server}")
+        self._server_environment = bool(detected_envs) or path_indicates_server
+        log.debug("Server environment detected", is_server=self._server_environment,
+                  environments=detected_envs, cwd=current_path, path_indicates_server=path_indicates_server)
+        return self._server_environment
+    
+    def _get_ydl_log_opts(self) -> Dict:
+        """
+        yt-dlp output options: routed through the logger, verbose only at debug level
+        """
+        verbose = log.isEnabledFor(logging.DEBUG)
+        return {'logger': self._ydl_logger, 'quiet': not verbose, 'verbose': verbose}
+    
+    def _make_output_name(self, video_id: Optional[str]) -> str:
+        """
+        Unique base name for the files of one download
         
-        final_result = is_server or path_indicates_server
-        print(f"  - Final result: {final_result}")
+        The random part keeps concurrent downloads of the same video (e.g. at
+        different qualities, within the same second) from picking up or
+        deleting each other's files.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{video_id or 'video'}_{timestamp}_{uuid.uuid4().hex[:8]}"
+    
+    def _reported_downloads(self, info: Dict) -> List[Dict]:
+        """
+        Downloads yt-dlp reports for a processed info dict (one per format or section)
         
-        return final_result
+        Returns:
+            requested_downloads entries whose 'filepath' exists
+        """
+        return [
+            download for download in info.get('requested_downloads') or []
+            if download.get('filepath') and os.path.exists(download['filepath'])
+        ]
     
     def _get_safe_ydl_opts(self) -> Dict:
         """Get safe yt-dlp options optimized for server environments"""
         
         is_server = self._is_server_environment()
         
-        print(f"⚙️ [OPTS] Configuring yt-dlp options:")
-        print(f"  - Server environment: {is_server}")
-        
         # More realistic browser headers to avoid bot detection
         user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -140,6 +156,7 @@ class YouTubeDownloader:
             'referer': 'https://www.youtube.com/',
             'merge_output_format': 'mp4',
             'postprocessors': [],
+            **self._get_ydl_log_opts(),
             
             # Additional headers to mimic real browser behavior
             'http_headers': {
@@ -180,19 +197,6 @@ class YouTubeDownloader:
                 'sleep_interval_requests': 1,  # Sleep between requests
                 'sleep_interval_subtitles': 1,  # Sleep between subtitle requests
             })
-            
-            print(f"  - Applied server-specific limits:")
-            print(f"    - Max filesize: {opts['max_filesize'] / 1024 / 1024:.0f}MB")
-            print(f"    - Rate limit: {opts['ratelimit'] / 1024 / 1024:.0f}MB/s")
-            print(f"    - Sleep interval: {opts['sleep_interval']}s")
-        
-        print(f"  - Socket timeout: {opts['socket_timeout']}s")
-        print(f"  - Retries: {opts['retries']}")
-        print(f"  - Fragment retries: {opts['fragment_retries']}")
-        print(f"  - User agent: {opts['user_agent'][:50]}...")
-        print(f"  - Format: {opts['format']}")
-        print(f"  - Geo bypass: {opts['geo_bypass']}")
-        print(f"  - Additional headers: {len(opts['http_headers'])} headers")
         
         return opts
     
@@ -208,14 +212,19 @@ class YouTubeDownloader:
             Download information or None
         """
         try:
-            print("🔧 [SIMPLE] Trying simple download approach...")
-            
             video_id = self.extract_video_id(url)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{video_id}_{timestamp}_simple"
+            filename = f"{self._make_output_name(video_id)}_simple"
+            
+            log.info("Trying simple download", video_id=video_id, output_name=filename)
+            
+            # Availability is known from earlier metadata; no need to re-resolve per approach
+            cached_info = self.metadata_cache.get(video_id) if video_id else None
+            if cached_info and cached_info.get('availability') in ['private', 'premium_only', 'subscriber_only']:
+                log.warning("Video not publicly available", video_id=video_id,
+                            availability=cached_info.get('availability'))
+                return None
             
-            print(f"🔧 [SIMPLE] Video ID: {video_id}")
-            print(f"🔧 [SIMPLE] Filename: {filename}")
+            ydl_log_opts = self._get_ydl_log_opts()
             
             # Try multiple approaches to avoid bot detection
             approaches = [
@@ -224,9 +233,8 @@ class YouTubeDownloader:
                     'opts': {
                         'format': 'best[ext=mp4]/best',
                         'outtmpl': os.path.join(self.download_dir, f'{filename}.%(ext)s'),
-                        'quiet': False,
+                        **ydl_log_opts,
                         'no_warnings': False,
-                        'verbose': True,
                         'writeinfojson': False,
                         'writethumbnail': False,
                         'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -252,8 +260,7 @@ class YouTubeDownloader:
                     'opts': {
                         'format': 'best[ext=mp4]/worst[ext=mp4]/best',
                         'outtmpl': os.path.join(self.download_dir, f'{filename}_mobile.%(ext)s'),
-                        'quiet': False,
-                        'verbose': True,
+                        **ydl_log_opts,
                         'writeinfojson': False,
                         'writethumbnail': False,
                         'user_agent': 'Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36',
@@ -280,8 +287,7 @@ class YouTubeDownloader:
                     'opts': {
                         'format': 'worst[ext=mp4]/best[ext=mp4]/worst',
                         'outtmpl': os.path.join(self.download_dir, f'{filename}_tv.%(ext)s'),
-                        'quiet': False,
-                        'verbose': True,
+                        **ydl_log_opts,
                         'writeinfojson': False,
                         'writethumbnail': False,
                         'user_agent': 'Mozilla/5.0 (SMART-TV; Linux; Tizen 2.4.0) AppleWebKit/538.1 (KHTML, like Gecko) Version/2.4.0 TV Safari/538.1',
@@ -301,94 +307,77 @@ class YouTubeDownloader:
             ]
             
             for i, approach in enumerate(approaches):
-                print(f"🔧 [SIMPLE] Trying approach {i+1}: {approach['name']}")
+                log.info("Trying simple download approach", approach=approach['name'], attempt=i + 1)
                 
                 try:
                     # Add some delay between attempts
                     if i > 0:
                         delay = 3 + i * 2
-                        print(f"🔧 [SIMPLE] Waiting {delay}s before next attempt...")
+                        log.debug("Waiting before next approach", delay=delay)
                         time.sleep(delay)
                     
                     with yt_dlp.YoutubeDL(approach['opts']) as ydl:
-                        print(f"🔧 [SIMPLE] Extracting info with {approach['name']}...")
-                        info = ydl.extract_info(url, download=False)
+                        # Each approach uses its own player client, so resolve and
+                        # download in a single extractor round-trip
+                        with observe_stage('download'):
+                            info = ydl.extract_info(url, download=True)
                         
-                        print(f"🔧 [SIMPLE] Info extracted successfully:")
-                        print(f"  - Title: {info.get('title', 'N/A')}")
-                        print(f"  - Duration: {info.get('duration', 'N/A')}")
-                        print(f"  - Availability: {info.get('availability', 'N/A')}")
+                        log.debug("Simple download completed", approach=approach['name'], title=info.get('title'),
+                                  duration=info.get('duration'), availability=info.get('availability'))
                         
-                        # Check if video is actually available
-                        if info.get('availability') in ['private', 'premium_only', 'subscriber_only']:
-                            print(f"🔧 [SIMPLE] Video not publicly available: {info.get('availability')}")
-                            continue
-                        
-                        print(f"🔧 [SIMPLE] Starting download with {approach['name']}...")
-                        ydl.download([url])
-                        
-                        print(f"🔧 [SIMPLE] Download completed, looking for files...")
-                        
-                        # Find downloaded file
-                        if os.path.exists(self.download_dir):
-                            all_files = os.listdir(self.download_dir)
-                            print(f"🔧 [SIMPLE] All files: {all_files}")
+                        # Use the file yt-dlp reports for this download
+                        for download in self._reported_downloads(info):
+                            file_path = download['filepath']
+                            file_size = os.path.getsize(file_path)
+                            
+                            if file_size > 0:
+                                DOWNLOADED_BYTES.inc(file_size, kind='video')
+                                # Not cached: the approach's format need not match the requested
+                                # quality, so no later lookup would (or should) hit this file
+                                result = {
+                                    'video_id': video_id,
+                                    'title': info.get('title'),
+                                    'duration': info.get('duration'),
+                                    'file_path': file_path,
+                                    'file_size': file_size,
+                                    'downloaded_files': [file_path],
+                                    'download_time': datetime.now().isoformat(),
+                                    'method': f'simple_{approach["name"].lower().replace(" ", "_")}',
+                                    'approach': approach['name'],
+                                    'output_name': filename,
+                                }
+                                
+                                log.info("Simple download successful", approach=approach['name'],
+                                         video_id=video_id, file_size=file_size)
+                                return result
                             
-                            # Look for files with our filename patterns
-                            for file in all_files:
-                                if any(pattern in file for pattern in [filename, f"{filename}_mobile", f"{filename}_tv"]):
-                                    file_path = os.path.join(self.download_dir, file)
-                                    file_size = os.path.getsize(file_path)
-                                    
-                                    print(f"🔧 [SIMPLE] Found file: {file}")
-                                    print(f"🔧 [SIMPLE] File size: {file_size} bytes")
-                                    
-                                    if file_size > 0:
-                                        result = {
-                                            'video_id': video_id,
-                                            'title': info.get('title'),
-                                            'duration': info.get('duration'),
-                                            'file_path': file_path,
-                                            'file_size': file_size,
-                                            'downloaded_files': [file_path],
-                                            'download_time': datetime.now().isoformat(),
-                                            'method': f'simple_{approach["name"].lower().replace(" ", "_")}',
-                                            'approach': approach['name']
-                                        }
-                                        
-                                        print(f"✅ [SIMPLE] Simple download successful with {approach['name']}!")
-                                        return result
-                                    else:
-                                        print(f"❌ [SIMPLE] File is empty")
-                        else:
-                            print(f"❌ [SIMPLE] Download directory doesn't exist")
+                            log.warning("Downloaded file is empty", file_path=file_path)
+                            self.cleanup_file(file_path)
                             
                 except Exception as e:
                     error_msg = str(e)
-                    print(f"❌ [SIMPLE] {approach['name']} failed:")
-                    print(f"  - Error: {error_msg}")
                     
                     # Check if it's a bot detection error
                     if any(phrase in error_msg.lower() for phrase in [
                         'sign in to confirm', 'not a bot', 'cookies', 'authentication'
                     ]):
-                        print(f"🤖 [SIMPLE] Bot detection error with {approach['name']}")
+                        log.warning("Simple download approach hit bot detection", approach=approach['name'],
+                                    error=error_msg)
                         continue
                     
                     # Check if it's a video unavailable error
                     if 'video unavailable' in error_msg.lower():
-                        print(f"📵 [SIMPLE] Video unavailable error - stopping attempts")
+                        log.warning("Video unavailable, stopping simple download", approach=approach['name'],
+                                    error=error_msg)
                         break
-                        
-                    print(f"🔄 [SIMPLE] Will try next approach...")
+                    
+                    log.warning("Simple download approach failed", approach=approach['name'], error=error_msg)
             
-            print(f"❌ [SIMPLE] All approaches failed")
+            log.error("All simple download approaches failed", video_id=video_id)
             return None
             
         except Exception as e:
-            print(f"❌ [SIMPLE] Simple download failed:")
-            print(f"  - Error type: {type(e).__name__}")
-            print(f"  - Error message: {str(e)}")
+            log.error("Simple download failed", error_type=type(e).__name__, error=str(e))
             return None
     
     def extract_video_id(self, url: str) -> Optional[str]:
@@ -467,104 +456,73 @@ class YouTubeDownloader:
             Video information dictionary or None
         """
         video_id = self.extract_video_id(url)
-        print(f"🔍 [DEBUG] Extracting info for video ID: {video_id}")
-        print(f"🔍 [DEBUG] Full URL: {url}")
+        
+        cached_info = self.metadata_cache.get(video_id) if video_id else None
+        if cached_info:
+            log.debug("Using cached metadata", video_id=video_id)
+            return self._build_info_summary(cached_info)
         
         # Try with safe options first
         try:
-            print("🔍 [DEBUG] Trying with safe yt-dlp options...")
             ydl_opts = self._get_safe_ydl_opts()
-            ydl_opts.update({
-                'quiet': False,  # Enable verbose output for debugging
-                'no_warnings': False,
-                'verbose': True,  # More detailed logging
-            })
-            
-            print(f"🔍 [DEBUG] yt-dlp options: {ydl_opts}")
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print("🔍 [DEBUG] Starting yt-dlp extract_info...")
-                info = ydl.extract_info(url, download=False)
+                info = self._extract_info_cached(ydl, url, video_id)
                 
-                print(f"🔍 [DEBUG] Successfully extracted info:")
-                print(f"  - Title: {info.get('title', 'N/A')}")
-                print(f"  - Uploader: {info.get('uploader', 'N/A')}")
-                print(f"  - Duration: {info.get('duration', 'N/A')}")
-                print(f"  - View count: {info.get('view_count', 'N/A')}")
-                print(f"  - Upload date: {info.get('upload_date', 'N/A')}")
-                print(f"  - Availability: {info.get('availability', 'N/A')}")
-                print(f"  - Age limit: {info.get('age_limit', 'N/A')}")
-                print(f"  - Live status: {info.get('live_status', 'N/A')}")
+                log.info("Video information extracted", video_id=video_id, title=info.get('title'),
+                         duration=info.get('duration'), availability=info.get('availability'),
+                         live_status=info.get('live_status'))
                 
-                return {
-                    'id': info.get('id'),
-                    'title': info.get('title'),
-                    'duration': info.get('duration'),
-                    'uploader': info.get('uploader'),
-                    'upload_date': info.get('upload_date'),
-                    'view_count': info.get('view_count'),
-                    'description': info.get('description', '')[:200] + '...',
-                    'thumbnail': info.get('thumbnail'),
-                    'availability': info.get('availability'),
-                    'age_limit': info.get('age_limit'),
-                    'live_status': info.get('live_status'),
-                }
+                return self._build_info_summary(info)
                 
         except Exception as e:
             error_str = str(e)
-            print(f"❌ [ERROR] Failed to extract video information with safe options:")
-            print(f"  - Error type: {type(e).__name__}")
-            print(f"  - Error message: {error_str}")
-            print(f"  - Video ID: {video_id}")
             
             # Check for specific error patterns
+            reason = None
             if 'video unavailable' in error_str.lower():
-                print("❌ [ANALYSIS] Video is marked as unavailable by YouTube")
-                
-                # Try to get more details about why it's unavailable
+                reason = 'unavailable'
+            elif 'private video' in error_str.lower():
+                reason = 'private'
+            elif 'sign in to confirm your age' in error_str.lower():
+                reason = 'age_restricted'
+            elif 'this video is not available' in error_str.lower():
+                reason = 'region_blocked'
+            
+            log.warning("Failed to extract video information with safe options", video_id=video_id,
+                        reason=reason, error_type=type(e).__name__, error=error_str)
+            
+            # Details on why a video is unavailable cost another round-trip; only fetch them for debugging
+            if reason == 'unavailable' and log.isEnabledFor(logging.DEBUG):
                 try:
-                    print("🔍 [DEBUG] Attempting minimal extraction for error details...")
                     minimal_opts = {
-                        'quiet': False,
-                        'verbose': True,
+                        **self._get_ydl_log_opts(),
                         'ignore_errors': True,
                         'extract_flat': True,
                     }
                     
                     with yt_dlp.YoutubeDL(minimal_opts) as ydl:
                         minimal_info = ydl.extract_info(url, download=False)
-                        print(f"🔍 [DEBUG] Minimal info extraction result: {minimal_info}")
+                        log.debug("Minimal info extraction result", video_id=video_id, info=minimal_info)
                         
                 except Exception as e2:
-                    print(f"❌ [ERROR] Even minimal extraction failed: {str(e2)}")
-            
-            elif 'private video' in error_str.lower():
-                print("❌ [ANALYSIS] Video is private")
-            elif 'sign in to confirm your age' in error_str.lower():
-                print("❌ [ANALYSIS] Video is age-restricted")
-            elif 'this video is not available' in error_str.lower():
-                print("❌ [ANALYSIS] Video not available in this region")
+                    log.debug("Even minimal extraction failed", video_id=video_id, error=str(e2))
             
             # Fallback: try with minimal options
             try:
-                print("🔍 [DEBUG] Trying with minimal options...")
                 ydl_opts = {
-                    'quiet': False,
+                    **self._get_ydl_log_opts(),
                     'no_warnings': False,
-                    'verbose': True,
                     'socket_timeout': 10,
                     'retries': 0,
                     'user_agent': 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
                     'extract_flat': False,
                 }
                 
-                print(f"🔍 [DEBUG] Minimal options: {ydl_opts}")
-                
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                     info = ydl.extract_info(url, download=False)
                     
-                    print(f"✅ [SUCCESS] Minimal extraction succeeded:")
-                    print(f"  - Title: {info.get('title', 'Unknown')}")
+                    log.info("Minimal extraction succeeded", video_id=video_id, title=info.get('title'))
                     
                     return {
                         'id': info.get('id'),
@@ -580,11 +538,73 @@ class YouTubeDownloader:
                     }
                     
             except Exception as e2:
-                print(f"❌ [ERROR] Failed to extract video information with minimal options:")
-                print(f"  - Error type: {type(e2).__name__}")
-                print(f"  - Error message: {str(e2)}")
+                log.error("Failed to extract video information with minimal options", video_id=video_id,
+                          error_type=type(e2).__name__, error=str(e2))
                 return None
     
+    def _build_info_summary(self, info: Dict) -> Dict:
+        """
+        Build the get_video_info result from a yt-dlp info dict
+        """
+        return {
+            'id': info.get('id'),
+            'title': info.get('title'),
+            'duration': info.get('duration'),
+            'uploader': info.get('uploader'),
+            'upload_date': info.get('upload_date'),
+            'view_count': info.get('view_count'),
+            'description': (info.get('description') or '')[:200] + '...',
+            'thumbnail': info.get('thumbnail'),
+            'availability': info.get('availability'),
+            'age_limit': info.get('age_limit'),
+            'live_status': info.get('live_status'),
+        }
+    
+    def _extract_info_cached(self, ydl: yt_dlp.YoutubeDL, url: str, video_id: Optional[str]) -> Dict:
+        """
+        Get the info dict from the metadata cache, or resolve it once with ydl and cache it
+        
+        Args:
+            ydl: Configured YoutubeDL instance
+            url: YouTube URL
+            video_id: YouTube video ID (None disables caching)
+            
+        Returns:
+            Sanitized info dict (a private copy the caller may mutate)
+        """
+        if video_id:
+            info = self.metadata_cache.get(video_id)
+            if info:
+                CACHE_HITS.inc(cache='metadata')
+                log.debug("Using cached metadata", video_id=video_id)
+                return info
+            CACHE_MISSES.inc(cache='metadata')
+        
+        with observe_stage('metadata'):
+            info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+        if video_id:
+            self.metadata_cache.put(video_id, info)
+        return info
+    
+    def get_video_metadata(self, url: str) -> Optional[Dict]:
+        """
+        Get the full yt-dlp info dict (formats, storyboards, duration) through the metadata cache
+        
+        Args:
+            url: YouTube URL
+            
+        Returns:
+            Info dict or None
+        """
+        try:
+            ydl_opts = self._get_safe_ydl_opts()
+            ydl_opts.update({'quiet': True, 'no_warnings': True})
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                return self._extract_info_cached(ydl, url, self.extract_video_id(url))
+        except Exception as e:
+            log.warning("Failed to extract video metadata", error=str(e))
+            return None
+    
     def download_video(self, url: str, quality: str = 'best') -> Optional[Dict]:
         """
         Download YouTube video with simple retry logic optimized for server environments
@@ -597,40 +617,38 @@ class YouTubeDownloader:
             Download information dictionary or None
         """
         video_id = self.extract_video_id(url)
-        print(f"🚀 [DOWNLOAD] Starting download for video ID: {video_id}")
-        print(f"🚀 [DOWNLOAD] URL: {url}")
-        print(f"🚀 [DOWNLOAD] Requested quality: {quality}")
-        print(f"🚀 [DOWNLOAD] Server environment: {self._is_server_environment()}")
+        
+        # Serve repeated requests from the local cache without touching the network
+        cache_key = None
+        if video_id:
+            cache_key = self.video_cache.make_key(video_id, self._get_format_selector(quality))
+            cached_result = self._get_cached_download(video_id, cache_key)
+            if cached_result:
+                log.info("Serving download from cache", video_id=video_id, quality=quality,
+                         file_path=cached_result['file_path'])
+                return cached_result
         
         # Use fewer retries in server environments
         max_retries = 2 if self._is_server_environment() else 3
-        print(f"🚀 [DOWNLOAD] Max retries: {max_retries}")
+        log.info("Starting download", video_id=video_id, quality=quality, max_retries=max_retries)
         
         for attempt in range(max_retries):
             try:
                 if attempt > 0:
                     # Simple delay between retries
                     delay = 2 * attempt
-                    print(f"⏳ [RETRY] Retrying download in {delay}s... (attempt {attempt + 1}/{max_retries})")
+                    log.info("Retrying download", video_id=video_id, attempt=attempt + 1, delay=delay)
                     time.sleep(delay)
                 
-                print(f"🔄 [ATTEMPT {attempt + 1}] Starting download attempt...")
-                
                 # Validate URL
                 is_valid, message = self.validate_url(url)
                 if not is_valid:
-                    print(f"❌ [VALIDATION] URL validation failed: {message}")
                     raise ValueError(message)
                 
-                print(f"✅ [VALIDATION] URL is valid")
-                
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{video_id}_{timestamp}"
-                print(f"📁 [FILE] Output filename: {filename}")
+                filename = self._make_output_name(video_id)
                 
                 # Configure yt-dlp options
                 format_selector = self._get_format_selector(quality)
-                print(f"🎬 [FORMAT] Format selector: {format_selector}")
                 
                 ydl_opts = self._get_safe_ydl_opts()
                 ydl_opts.update({
@@ -640,89 +658,58 @@ class YouTubeDownloader:
                     'writethumbnail': False,
                     'extractaudio': False,
                     'merge_output_format': 'mp4',
-                    'verbose': True,  # Enable verbose logging
+                    'progress_hooks': self._get_progress_hooks(),
                 })
                 
-                print(f"⚙️ [CONFIG] Download directory: {self.download_dir}")
-                print(f"⚙️ [CONFIG] yt-dlp options: {ydl_opts}")
-                
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    print(f"🔍 [INFO] Extracting video information...")
-                    
-                    # Extract video information
-                    info = ydl.extract_info(url, download=False)
+                    # Extract video information (reused from get_video_info if still fresh)
+                    info = self._extract_info_cached(ydl, url, video_id)
                     
                     # Check video duration - avoid very long videos on servers
                     duration = info.get('duration', 0)
                     title = info.get('title', 'Unknown')
                     availability = info.get('availability', 'unknown')
+                    formats = info.get('formats', [])
                     
-                    print(f"📹 [VIDEO INFO] Title: {title}")
-                    print(f"📹 [VIDEO INFO] Duration: {duration}s")
-                    print(f"📹 [VIDEO INFO] Availability: {availability}")
-                    print(f"📹 [VIDEO INFO] Uploader: {info.get('uploader', 'Unknown')}")
-                    print(f"📹 [VIDEO INFO] Upload date: {info.get('upload_date', 'Unknown')}")
+                    log.debug("Resolved video", video_id=video_id, title=title, duration=duration,
+                              availability=availability, format_selector=format_selector, formats=len(formats))
                     
                     if duration > 600:  # 10 minutes
-                        print(f"⚠️ [WARNING] Video is {duration}s long, might cause server timeout")
+                        log.warning("Long video might cause server timeout", video_id=video_id, duration=duration)
                     
                     # Check if video is actually available for download
                     if availability and availability not in ['public', 'unlisted']:
-                        print(f"❌ [AVAILABILITY] Video availability issue: {availability}")
-                    
-                    # Check available formats
-                    formats = info.get('formats', [])
-                    print(f"🎬 [FORMATS] Available formats count: {len(formats)}")
-                    
-                    if formats:
-                        for i, fmt in enumerate(formats[:5]):  # Show first 5 formats
-                            print(f"  Format {i+1}: {fmt.get('format_id', 'N/A')} - {fmt.get('format', 'N/A')}")
-                    else:
-                        print(f"❌ [FORMATS] No formats available!")
-                    
-                    print(f"⬇️ [DOWNLOAD] Starting actual download...")
+                        log.warning("Video availability issue", video_id=video_id, availability=availability)
                     
-                    # Execute actual download
-                    ydl.download([url])
+                    if not formats:
+                        log.warning("No formats available", video_id=video_id)
                     
-                    print(f"✅ [DOWNLOAD] Download command completed, looking for files...")
-                    
-                    # Find downloaded files
-                    downloaded_files = []
-                    if os.path.exists(self.download_dir):
-                        all_files = os.listdir(self.download_dir)
-                        print(f"📁 [FILES] All files in download dir: {all_files}")
-                        
-                        for file in all_files:
-                            if file.startswith(filename):
-                                downloaded_files.append(os.path.join(self.download_dir, file))
-                                print(f"📄 [MATCH] Found matching file: {file}")
-                    else:
-                        print(f"❌ [ERROR] Download directory doesn't exist: {self.download_dir}")
+                    # Execute actual download from the already-resolved info dict
+                    # (ydl.download([url]) would resolve the page and player again)
+                    with observe_stage('download'):
+                        info = ydl.process_ie_result(info, download=True)
                     
-                    print(f"📋 [SUMMARY] Downloaded files: {downloaded_files}")
+                    # Files of this download only, as reported by yt-dlp
+                    downloaded_files = [download['filepath'] for download in self._reported_downloads(info)]
                     
                     # Find video file
                     video_file = None
                     for file in downloaded_files:
                         if file.endswith(('.mp4', '.mkv', '.webm', '.avi')):
                             video_file = file
-                            print(f"🎬 [VIDEO] Found video file: {video_file}")
                             break
                     
                     if not video_file:
-                        print(f"❌ [ERROR] No video file found in downloaded files")
                         raise Exception("Downloaded video file not found.")
                     
                     # Check file size
                     file_size = os.path.getsize(video_file)
-                    print(f"📏 [SIZE] File size: {file_size} bytes ({file_size / 1024 / 1024:.1f}MB)")
+                    DOWNLOADED_BYTES.inc(file_size, kind='video')
                     
                     if file_size == 0:
-                        print(f"❌ [ERROR] Downloaded file is empty")
                         raise Exception("Downloaded file is empty.")
                     
-                    result = {
+                    result = self._store_in_cache(cache_key, video_file, {
                         'video_id': video_id,
                         'title': title,
                         'duration': duration,
@@ -732,20 +719,20 @@ class YouTubeDownloader:
                         'download_time': datetime.now().isoformat(),
                         'availability': availability,
                         'attempt': attempt + 1,
-                    }
+                        'output_name': filename,
+                    })
                     
-                    print(f"🎉 [SUCCESS] Download complete: {video_file} ({file_size / 1024 / 1024:.1f}MB)")
+                    log.info("Download complete", video_id=video_id, quality=quality, attempt=attempt + 1,
+                             file_path=result['file_path'], file_size=file_size)
                     return result
                     
             except Exception as e:
                 error_msg = str(e)
                 error_type = type(e).__name__
                 
-                print(f"❌ [ERROR] Download attempt {attempt + 1} failed:")
-                print(f"  - Error type: {error_type}")
-                print(f"  - Error message: {error_msg}")
-                print(f"  - Video ID: {video_id}")
-                print(f"  - Quality: {quality}")
+                # Stream URLs in cached metadata may be stale; resolve again on retry
+                if video_id:
+                    self.metadata_cache.invalidate(video_id)
                 
                 # Detailed error analysis
                 error_lower = error_msg.lower()
@@ -755,43 +742,399 @@ class YouTubeDownloader:
                     'video unavailable', 'private video', 'sign in to confirm your age',
                     'video has been removed', 'video is not available', 'requested format not available'
                 ]):
-                    print(f"🛑 [ANALYSIS] Video is unavailable or restricted. Stopping retries.")
-                    print(f"  - Specific issue: Video cannot be accessed")
-                    break
+                    error_kind = 'unavailable'
                 
                 # Check for server-specific errors
                 elif any(phrase in error_lower for phrase in [
                     'connection timeout', 'read timeout', 'network unreachable',
                     'temporary failure', 'service unavailable'
                 ]):
-                    print(f"🌐 [ANALYSIS] Network/server error detected:")
-                    print(f"  - Issue: Network connectivity problem")
-                    print(f"  - Action: Will retry with longer delay...")
-                    if attempt < max_retries - 1:
-                        time.sleep(5)  # Longer delay for network issues
+                    error_kind = 'network'
                 
                 # Check for format-related errors
                 elif any(phrase in error_lower for phrase in [
                     'no video formats', 'format not available', 'no suitable format'
                 ]):
-                    print(f"🎬 [ANALYSIS] Format-related error:")
-                    print(f"  - Issue: Requested format not available")
-                    print(f"  - Action: Will try different quality")
+                    error_kind = 'format'
                 
                 # Other errors
                 else:
-                    print(f"❓ [ANALYSIS] Unknown error type")
-                    print(f"  - Will retry with standard delay")
+                    error_kind = 'unknown'
+                
+                log.warning("Download attempt failed", video_id=video_id, quality=quality, attempt=attempt + 1,
+                            error_kind=error_kind, error_type=error_type, error=error_msg)
+                
+                # Unavailable or restricted videos won't download on retry
+                if error_kind == 'unavailable':
+                    break
+                if error_kind == 'network' and attempt < max_retries - 1:
+                    time.sleep(5)  # Longer delay for network issues
                     
                 # If it's the last attempt, try with different quality
                 if attempt == max_retries - 1 and quality != 'worst':
-                    print(f"🔄 [FALLBACK] Trying with lowest quality as final attempt...")
+                    log.info("Trying lowest quality as final attempt", video_id=video_id)
                     return self.download_video(url, 'worst')
                     
         # Final fallback: try the simplest download approach
-        print(f"🆘 [FALLBACK] All standard attempts failed. Trying simple download approach...")
+        log.warning("All standard download attempts failed, trying simple download", video_id=video_id)
+        SIMPLE_DOWNLOAD_FALLBACKS.inc()
         return self._try_simple_download(url, quality)
     
+    def can_download_sections(self) -> bool:
+        """
+        Check whether partial (time range) downloads are possible
+        
+        yt-dlp cuts time ranges with ffmpeg, reading only the byte ranges it needs.
+        
+        Returns:
+            True if ffmpeg is available
+        """
+        return shutil.which('ffmpeg') is not None
+    
+    def download_sections(self, url: str, timestamps: List[float], quality: str = 'best',
+                          padding: float = 1.0) -> Optional[Dict]:
+        """
+        Download only short clips around the given timestamps
+        
+        Args:
+            url: YouTube URL
+            timestamps: Positions (seconds) that frames will be taken from
+            quality: Video quality ('best', 'worst', '720p', '480p', etc.)
+            padding: Seconds of video kept on each side of a timestamp
+            
+        Returns:
+            Download information dictionary with a 'clips' list, or None
+        """
+        video_id = self.extract_video_id(url)
+        if not video_id or not timestamps:
+            return None
+        
+        output_name = self._make_output_name(video_id)
+        filename = f"{output_name}_sections"
+        ranges = [(max(0.0, t - padding), t + padding) for t in timestamps]
+        log.info("Downloading sections", video_id=video_id, ranges=len(ranges))
+        log.debug("Section ranges", video_id=video_id, ranges=ranges)
+        
+        try:
+            ydl_opts = self._get_safe_ydl_opts()
+            ydl_opts.update({
+                'format': self._get_format_selector(quality),
+                'outtmpl': os.path.join(self.download_dir, f'{filename}_%(section_start)s.%(ext)s'),
+                'download_ranges': yt_dlp.utils.download_range_func(None, ranges),
+                # Re-encode the tiny clips so each one starts exactly at its range start
+                'force_keyframes_at_cuts': True,
+                'quiet': True,
+                'no_warnings': True,
+            })
+            # Every range counts as one download
+            ydl_opts.pop('max_downloads', None)
+            
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = self._extract_info_cached(ydl, url, video_id)
+                with observe_stage('download'):
+                    info = ydl.process_ie_result(info, download=True)
+        except Exception as e:
+            log.warning("Partial download failed", video_id=video_id, error=str(e))
+            self.metadata_cache.invalidate(video_id)
+            return None
+        
+        # Map clip files back to the requested timestamps via their section start
+        clips_by_start = {}
+        downloaded_files = []
+        for download in self._reported_downloads(info):
+            downloaded_files.append(download['filepath'])
+            if download.get('section_start') is not None:
+                clips_by_start[round(download['section_start'], 3)] = download['filepath']
+        
+        clips = []
+        for timestamp, (start, end) in zip(timestamps, ranges):
+            file_path = clips_by_start.get(round(start, 3))
+            if file_path and os.path.getsize(file_path) > 0:
+                clips.append({'timestamp': timestamp, 'start': start, 'end': end, 'file_path': file_path})
+        
+        if not clips:
+            log.warning("No clips found after partial download", video_id=video_id)
+            for file_path in downloaded_files:
+                self.cleanup_file(file_path)
+            return None
+        
+        total_size = sum(os.path.getsize(f) for f in downloaded_files)
+        DOWNLOADED_BYTES.inc(total_size, kind='clips')
+        log.info("Downloaded sections", video_id=video_id, clips=len(clips), total_size=total_size)
+        
+        return {
+            'video_id': video_id,
+            'title': info.get('title', 'Unknown'),
+            'duration': info.get('duration', 0),
+            'clips': clips,
+            'file_size': total_size,
+            'downloaded_files': downloaded_files,
+            'download_time': datetime.now().isoformat(),
+            'partial': True,
+            'output_name': output_name,
+        }
+    
+    def _get_stream_format_selector(self, quality: str) -> str:
+        """
+        Get format selector for streaming ingestion
+        
+        Video-only adaptive formats are plain HTTPS files that support range
+        requests, and frame extraction has no use for the audio track.
+        
+        Args:
+            quality: Quality setting
+            
+        Returns:
+            yt-dlp format selector
+        """
+        muxed = self._get_format_selector(quality)
+        video_only = muxed.replace('best', 'bestvideo', 1).replace('worst', 'worstvideo', 1)
+        return f"{video_only}[protocol^=http]/{muxed}[protocol^=http]"
+    
+    def resolve_stream(self, url: str, quality: str = 'best') -> Optional[Dict]:
+        """
+        Resolve the direct media URL so the decoder can read it without a download
+        
+        Args:
+            url: YouTube URL
+            quality: Video quality ('best', 'worst', '720p', '480p', etc.)
+            
+        Returns:
+            Stream information dictionary ('stream_url', 'http_headers', ...) or None
+        """
+        video_id = self.extract_video_id(url)
+        
+        try:
+            ydl_opts = self._get_safe_ydl_opts()
+            ydl_opts.update({
+                'format': self._get_stream_format_selector(quality),
+                'quiet': True,
+                'no_warnings': True,
+            })
+            
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = self._extract_info_cached(ydl, url, video_id)
+                # Format selection only; nothing is downloaded
+                selected = ydl.process_ie_result(info, download=False)
+        except Exception as e:
+            log.warning("Failed to resolve stream URL", video_id=video_id, error=str(e))
+            return None
+        
+        stream_url = selected.get('url')
+        if not stream_url or selected.get('requested_formats'):
+            log.info("No single-file HTTP format available", video_id=video_id)
+            return None
+        
+        log.info("Resolved stream format", video_id=video_id, format_id=selected.get('format_id'),
+                 width=selected.get('width'), height=selected.get('height'))
+        
+        return {
+            'video_id': video_id,
+            'title': selected.get('title', 'Unknown'),
+            'duration': selected.get('duration', 0),
+            'stream_url': stream_url,
+            'http_headers': selected.get('http_headers', {}),
+            'format_id': selected.get('format_id'),
+            'width': selected.get('width'),
+            'height': selected.get('height'),
+            'fps': selected.get('fps'),
+            'output_name': self._make_output_name(video_id or 'stream'),
+        }
+    
+    def download_storyboard(self, url: str) -> Optional[Dict]:
+        """
+        Download only the storyboard sprite sheets of a video
+        
+        The sheets are a few small JPEGs covering the whole video, which is
+        enough to score scene changes before any video data is fetched.
+        
+        Args:
+            url: YouTube URL
+            
+        Returns:
+            Download information dictionary with 'storyboard' and 'sheets', or None
+        """
+        video_id = self.extract_video_id(url)
+        if not video_id:
+            return None
+        
+        output_name = self._make_output_name(video_id)
+        filename = f"{output_name}_storyboard"
+        sheets = []
+        
+        try:
+            ydl_opts = self._get_safe_ydl_opts()
+            ydl_opts.update({'quiet': True, 'no_warnings': True})
+            
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = self._extract_info_cached(ydl, url, video_id)
+                storyboard = select_storyboard_format(info)
+                if not storyboard:
+                    log.info("No storyboard available", video_id=video_id)
+                    return None
+                
+                log.debug("Downloading storyboard", video_id=video_id, sheets=len(storyboard['fragments']),
+                          format_id=storyboard['format_id'], columns=storyboard['columns'], rows=storyboard['rows'])
+                
+                with observe_stage('download'):
+                    for i, fragment in enumerate(storyboard['fragments']):
+                        request = yt_dlp.networking.Request(fragment['url'], headers=storyboard.get('http_headers') or {})
+                        data = ydl.urlopen(request).read()
+                        sheet_path = os.path.join(self.download_dir, f"{filename}_{i:03d}.jpg")
+                        with open(sheet_path, 'wb') as f:
+                            f.write(data)
+                        sheets.append(sheet_path)
+        except Exception as e:
+            log.warning("Storyboard download failed", video_id=video_id, error=str(e))
+            self.metadata_cache.invalidate(video_id)
+            for sheet_path in sheets:
+                self.cleanup_file(sheet_path)
+            return None
+        
+        total_size = sum(os.path.getsize(f) for f in sheets)
+        DOWNLOADED_BYTES.inc(total_size, kind='storyboard')
+        log.info("Downloaded storyboard", video_id=video_id, sheets=len(sheets), total_size=total_size)
+        
+        return {
+            'video_id': video_id,
+            'title': info.get('title', 'Unknown'),
+            'duration': info.get('duration', 0),
+            'storyboard': {key: storyboard.get(key) for key in ('format_id', 'width', 'height', 'rows', 'columns', 'fps')},
+            'sheets': sheets,
+            'file_size': total_size,
+            'downloaded_files': list(sheets),
+            'download_time': datetime.now().isoformat(),
+            'output_name': output_name,
+        }
+    
+    def _get_progress_hooks(self) -> List:
+        """
+        yt-dlp progress hooks reporting downloaded bytes to the progress listener (see pipeline_progress)
+        
+        Returns:
+            List of hooks, empty when nobody listens
+        """
+        if not is_listening():
+            return []
+        
+        # Last reported progress per file (separate video and audio downloads each restart at 0)
+        last_reported = {}
+        
+        def hook(status: Dict):
+            if status.get('status') != 'downloading':
+                return
+            total = status.get('total_bytes') or status.get('total_bytes_estimate')
+            downloaded = status.get('downloaded_bytes') or 0
+            if not total:
+                return
+            progress = min(downloaded / total, 1.0)
+            # yt-dlp calls hooks for every chunk; report whole percents only
+            file_name = status.get('filename')
+            if progress - last_reported.get(file_name, -1.0) >= 0.01:
+                last_reported[file_name] = progress
+                report_progress('download', progress, downloaded_bytes=downloaded, total_bytes=int(total))
+        
+        return [hook]
+    
+    def _get_cached_download(self, video_id: str, cache_key: str) -> Optional[Dict]:
+        """
+        Build a download result from a cached video (leases the cache entry)
+        
+        Args:
+            video_id: YouTube video ID
+            cache_key: Cache key for video ID and format
+            
+        Returns:
+            Download information dictionary or None on cache miss
+        """
+        entry = self.video_cache.acquire(cache_key)
+        if not entry:
+            CACHE_MISSES.inc(cache='video')
+            return None
+        CACHE_HITS.inc(cache='video')
+        
+        return {
+            'video_id': video_id,
+            'title': entry['metadata'].get('title', 'Unknown'),
+            'duration': entry['metadata'].get('duration', 0),
+            'file_path': entry['path'],
+            'file_size': entry['size'],
+            'downloaded_files': [],
+            'download_time': datetime.now().isoformat(),
+            'cache_key': cache_key,
+            'cached': True,
+            'output_name': self._make_output_name(video_id),
+        }
+    
+    def _store_in_cache(self, cache_key: Optional[str], video_file: str, result: Dict) -> Dict:
+        """
+        Move a fresh download into the video cache and point the result at it
+        
+        Args:
+            cache_key: Cache key for video ID and format (None disables caching)
+            video_file: Downloaded video file
+            result: Download information dictionary
+            
+        Returns:
+            Updated download information dictionary
+        """
+        if not cache_key:
+            return result
+        
+        try:
+            entry = self.video_cache.put(cache_key, video_file, {
+                'title': result.get('title'),
+                'duration': result.get('duration'),
+            })
+        except OSError as e:
+            log.warning("Could not cache download, using it directly", cache_key=cache_key, error=str(e))
+            return result
+        
+        result.update({
+            'file_path': entry['path'],
+            'file_size': entry['size'],
+            # The cached video is released, not deleted, on cleanup
+            'downloaded_files': [f for f in result.get('downloaded_files', []) if f != video_file],
+            'cache_key': cache_key,
+            'cached': False,
+        })
+        return result
+    
+    def share_download(self, download_info: Dict) -> Dict:
+        """
+        Hand one download result to another request (coalesced downloads)
+        
+        The copy holds its own cache lease (or hard link to an uncached video
+        file) and frame file base name, and must be
+        passed to cleanup_download independently of the original.
+        
+        Args:
+            download_info: Download information dictionary
+            
+        Returns:
+            Independent download information dictionary
+        """
+        shared = dict(download_info)
+        output_name = f"{download_info.get('output_name') or download_info.get('video_id')}_{next(self._share_counter)}"
+        # Leftover files are deleted only through the original result
+        shared['downloaded_files'] = []
+        if download_info.get('cache_key'):
+            self.video_cache.lease(download_info['cache_key'])
+        elif download_info.get('file_path') in download_info.get('downloaded_files', []):
+            # Uncached video (e.g. simple download fallback): the original deletes
+            # it on cleanup, so the copy gets its own hard link to the same data
+            video_file = download_info['file_path']
+            link_path = os.path.join(self.download_dir, f"{output_name}{os.path.splitext(video_file)[1]}")
+            try:
+                os.link(video_file, link_path)
+            except OSError:
+                shutil.copyfile(video_file, link_path)
+            shared['file_path'] = link_path
+            shared['downloaded_files'] = [link_path]
+        shared['output_name'] = output_name
+        shared['shared'] = True
+        return shared
+    
     def cleanup_file(self, file_path: str) -> bool:
         """
         Delete a single file
@@ -805,11 +1148,11 @@ class YouTubeDownloader:
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
-                print(f"File deleted: {file_path}")
+                log.debug("File deleted", file_path=file_path)
                 return True
             return False
         except Exception as e:
-            print(f"File deletion failed: {str(e)}")
+            log.warning("File deletion failed", file_path=file_path, error=str(e))
             return False
     
     def cleanup_download(self, download_info: Dict) -> bool:
@@ -825,16 +1168,22 @@ class YouTubeDownloader:
         try:
             success_count = 0
             
-            # Delete all downloaded files
-            for file_path in download_info.get('downloaded_files', []):
-                if self.cleanup_file(file_path):
+            with observe_stage('cleanup'):
+                # Cached videos stay on disk for later requests; just drop our lease
+                if download_info.get('cache_key'):
+                    self.video_cache.release(download_info['cache_key'])
                     success_count += 1
+                
+                # Delete all downloaded files
+                for file_path in download_info.get('downloaded_files', []):
+                    if self.cleanup_file(file_path):
+                        success_count += 1
             
-            print(f"Cleanup complete: {success_count} files deleted")
+            log.debug("Download cleanup complete", files=success_count)
             return success_count > 0
             
         except Exception as e:
-            print(f"Cleanup failed: {str(e)}")
+            log.warning("Download cleanup failed", error=str(e))
             return False
     
     def cleanup_all(self) -> bool:
@@ -846,13 +1195,21 @@ class YouTubeDownloader:
         """
         try:
             if os.path.exists(self.download_dir):
-                shutil.rmtree(self.download_dir)
-                os.makedirs(self.download_dir, exist_ok=True)
-                print(f"All files in download directory cleaned up")
+                # Leased cache entries may be in use by running extractions
+                self.video_cache.clear()
+                for name in os.listdir(self.download_dir):
+                    path = os.path.join(self.download_dir, name)
+                    if os.path.abspath(path) == os.path.abspath(self.video_cache.cache_dir):
+                        continue
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                log.info("All files in download directory cleaned up")
                 return True
             return False
         except Exception as e:
-            print(f"Complete cleanup failed: {str(e)}")
+            log.warning("Complete cleanup failed", error=str(e))
             return False
 
 # Create global instance
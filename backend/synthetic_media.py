@@ -0,0 +1,179 @@
+"""
+Synthetic test media: videos with known scene cuts and a local HTTP server with Range support
+"""
+
+import contextlib
+import functools
+import http.server
+import os
+import re
+import threading
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+# Distinct BGR tints so that every scene has a clearly different colour histogram
+SCENE_TINTS = [
+    (40, 40, 220), (220, 60, 40), (40, 200, 60), (30, 200, 230),
+    (200, 40, 200), (220, 220, 40), (120, 120, 120), (20, 90, 160),
+    (160, 20, 90), (90, 160, 20), (240, 240, 240), (10, 10, 10),
+]
+
+
+def make_scene_texture(scene_index: int, width: int, height: int) -> np.ndarray:
+    """
+    Build a smooth random texture tinted with the scene colour
+    """
+    rng = np.random.default_rng(scene_index)
+    noise = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    noise = cv2.GaussianBlur(noise, (0, 0), 4)
+    tint = np.array(SCENE_TINTS[scene_index % len(SCENE_TINTS)], dtype=np.float32)
+    texture = 0.35 * noise.astype(np.float32) + 0.65 * tint
+    return np.clip(texture, 0, 255).astype(np.uint8)
+
+
+def write_synthetic_video(path: str, scene_durations: List[float], fps: float = 30.0,
+                          width: int = 320, height: int = 180, gop: Optional[int] = None) -> dict:
+    """
+    Write a video made of scenes with hard cuts between them
+
+    Each scene is a tinted texture that slowly pans, so consecutive frames inside
+    a scene differ slightly while frames across a cut differ strongly.
+
+    Args:
+        path: Output .mp4 path
+        scene_durations: Duration of each scene in seconds
+        fps: Frame rate
+        width, height: Frame size
+        gop: Keyframe interval; needs PyAV, OpenCV's writer uses its own default
+
+    Returns:
+        Dictionary with 'path', 'fps', 'total_frames', 'duration' and 'cuts' (seconds)
+    """
+    frames_per_scene = [max(1, int(round(d * fps))) for d in scene_durations]
+    textures = [make_scene_texture(i, width * 2, height) for i in range(len(scene_durations))]
+
+    def frames():
+        for scene_index, count in enumerate(frames_per_scene):
+            texture = textures[scene_index]
+            for i in range(count):
+                offset = (i * 2) % width
+                yield texture[:, offset:offset + width]
+
+    if gop is not None and _write_with_pyav(path, frames(), fps, width, height, gop):
+        pass
+    else:
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+        for frame in frames():
+            writer.write(np.ascontiguousarray(frame))
+        writer.release()
+
+    cuts = []
+    elapsed = 0
+    for count in frames_per_scene[:-1]:
+        elapsed += count
+        cuts.append(elapsed / fps)
+
+    total_frames = sum(frames_per_scene)
+    return {
+        'path': path,
+        'fps': fps,
+        'total_frames': total_frames,
+        'duration': total_frames / fps,
+        'cuts': cuts,
+    }
+
+
+def _write_with_pyav(path: str, frames, fps: float, width: int, height: int, gop: int) -> bool:
+    try:
+        import av
+    except ImportError:
+        return False
+
+    from fractions import Fraction
+
+    container = av.open(path, mode='w')
+    stream = container.add_stream('mpeg4', rate=Fraction(fps).limit_denominator(1000))
+    stream.width = width
+    stream.height = height
+    stream.pix_fmt = 'yuv420p'
+    stream.codec_context.gop_size = gop
+    # Keep cuts from forcing extra keyframes so the GOP stays regular
+    stream.codec_context.options = {'sc_threshold': '1000000000', 'g': str(gop)}
+
+    for frame in frames:
+        video_frame = av.VideoFrame.from_ndarray(np.ascontiguousarray(frame), format='bgr24')
+        for packet in stream.encode(video_frame):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+    return os.path.exists(path)
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that honours HTTP Range requests, like a CDN serving media"""
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        f = open(path, 'rb')
+        match = re.match(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1) or 0)
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            f.seek(start)
+            self.server.range_requests += 1
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+
+        self._remaining = end - start + 1
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(self._remaining))
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, '_remaining', None)
+        while remaining is None or remaining > 0:
+            chunk = source.read(65536 if remaining is None else min(65536, remaining))
+            if not chunk:
+                break
+            try:
+                outputfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # Decoders drop the connection as soon as they seek elsewhere
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory: str):
+    """
+    Serve a directory over HTTP with Range support on a free local port
+
+    Yields:
+        (base_url, server); server.range_requests counts partial requests
+    """
+    handler = functools.partial(RangeRequestHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.range_requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,74 @@
+import numpy as np
+
+from adaptive_sampler import AdaptiveSampler
+from frame_extractor import FrameExtractor
+from synthetic_media import write_synthetic_video
+
+
+def test_bisection_finds_cut_in_log_steps():
+    cut = 1234
+    reads = []
+
+    def histogram_at(frame_idx):
+        reads.append(frame_idx)
+        return np.array([1.0, 0.0, 0.0, 0.0]) if frame_idx < cut else np.array([0.0, 0.0, 1.0, 1.0])
+
+    sampler = AdaptiveSampler(threshold=0.3)
+    coarse = [
+        {'frame_idx': 1000, 'change_score': 0.01},
+        {'frame_idx': 1500, 'change_score': 1.5},
+        {'frame_idx': 2000, 'change_score': 0.02},
+    ]
+
+    refined, count = sampler.refine(coarse, 500, histogram_at, 'correl')
+
+    assert count == 1
+    assert [c['frame_idx'] for c in refined] == [1000, cut, 2000]
+    assert refined[1]['change_score'] == 1.5
+    # Two endpoints plus one read per halving of the 500-frame gap
+    assert len(reads) == 2 + 9
+
+
+def test_both_cuts_of_one_pair_are_found():
+    cuts = [1100, 1400]
+    tints = [np.array([1.0, 0.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0, 0.0]), np.array([0.0, 0.0, 1.0, 1.0])]
+
+    def histogram_at(frame_idx):
+        return tints[sum(frame_idx >= cut for cut in cuts)]
+
+    coarse = [
+        {'frame_idx': 1000, 'change_score': 0.01, 'dhash': 1},
+        {'frame_idx': 1500, 'change_score': 1.5, 'dhash': 2},
+    ]
+
+    refined, count = AdaptiveSampler(threshold=0.3).refine(coarse, 500, histogram_at, 'correl')
+
+    assert count == 1
+    assert [c['frame_idx'] for c in refined] == [1000] + cuts
+    assert all(c['change_score'] > 0.3 for c in refined[1:])
+    # Only the last cut's scene is the one the coarse frame hash shows
+    assert [c.get('dhash') for c in refined] == [1, None, 2]
+
+    # Without budget for a second cut, the pair still yields one
+    refined, _ = AdaptiveSampler(threshold=0.3, max_refined=1).refine(coarse, 500, histogram_at, 'correl')
+    assert len(refined) == 2 and refined[1]['frame_idx'] in cuts
+
+
+def test_coarse_indices_include_last_frame():
+    sampler = AdaptiveSampler(coarse_seconds=5)
+
+    assert sampler.coarse_indices(400, 30) == [0, 150, 300, 399]
+    assert sampler.coarse_indices(301, 30) == [0, 150, 300]
+
+
+def test_adaptive_analysis_is_cut_accurate(tmp_path, frame_output_dir):
+    video = write_synthetic_video(str(tmp_path / 'long.mp4'), [13.3, 12.9, 14.1, 13], fps=30)
+    extractor = FrameExtractor(frame_output_dir)
+
+    analysis = extractor.analyze_scene_changes(video['path'], 3, 'adaptive')
+
+    assert [round(s['timestamp'], 3) for s in analysis['scenes']] == video['cuts']
+    adaptive = analysis['scan']['adaptive']
+    assert adaptive['refined_pairs'] == 3
+    # A dense scan would decode every frame to be this exact
+    assert analysis['scan']['frames_analyzed'] < video['total_frames'] // 20
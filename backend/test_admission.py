@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+import admission as admission_module
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_requests_beyond_the_wait_queue_are_rejected():
+    controller = AdmissionController(max_active=1, max_waiting=1)
+    order = []
+
+    async def request(name, release):
+        async with controller.admit():
+            order.append(name)
+            await release.wait()
+
+    async def scenario():
+        release = asyncio.Event()
+        running = asyncio.ensure_future(request('first', release))
+        waiting = asyncio.ensure_future(request('second', release))
+        await asyncio.sleep(0.01)
+        stats = controller.get_stats()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit():
+                pass
+
+        release.set()
+        await asyncio.gather(running, waiting)
+        return stats, rejected.value
+
+    stats, rejected = asyncio.run(scenario())
+
+    assert order == ['first', 'second']
+    assert stats['active'] == 1 and stats['waiting'] == 1
+    assert rejected.retry_after == admission_module.DEFAULT_RETRY_AFTER
+    assert controller.get_stats()['rejected'] == 1
+    assert controller.get_stats()['completed'] == 2
+
+
+def test_retry_after_follows_drain_rate(monkeypatch):
+    controller = AdmissionController(max_active=2, max_waiting=4)
+    clock = [100.0]
+    monkeypatch.setattr(admission_module.time, 'monotonic', lambda: clock[0])
+
+    async def finish_requests():
+        # Ten requests finish over 5 seconds: 2 per second
+        for _ in range(10):
+            async with controller.admit():
+                clock[0] += 0.5
+
+    asyncio.run(finish_requests())
+
+    assert controller.drain_rate() == pytest.approx(10 / 4.5)
+    controller._waiting = 4
+    assert controller.retry_after() == 3  # 5 requests at ~2.2/s
+
+    # Old completions leave the window; the mean duration takes over
+    clock[0] += 120
+    assert controller.drain_rate() == pytest.approx(2 / 0.5)
+
+
+def test_unbounded_admission_waits_when_queue_is_full():
+    controller = AdmissionController(max_active=1, max_waiting=0)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        assert controller.is_full()
+
+        async def job():
+            async with controller.admit(bounded=False):
+                return 'ran'
+
+        queued = asyncio.ensure_future(job())
+        await asyncio.sleep(0.01)
+        assert not queued.done()
+        release.set()
+        await holder
+        return await queued
+
+    assert asyncio.run(scenario()) == 'ran'
+
+
+def test_waiting_jobs_do_not_fill_the_wait_queue():
+    controller = AdmissionController(max_active=1, max_waiting=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold(bounded):
+            async with controller.admit(bounded):
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(hold(False)) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        stats = controller.get_stats()
+        # Three jobs wait, but a synchronous request still gets the one wait place
+        assert not controller.is_full()
+        tasks.append(asyncio.ensure_future(hold(True)))
+        await asyncio.sleep(0.01)
+        assert controller.is_full()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert (stats['waiting'], stats['waiting_jobs']) == (0, 3)
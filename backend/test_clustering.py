@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from clustering import histogram_features, kmeans, representative_indices
+from frame_extractor import FrameExtractor
+
+
+def _blobs(rng, centers, per_cluster, spread=0.02):
+    points = [center + rng.normal(0, spread, (per_cluster, len(center))) for center in centers]
+    return np.abs(np.concatenate(points)).astype(np.float32)
+
+
+def test_kmeans_separates_clusters():
+    rng = np.random.default_rng(3)
+    centers = np.eye(3, 8, dtype=np.float32)
+    features = _blobs(rng, centers, 50)
+
+    labels, centroids = kmeans(features, 3)
+
+    # Each blob lands in its own cluster
+    assert len({tuple(np.unique(labels[i:i + 50])) for i in range(0, 150, 50)}) == 3
+    assert centroids.shape == (3, 8)
+    # One representative per blob, with the blob's size
+    assert [(i // 50, size) for i, size in representative_indices(features, 3)] == [(0, 50), (1, 50), (2, 50)]
+
+
+def test_thousands_of_samples_cluster_fast():
+    rng = np.random.default_rng(5)
+    histograms = rng.integers(0, 50, (3000, 512)).astype(np.float32)
+    histograms[:, ::3] = 0
+
+    start = time.perf_counter()
+    representatives = representative_indices(histogram_features(histograms), 8)
+
+    assert time.perf_counter() - start < 1.0
+    assert len(representatives) == 8
+    assert sum(size for _, size in representatives) == 3000
+
+
+def test_cluster_method_picks_one_frame_per_scene(scene_video, frame_output_dir):
+    extractor = FrameExtractor(frame_output_dir)
+
+    result = extractor.extract_representative_frames(scene_video['path'], method='cluster', frame_count=4)
+
+    assert result['success']
+    assert result['extraction_method'] == 'cluster'
+    scenes = [int(frame['timestamp'] // 3) for frame in result['frames']]
+    assert scenes == [0, 1, 2, 3]
+    assert all(frame['cluster_size'] > 0 for frame in result['frames'])
+    assert result['analysis']['cluster_ms'] < 1000
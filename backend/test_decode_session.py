@@ -0,0 +1,35 @@
+from decode_session import DecodeSession
+from frame_extractor import FrameExtractor
+
+
+def test_scene_extraction_opens_the_video_once(scene_video, frame_output_dir):
+    extractor = FrameExtractor(frame_output_dir)
+
+    result = extractor.extract_representative_frames(scene_video['path'], 'scene', 3, 'session')
+
+    assert result['success']
+    assert result['frames_extracted'] == 3
+    # One shared decoder plus the raw packet probe for the keyframe interval
+    assert result['decode_session']['open_count'] == 2
+    assert result['decode_session']['setup_time'] >= 0
+
+
+def test_session_caches_info_and_gop(scene_video):
+    probes = []
+
+    def probe(source):
+        probes.append(source)
+        return 12.0
+
+    with DecodeSession(scene_video['path']) as session:
+        info = session.get_info()
+        info['duration'] = 0
+        assert session.get_info()['duration'] > 11
+        assert session.get_gop(probe) == 12.0
+        assert session.get_gop(probe) == 12.0
+
+        ret, frame = session.read_frame(200)
+        assert ret and frame is not None
+
+        assert probes == [scene_video['path']]
+        assert session.get_stats()['open_count'] == 2
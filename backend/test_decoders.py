@@ -0,0 +1,110 @@
+import shutil
+import subprocess
+
+import cv2
+import numpy as np
+import pytest
+
+from decode_session import DecodeSession
+from decoders import DECODER_BACKENDS, choose_backend, is_backend_available, open_decoder
+from frame_extractor import FrameExtractor
+from frame_scanner import frame_scanner
+
+
+def _read_all(cap):
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame.astype(np.int16))
+    return frames
+
+
+@pytest.mark.parametrize('backend', DECODER_BACKENDS)
+def test_backends_agree_on_metadata_and_frames(backend, scene_video):
+    if not is_backend_available(backend):
+        pytest.skip(f"{backend} not installed")
+    reference = _read_all(open_decoder(scene_video['path'], 'opencv'))
+
+    cap = open_decoder(scene_video['path'], backend)
+    try:
+        assert cap.isOpened()
+        assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == scene_video['total_frames']
+        assert cap.get(cv2.CAP_PROP_FPS) == pytest.approx(30)
+        assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (320, 180)
+
+        # Backward and forward seeks land on the exact frame
+        for frame_idx in (200, 45, 60, 350):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            ret, frame = cap.read()
+            assert ret
+            assert np.abs(frame - reference[frame_idx]).mean() < 1
+            assert cap.get(cv2.CAP_PROP_POS_FRAMES) == frame_idx + 1
+    finally:
+        cap.release()
+
+
+# (container, ffmpeg encoder arguments) of the files 'auto' hands to PyAV
+TRANSCODES = {
+    'mp4': ['-c:v', 'libx264', '-preset', 'veryfast', '-g', '60'],
+    'mov': ['-c:v', 'mpeg4', '-q:v', '4'],
+    'webm': ['-c:v', 'libvpx', '-deadline', 'realtime', '-b:v', '1M', '-g', '60'],
+    'mkv': ['-c:v', 'libx264', '-preset', 'veryfast', '-g', '60'],
+}
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+@pytest.mark.parametrize('container', sorted(TRANSCODES))
+def test_pyav_matches_opencv_on_index_and_seek_paths(container, tmp_path, scene_video):
+    if not is_backend_available('pyav'):
+        pytest.skip("pyav not installed")
+    path = str(tmp_path / f"clip.{container}")
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-i', scene_video['path'], *TRANSCODES[container], path],
+                   check=True)
+    samples = list(range(0, scene_video['total_frames'], 37))
+    targets = [290, 17, 150, 151, 359]
+
+    results = {}
+    for backend in ('opencv', 'pyav'):
+        with DecodeSession(path, backend=backend) as session:
+            info = session.get_info()
+            scans = {strategy: [(i, f.astype(np.int16)) for i, f in
+                                frame_scanner.scan(session.capture, samples, strategy)]
+                     for strategy in ('seek', 'linear')}
+            seeks = [session.read_frame(frame_idx)[1].astype(np.int16) for frame_idx in targets]
+        results[backend] = info, scans, seeks
+
+    opencv, pyav = results['opencv'], results['pyav']
+    assert choose_backend(path, backend='auto') == 'pyav'
+    assert pyav[0]['total_frames'] == opencv[0]['total_frames']
+    assert pyav[0]['fps'] == pytest.approx(opencv[0]['fps'])
+    for strategy in ('seek', 'linear'):
+        assert [i for i, _ in pyav[1][strategy]] == [i for i, _ in opencv[1][strategy]] == samples
+        for (_, ours), (_, theirs) in zip(pyav[1][strategy], opencv[1][strategy]):
+            assert np.abs(ours - theirs).mean() < 1
+    for ours, theirs in zip(pyav[2], opencv[2]):
+        assert np.abs(ours - theirs).mean() < 1
+
+
+def test_backend_choice_follows_container_table():
+    assert choose_backend('clip.avi', backend='auto') == 'opencv'
+    assert choose_backend('https://example.com/videoplayback?id=1', backend='auto') == 'opencv'
+    assert choose_backend('clip.mp4', backend='opencv') == 'opencv'
+    expected = 'pyav' if is_backend_available('pyav') else 'opencv'
+    assert choose_backend('clip.webm', backend='auto') == expected
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+def test_webm_frame_count_and_reported_backend(tmp_path, scene_video, frame_output_dir):
+    pytest.importorskip('av')
+    path = str(tmp_path / 'clip.webm')
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-i', scene_video['path'], '-c:v', 'libvpx',
+                    '-deadline', 'realtime', '-b:v', '500k', path], check=True)
+
+    with DecodeSession(path) as session:
+        assert session.get_info()['total_frames'] == scene_video['total_frames']
+
+    result = FrameExtractor(frame_output_dir).extract_representative_frames(path, 'time', 2)
+    assert result['success']
+    assert result['decode_session']['backend'] == 'pyav'
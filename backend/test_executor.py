@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import frame_extractor as frame_extractor_module
+from executor import ExtractionExecutor
+from frame_extractor import FrameExtractor, extract_video_frames
+from pipeline_progress import listen, pipeline_stage, report_progress
+
+
+def test_io_stage_keeps_event_loop_responsive():
+    executor = ExtractionExecutor(io_workers=2, cpu_workers=1, use_processes=False)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.05)
+
+    async def scenario():
+        await asyncio.gather(executor.run_io(time.sleep, 0.4), ticker())
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.4
+
+
+def test_cpu_stage_respects_its_own_limit():
+    executor = ExtractionExecutor(io_workers=4, cpu_workers=1, use_processes=False)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    async def scenario():
+        await asyncio.gather(*(executor.run_cpu(work) for _ in range(4)))
+
+    asyncio.run(scenario())
+    stats = executor.get_stats()
+    executor.shutdown()
+
+    assert peak[0] == 1
+    assert stats['cpu']['completed'] == 4
+    assert stats['cpu']['running'] == 0
+
+
+def test_extraction_runs_in_process_pool(scene_video, frame_output_dir):
+    executor = ExtractionExecutor(io_workers=1, cpu_workers=1, use_processes=True)
+    extractor = FrameExtractor(frame_output_dir)
+
+    result = asyncio.run(executor.run_cpu(
+        extractor.extract_representative_frames, scene_video['path'], 'time', 4
+    ))
+    executor.shutdown()
+
+    assert result['success']
+    assert result['frames_extracted'] == 4
+
+
+def test_io_tasks_report_progress_to_the_callers_listener():
+    executor = ExtractionExecutor(io_workers=1, cpu_workers=1, use_processes=False)
+    events = []
+
+    async def scenario():
+        with listen(events.append), pipeline_stage('download'):
+            await executor.run_io(report_progress, 'download', 0.5)
+        # Outside the block nobody listens
+        await executor.run_io(report_progress, 'download', 1.0)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+    assert events == [
+        {'type': 'stage', 'stage': 'download', 'status': 'running'},
+        {'type': 'progress', 'stage': 'download', 'progress': 0.5},
+        {'type': 'stage', 'stage': 'download', 'status': 'done'},
+    ]
+
+
+def test_written_frames_are_reported_before_extraction_returns(monkeypatch, scene_video, frame_output_dir):
+    monkeypatch.setattr(frame_extractor_module, 'frame_extractor', FrameExtractor(frame_output_dir))
+    executor = ExtractionExecutor(io_workers=1, cpu_workers=1, use_processes=False)
+    frame_queue = executor.create_queue()
+
+    result = asyncio.run(executor.run_cpu(
+        extract_video_frames, scene_video['path'], 'scene', 3, frame_queue=frame_queue
+    ))
+    executor.shutdown()
+
+    reported = [frame_queue.get_nowait() for _ in range(frame_queue.qsize())]
+    assert result['success']
+    assert reported == result['frames']
+
+
+def test_forward_queue_does_not_take_an_io_slot():
+    executor = ExtractionExecutor(io_workers=1, cpu_workers=1, use_processes=True)
+    task_queue = executor.create_queue()
+    forwarded = []
+
+    async def scenario():
+        forwarder = asyncio.ensure_future(executor.forward_queue(task_queue, forwarded.append))
+        await asyncio.sleep(0.1)
+        # The only I/O slot is free while the reader waits
+        started = time.monotonic()
+        assert await executor.run_io(lambda: 'download') == 'download'
+        waited = time.monotonic() - started
+        for item in ('first', 'second', None):
+            task_queue.put(item)
+        await asyncio.wait_for(forwarder, 5)
+        return waited
+
+    waited = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert waited < 0.5
+    assert forwarded == ['first', 'second']
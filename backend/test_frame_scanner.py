@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+from frame_extractor import FrameExtractor
+from frame_scanner import FrameScanner
+from synthetic_media import write_synthetic_video
+
+
+def test_gop_is_probed_from_packet_flags(tmp_path):
+    video = write_synthetic_video(str(tmp_path / 'gop45.mp4'), [3, 3], fps=30, gop=45)
+
+    assert FrameScanner().probe_gop(video['path']) == 45
+
+
+def test_linear_and_seek_scans_read_the_same_frames(tmp_path):
+    video = write_synthetic_video(str(tmp_path / 'gop30.mp4'), [2, 2], fps=30, gop=30)
+    scanner = FrameScanner()
+    frame_indices = list(range(0, video['total_frames'], 7))
+
+    scans = {}
+    for strategy in ('linear', 'seek'):
+        cap = cv2.VideoCapture(video['path'])
+        scans[strategy] = list(scanner.scan(cap, frame_indices, strategy))
+        cap.release()
+
+    assert [i for i, _ in scans['linear']] == frame_indices
+    assert [i for i, _ in scans['seek']] == frame_indices
+    for (_, a), (_, b) in zip(scans['linear'], scans['seek']):
+        assert np.array_equal(a, b)
+
+
+def test_strategy_follows_gop_and_spacing():
+    scanner = FrameScanner(seek_overhead=20, stream_seek_overhead=60)
+
+    # Dense samples: walking the video decodes less than restarting at keyframes
+    assert scanner.choose_strategy(8, gop=12) == 'linear'
+    assert scanner.choose_strategy(64, gop=250) == 'linear'
+    # Sparse samples with short GOPs: seeking skips most of the video
+    assert scanner.choose_strategy(32, gop=12) == 'seek'
+    assert scanner.choose_strategy(300, gop=250) == 'seek'
+    # Remote seeks cost a range request each
+    assert scanner.choose_strategy(64, gop=60, is_stream=True) == 'linear'
+
+
+def test_scene_analysis_reports_scan_plan(scene_video, frame_output_dir):
+    analysis = FrameExtractor(frame_output_dir).analyze_scene_changes(scene_video['path'], 3)
+
+    # 360 frames sampled every 3rd frame; OpenCV's writer puts a keyframe about every 12 frames
+    assert analysis['scan']['strategy'] == 'linear'
+    assert analysis['scan']['sample_interval'] == 3
+    assert 10 <= analysis['scan']['gop'] <= 12
+    assert len(analysis['scenes']) > 0
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+
+from job_queue import JobQueue
+from pipeline_progress import pipeline_stage, report_progress
+
+
+async def _extraction(request):
+    with pipeline_stage('download'):
+        await asyncio.sleep(0.01)
+    with pipeline_stage('analysis'), pipeline_stage('encode'):
+        await asyncio.sleep(0.01)
+    return {'frames': request['frame_count']}
+
+
+def test_job_reports_stages_and_result(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'), workers=1)
+    submitted = []
+    halfway = []
+
+    async def extraction(request):
+        with pipeline_stage('download'):
+            report_progress('download', 0.5, downloaded_bytes=50, total_bytes=100)
+            halfway.append(await queue.get(submitted[0]['id']))
+        return await _extraction(request)
+
+    async def scenario():
+        first = await queue.submit({'frame_count': 4})
+        second = await queue.submit({'frame_count': 2})
+        submitted.extend([first, second])
+        await queue.start(extraction)
+        assert first['status'] == 'queued'
+        assert second['queue_position'] == 1
+
+        done = await queue.wait(second['id'], timeout=5)
+        stats = await queue.get_stats()
+        await queue.stop()
+        return await queue.get(first['id']), done, stats
+
+    first, second, stats = asyncio.run(scenario())
+
+    assert halfway[0]['status'] == 'running'
+    assert halfway[0]['stages']['download'] == {
+        'status': 'running', 'progress': 0.5, 'started_at': halfway[0]['stages']['download']['started_at'],
+        'finished_at': None
+    }
+    assert halfway[0]['progress'] == 0.12
+
+    assert first['status'] == second['status'] == 'completed'
+    assert first['result'] == {'frames': 4} and second['result'] == {'frames': 2}
+    assert first['progress'] == 1.0
+    stages = first['stages']
+    assert stages['metadata']['status'] == 'skipped'
+    assert all(stages[stage]['status'] == 'done' for stage in ('download', 'analysis', 'encode'))
+    assert stages['download']['finished_at'] <= stages['analysis']['started_at']
+    assert stats['completed'] == 2
+
+
+def test_failed_job_keeps_error_and_failed_stage(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'), workers=1)
+
+    async def failing(request):
+        with pipeline_stage('download'):
+            raise RuntimeError('Video download failed.')
+
+    async def scenario():
+        await queue.start(failing)
+        job = await queue.submit({})
+        job = await queue.wait(job['id'], timeout=5)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Video download failed.'
+    assert job['stages']['download']['status'] == 'failed'
+    assert job['result'] is None
+
+
+def test_progress_writes_are_throttled(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'), workers=1, progress_interval=60)
+    writes = []
+    update_stage = queue._update_stage
+
+    def counting_update_stage(job_id, stage, **fields):
+        writes.append(threading.current_thread())
+        update_stage(job_id, stage, **fields)
+
+    monkeypatch.setattr(queue, '_update_stage', counting_update_stage)
+    submitted = []
+    stored = []
+
+    async def downloading(request):
+        with pipeline_stage('download'):
+            for chunk in range(1, 101):
+                report_progress('download', chunk / 100)
+            stored.append((await queue.get(submitted[0]['id']))['stages']['download']['progress'])
+        return {}
+
+    async def scenario():
+        await queue.start(downloading)
+        submitted.append(await queue.submit({}))
+        job = await queue.wait(submitted[0]['id'], timeout=5)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    # Stage start, the first progress report and stage end
+    assert len(writes) == 3
+    # Written off the event loop's thread
+    assert threading.main_thread() not in writes
+    assert stored == [0.01]
+    assert job['stages']['download']['progress'] == 1.0
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    started = []
+
+    async def hanging(request):
+        started.append(request['n'])
+        await asyncio.sleep(60)
+
+    async def interrupted():
+        queue = JobQueue(db_path, workers=1)
+        await queue.start(hanging)
+        jobs = [await queue.submit({'n': n}) for n in range(2)]
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return [job['id'] for job in jobs]
+
+    job_ids = asyncio.run(interrupted())
+    assert started == [0]
+
+    restarted = JobQueue(db_path, workers=2)
+
+    async def echo(request):
+        return {'n': request['n']}
+
+    async def resumed():
+        await restarted.start(echo)
+        jobs = [await restarted.wait(job_id, timeout=5) for job_id in job_ids]
+        stats = await restarted.get_stats()
+        unknown = await restarted.get('unknown')
+        await restarted.stop()
+        return jobs, stats, unknown
+
+    jobs, stats, unknown = asyncio.run(resumed())
+    assert [job['result'] for job in jobs] == [{'n': 0}, {'n': 1}]
+    assert stats['requeued'] == 1
+    assert unknown is None
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pytest
+
+import keyframe_reader as keyframe_module
+from frame_extractor import FrameExtractor
+from keyframe_reader import KeyframeReader
+from synthetic_media import write_synthetic_video
+
+FFMPEG = shutil.which('ffmpeg')
+
+
+@pytest.fixture
+def keyframe_video(tmp_path):
+    """48s at 10 fps, keyframe every 2s, cuts at 12s, 24s and 36s (on keyframes)"""
+    return write_synthetic_video(str(tmp_path / 'keyframes.mp4'), [12, 12, 12, 12], fps=10, gop=20)
+
+
+def test_pyav_decodes_only_keyframes(keyframe_video):
+    pytest.importorskip('av')
+    reader = KeyframeReader()
+
+    keyframes = list(reader.iter_keyframes(keyframe_video['path'], 160, 90))
+
+    assert reader.get_backend() == 'pyav'
+    assert [t for t, _ in keyframes] == [2.0 * i for i in range(24)]
+    assert keyframes[0][1].shape == (90, 160, 3)
+
+
+@pytest.mark.skipif(FFMPEG is None, reason="ffmpeg not installed")
+def test_ffmpeg_pipe_matches_pyav_timestamps(keyframe_video, monkeypatch):
+    monkeypatch.setattr(keyframe_module, 'av', None)
+    reader = KeyframeReader(FFMPEG)
+
+    keyframes = list(reader.iter_keyframes(keyframe_video['path'], 160, 90))
+
+    assert reader.get_backend() == 'ffmpeg'
+    assert [round(t, 3) for t, _ in keyframes] == [2.0 * i for i in range(24)]
+
+
+def test_keyframe_analysis_finds_cuts(keyframe_video, frame_output_dir):
+    pytest.importorskip('av')
+    extractor = FrameExtractor(frame_output_dir)
+
+    analysis = extractor.analyze_scene_changes(keyframe_video['path'], 3, analysis_mode='keyframes')
+
+    scan = analysis['scan']
+    assert (scan['strategy'], scan['backend'], scan['keyframes']) == ('keyframes', 'pyav', 24)
+    # Keyframes come out of the decoder already at the analysis size
+    assert scan['analysis_size'] == [160, 90] and scan['frames_analyzed'] == 24
+    assert [scene['timestamp'] for scene in analysis['scenes']] == keyframe_video['cuts']
+    assert os.listdir(frame_output_dir) == []
+
+
+def test_without_keyframe_decoder_analysis_samples_frames(keyframe_video, frame_output_dir, monkeypatch):
+    monkeypatch.setattr(keyframe_module, 'av', None)
+    monkeypatch.setattr(keyframe_module.keyframe_reader, 'ffmpeg_path', None)
+    extractor = FrameExtractor(frame_output_dir)
+
+    assert extractor.resolve_analysis_mode('keyframes', 600) == 'sampled'
+    analysis = extractor.analyze_scene_changes(keyframe_video['path'], 3, analysis_mode='keyframes')
+    assert analysis['scan']['strategy'] in ('linear', 'seek')
@@ -0,0 +1,79 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import youtube_downloader as downloader_module
+from metadata_cache import MetadataCache
+from video_cache import VideoCache
+from youtube_downloader import YouTubeDownloader
+
+URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+class FakeYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL and counts extractor round-trips"""
+    extract_calls = 0
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def extract_info(self, url, download=True):
+        FakeYoutubeDL.extract_calls += 1
+        assert not download
+        return {'id': 'dQw4w9WgXcQ', 'title': 'Fake', 'duration': 12, 'availability': 'public',
+                'description': None, 'formats': [{'format_id': '18', 'ext': 'mp4'}]}
+
+    def sanitize_info(self, info):
+        return info
+
+    def process_ie_result(self, info, download=True):
+        path = self.opts['outtmpl'].replace('%(ext)s', 'mp4')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 1024)
+        return {**info, 'requested_downloads': [{'filepath': path}]}
+
+
+def test_entries_expire_and_are_copied():
+    cache = MetadataCache(ttl=0.05)
+    cache.put('a', {'formats': [1]})
+
+    info = cache.get('a')
+    info['formats'].append(2)
+    assert cache.get('a') == {'formats': [1]}
+
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    assert cache.get_stats()['expired'] == 1
+
+
+def test_info_and_download_share_one_extractor_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    FakeYoutubeDL.extract_calls = 0
+    downloader = YouTubeDownloader(str(tmp_path), video_cache=VideoCache(str(tmp_path / 'cache')))
+
+    info = downloader.get_video_info(URL)
+    result = downloader.download_video(URL, '360p')
+
+    assert info['title'] == 'Fake'
+    assert result['title'] == 'Fake'
+    assert os.path.exists(result['file_path'])
+    assert FakeYoutubeDL.extract_calls == 1
+
+
+def test_concurrent_downloads_of_one_video_keep_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    downloader = YouTubeDownloader(str(tmp_path), video_cache=VideoCache(str(tmp_path / 'cache')))
+    downloader.get_video_info(URL)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda quality: downloader.download_video(URL, quality), ['360p', '720p']))
+
+    paths = [result['file_path'] for result in results]
+    assert len(set(paths)) == 2
+    assert results[0]['output_name'] != results[1]['output_name']
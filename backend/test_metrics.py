@@ -0,0 +1,107 @@
+import asyncio
+import re
+
+import pytest
+
+import youtube_downloader as downloader_module
+from executor import ExtractionExecutor
+from frame_extractor import FrameExtractor
+from metrics import MetricsRegistry, _Metric, render_metrics
+from video_cache import VideoCache
+from youtube_downloader import YouTubeDownloader
+
+
+def _stage_count(stage):
+    match = re.search(r'^promptsnap_stage_duration_seconds_count\{stage="%s"\} (\d+)$' % stage,
+                      render_metrics(), re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+
+def _downloaded_bytes(kind):
+    match = re.search(r'^promptsnap_downloaded_bytes_total\{kind="%s"\} (\d+)$' % kind,
+                      render_metrics(), re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+
+class FallbackYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL in the simple download fallback"""
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def extract_info(self, url, download=True):
+        path = self.opts['outtmpl'].replace('%(ext)s', 'mp4')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 2048)
+        return {'id': 'dQw4w9WgXcQ', 'title': 'Fallback', 'requested_downloads': [{'filepath': path}]}
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    hits = registry.counter('test_hits_total', 'Cache hits', labels=('cache',))
+    latency = registry.histogram('test_seconds', 'Latency', labels=('stage',), buckets=(0.1, 1.0))
+
+    hits.inc(cache='video')
+    hits.inc(2, cache='video')
+    latency.observe(0.05, stage='download')
+    latency.observe(0.5, stage='download')
+    latency.observe(5, stage='download')
+
+    assert registry.render().splitlines() == [
+        '# HELP test_hits_total Cache hits',
+        '# TYPE test_hits_total counter',
+        'test_hits_total{cache="video"} 3',
+        '# HELP test_seconds Latency',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{stage="download",le="0.1"} 1',
+        'test_seconds_bucket{stage="download",le="1"} 2',
+        'test_seconds_bucket{stage="download",le="+Inf"} 3',
+        'test_seconds_sum{stage="download"} 5.55',
+        'test_seconds_count{stage="download"} 3',
+    ]
+
+
+def test_incomplete_metric_types_fail_on_creation():
+    class Gauge(_Metric):
+        kind = 'gauge'
+
+        def _apply(self, label_values, value):
+            pass
+
+    with pytest.raises(TypeError):
+        Gauge(MetricsRegistry(), 'test_gauge', 'Missing render')
+
+
+def test_stage_timings_from_worker_processes_are_collected(scene_video, frame_output_dir):
+    executor = ExtractionExecutor(io_workers=1, cpu_workers=1, use_processes=True)
+    extractor = FrameExtractor(frame_output_dir)
+    before = {stage: _stage_count(stage) for stage in ('probe', 'analysis', 'frame_decode', 'jpeg_encode')}
+
+    result = asyncio.run(executor.run_cpu(
+        extractor.extract_representative_frames, scene_video['path'], 'scene', 3
+    ))
+    executor.shutdown()
+
+    assert result['success']
+    assert _stage_count('jpeg_encode') - before['jpeg_encode'] == result['frames_extracted']
+    assert _stage_count('analysis') - before['analysis'] >= 1
+    assert _stage_count('probe') > before['probe']
+    assert _stage_count('frame_decode') > before['frame_decode']
+
+
+def test_simple_download_fallback_is_measured(tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', FallbackYoutubeDL)
+    downloader = YouTubeDownloader(str(tmp_path), video_cache=VideoCache(str(tmp_path / 'cache')))
+    before = _stage_count('download'), _downloaded_bytes('video')
+
+    result = downloader._try_simple_download('https://www.youtube.com/watch?v=dQw4w9WgXcQ', '360p')
+
+    assert result['file_size'] == 2048
+    assert _stage_count('download') - before[0] == 1
+    assert _downloaded_bytes('video') - before[1] == 2048
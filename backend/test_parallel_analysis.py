@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+import frame_extractor as frame_extractor_module
+from frame_extractor import FrameExtractor
+from executor import ExtractionExecutor, get_cpu_share, run_with_cpu_share
+from parallel_analysis import ParallelAnalyzer, split_segments
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    analyzer = ParallelAnalyzer(workers=2)
+    monkeypatch.setattr(frame_extractor_module, 'parallel_analyzer', analyzer)
+    yield analyzer
+    analyzer.shutdown()
+
+
+def test_split_segments_is_contiguous():
+    indices = list(range(0, 100, 3))
+
+    segments = split_segments(indices, 4)
+
+    assert len(segments) == 4
+    assert sum(segments, []) == indices
+    assert max(len(s) for s in segments) - min(len(s) for s in segments) <= 1
+    assert split_segments(indices[:2], 8) == [[0], [3]]
+
+
+def test_parallel_scores_match_sequential_scan(scene_video, frame_output_dir, two_workers):
+    extractor = FrameExtractor(frame_output_dir)
+
+    sequential = extractor.analyze_scene_changes(scene_video['path'], 3, 'sampled')
+    parallel = extractor.analyze_scene_changes(scene_video['path'], 3, 'parallel')
+
+    assert parallel['scan']['segments'] == 2
+    assert parallel['scan']['frames_analyzed'] == sequential['scan']['frames_analyzed']
+    assert [s['timestamp'] for s in parallel['scenes']] == [s['timestamp'] for s in sequential['scenes']]
+    for ours, theirs in zip(parallel['scenes'], sequential['scenes']):
+        assert ours['change_score'] == pytest.approx(theirs['change_score'], abs=1e-6)
+
+
+def test_boundary_pair_is_scored(scene_video, frame_output_dir, two_workers):
+    # 120 samples at every 3rd frame: the segments split at frame 180, the 6s cut
+    with frame_extractor_module.DecodeSession(scene_video['path']) as session:
+        video_info = session.get_info()
+        scenes, scan_plan = FrameExtractor(frame_output_dir)._score_parallel_segments(session, video_info)
+        # One shared capture, one GOP probe and one open per worker
+        assert session.get_stats()['open_count'] == 4
+
+    boundary = next(s for s in scenes if s['frame_idx'] == 180)
+    assert boundary['change_score'] > 0.5
+    assert len(scenes) == scan_plan['frames_analyzed'] - 1
+
+
+def test_parallel_mode_needs_workers(monkeypatch, frame_output_dir):
+    monkeypatch.setattr(frame_extractor_module, 'parallel_analyzer', ParallelAnalyzer(workers=1))
+    extractor = FrameExtractor(frame_output_dir)
+
+    assert ParallelAnalyzer(workers=1).segment_count(1000) == 1
+    assert ParallelAnalyzer(workers=8).segment_count(20) == 2
+    assert extractor.resolve_analysis_mode('parallel', 60) == 'sampled'
+
+
+def test_default_workers_follow_cpu_count(monkeypatch):
+    monkeypatch.setattr('parallel_analysis.ANALYSIS_WORKERS', 0)
+    monkeypatch.setattr('os.cpu_count', lambda: 16)
+
+    assert ParallelAnalyzer().workers == 16
+    assert ParallelAnalyzer(workers=2).workers == 2
+
+
+def test_segments_are_limited_to_the_cpu_share():
+    analyzer = ParallelAnalyzer(workers=8)
+
+    assert run_with_cpu_share(3, analyzer.segment_count, 1000) == 3
+    assert run_with_cpu_share(1, analyzer.segment_count, 1000) == 1
+    assert analyzer.segment_count(1000) == 8
+
+
+def test_concurrent_cpu_tasks_divide_the_cpus(monkeypatch):
+    monkeypatch.setattr('os.cpu_count', lambda: 8)
+    executor = ExtractionExecutor(cpu_workers=4, use_processes=False)
+    release = threading.Event()
+
+    def held_share():
+        release.wait(5)
+        return get_cpu_share()
+
+    async def scenario():
+        tasks = []
+        for _ in range(4):
+            tasks.append(asyncio.ensure_future(executor.run_cpu(held_share)))
+            await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    shares = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert shares == [8, 4, 2, 2]
@@ -0,0 +1,35 @@
+import cv2
+import numpy as np
+
+from frame_extractor import FrameExtractor
+from synthetic_media import SCENE_TINTS, write_synthetic_video
+
+
+def test_time_positions_only_need_duration(frame_output_dir):
+    extractor = FrameExtractor(frame_output_dir)
+    assert extractor.get_time_positions(100, 4) == [10.0, 100 * 0.1 + 80 / 3, 100 * 0.1 + 160 / 3, 90.0]
+    assert extractor.get_time_positions(100, 1) == [50]
+
+
+def test_clip_frames_are_taken_at_their_timestamp(tmp_path, frame_output_dir):
+    # Clip cut from [20s, 22s]; the scene changes one second in
+    clip = write_synthetic_video(str(tmp_path / 'clip.mp4'), [1, 1], fps=30)
+    extractor = FrameExtractor(frame_output_dir)
+
+    result = extractor.extract_frames_from_clips(
+        [{'timestamp': 21.5, 'start': 20.0, 'file_path': clip['path']}],
+        duration=120,
+        output_name='partial'
+    )
+
+    assert result['success']
+    assert result['video_info']['duration'] == 120
+    assert result['video_info']['total_frames'] == 3600
+    frame = result['frames'][0]
+    assert frame['timestamp'] == 21.5
+    assert frame['file_name'] == 'partial_frame_01_021s.jpg'
+
+    image = cv2.imread(frame['file_path']).astype(np.float32)
+    mean_colour = image.reshape(-1, 3).mean(axis=0)
+    distances = [np.abs(mean_colour - np.array(t)).sum() for t in SCENE_TINTS[:2]]
+    assert int(np.argmin(distances)) == 1
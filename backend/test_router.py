@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from pipeline_progress import pipeline_stage, report_frame
+from routers import frame as frame_routes
+
+VIDEO_URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+def _fake_pipeline(calls):
+    async def run(url_str, video_id, request, bounded):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return {
+            'title': 'Video',
+            'download_mode': request.download_mode,
+            'extraction': {
+                'video_info': {'total_frames': 300, 'fps': 30.0, 'width': 640, 'height': 360,
+                               'duration': 10.0, 'duration_str': '0:00:10'},
+                'extraction_method': request.method,
+                'extraction_time': 0.1,
+                'frames_extracted': 0,
+                'frames': [],
+                'total_size': 0,
+                'analysis': {'analysis_quality': request.analysis_quality,
+                             'analysis_mode': request.analysis_mode},
+            },
+        }
+    return run
+
+
+@pytest.mark.parametrize('field, first, second', [
+    ('download_mode', 'full', 'partial'),
+    ('analysis_quality', '240p', '144p'),
+    ('analysis_mode', 'sampled', 'keyframes'),
+    ('analysis_mode', 'sampled', 'scenedetect'),
+])
+def test_requests_differing_in_any_field_are_not_coalesced(monkeypatch, field, first, second):
+    calls = []
+    monkeypatch.setattr(frame_routes, '_run_admitted_pipeline', _fake_pipeline(calls))
+    requests = [frame_routes.YouTubeRequest(url=VIDEO_URL, **{field: value}) for value in (first, second)]
+
+    async def scenario():
+        return await asyncio.gather(*(frame_routes._extract(VIDEO_URL, request) for request in requests))
+
+    responses = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    for request, response in zip(requests, responses):
+        assert response.download_mode == request.download_mode
+        assert response.analysis == {'analysis_quality': request.analysis_quality,
+                                     'analysis_mode': request.analysis_mode}
+
+
+def test_identical_requests_are_coalesced(monkeypatch):
+    calls = []
+    monkeypatch.setattr(frame_routes, '_run_admitted_pipeline', _fake_pipeline(calls))
+    request = frame_routes.YouTubeRequest(url=VIDEO_URL, download_mode='full')
+
+    async def scenario():
+        return await asyncio.gather(*(frame_routes._extract(VIDEO_URL, request) for _ in range(2)))
+
+    responses = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert [r.download_mode for r in responses] == ['full', 'full']
+
+
+def test_coalesced_streams_all_receive_progress_and_frames(monkeypatch):
+    frame = {'frame_number': 1, 'timestamp': 1.0, 'timestamp_str': '0:00:01',
+             'file_name': 'video_frame_01_001s.jpg', 'file_size': 100}
+    calls = []
+
+    async def run(url_str, video_id, request, bounded):
+        calls.append(request)
+        with pipeline_stage('download'):
+            await asyncio.sleep(0.05)
+        with pipeline_stage('encode'):
+            report_frame(frame)
+        return await _fake_pipeline([])(url_str, video_id, request, bounded)
+
+    monkeypatch.setattr(frame_routes, '_run_admitted_pipeline', run)
+    request = frame_routes.YouTubeRequest(url=VIDEO_URL)
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [json.loads(line) async for line in frame_routes._stream_extraction(VIDEO_URL, request)]
+
+    async def scenario():
+        # The second stream joins while the download is running
+        return await asyncio.gather(collect(0), collect(0.01))
+
+    streams = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    for events in streams:
+        assert [e['type'] for e in events] == ['stage', 'stage', 'stage', 'frame', 'stage', 'result']
+        assert events[3]['frame']['file_name'] == 'video_frame_01_001s.jpg'
+    assert streams[0] == streams[1]
+
+
+@pytest.mark.parametrize('endpoint', ['extract_frames_from_youtube', 'extract_frames_stream', 'submit_extraction_job'])
+def test_non_youtube_urls_are_rejected(endpoint):
+    request = frame_routes.YouTubeRequest(url='https://example.com/watch?v=dQw4w9WgXcQ')
+    args = (request, None) if endpoint == 'extract_frames_from_youtube' else (request,)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(getattr(frame_routes, endpoint)(*args))
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Invalid YouTube URL."
+
+
+def test_job_does_not_share_a_rejected_synchronous_run(monkeypatch):
+    calls = []
+    fake = _fake_pipeline(calls)
+
+    async def run(url_str, video_id, request, bounded):
+        if bounded:
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            raise frame_routes._busy_error(5)
+        return await fake(url_str, video_id, request, bounded)
+
+    monkeypatch.setattr(frame_routes, '_run_admitted_pipeline', run)
+    request = frame_routes.YouTubeRequest(url=VIDEO_URL)
+
+    async def scenario():
+        return await asyncio.gather(frame_routes._extract(VIDEO_URL, request),
+                                    frame_routes._extract(VIDEO_URL, request, bounded=False),
+                                    return_exceptions=True)
+
+    synchronous, job = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert isinstance(synchronous, HTTPException) and synchronous.status_code == 503
+    assert job.success
@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+import pytest
+
+from frame_extractor import FrameExtractor
+from scene_features import (CHANGE_METRICS, FeatureBatcher, FrameResizer, analysis_size, batch_dhash,
+                            batch_histograms, consecutive_changes, hamming_distances)
+
+
+def _read_frames(path, size=(160, 90)):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, size))
+    cap.release()
+    return np.stack(frames)
+
+
+def test_analysis_size_keeps_aspect_and_even_height():
+    assert analysis_size(1920, 1080, 160) == (160, 90)
+    assert analysis_size(1280, 536, 160) == (160, 68)
+    assert analysis_size(128, 72, 160) == (128, 72)
+
+
+def test_resizer_reuses_its_buffer():
+    resizer = FrameResizer(160, 90)
+    first = resizer.resize(np.zeros((720, 1280, 3), dtype=np.uint8))
+    second = resizer.resize(np.full((1080, 1920, 3), 255, dtype=np.uint8))
+
+    assert first is second
+    assert second.shape == (90, 160, 3) and second.min() == 255
+    small = np.zeros((90, 160, 3), dtype=np.uint8)
+    assert resizer.resize(small) is small
+
+
+def test_downscaled_analysis_finds_the_same_cuts(scene_video, frame_output_dir):
+    full = FrameExtractor(frame_output_dir, analysis_width=10000).analyze_scene_changes(scene_video['path'], 3, 'sampled')
+    small = FrameExtractor(frame_output_dir, analysis_width=80).analyze_scene_changes(scene_video['path'], 3, 'sampled')
+
+    assert full['scan']['analysis_size'] == [320, 180]
+    assert small['scan']['analysis_size'] == [80, 44]
+    assert small['scan']['frames_analyzed'] == full['scan']['frames_analyzed']
+    assert small['scan']['feature_ms_per_frame'] >= 0
+    assert [s['timestamp'] for s in small['scenes']] == [s['timestamp'] for s in full['scenes']]
+
+
+def test_extraction_reports_analysis_timing(scene_video, frame_output_dir):
+    result = FrameExtractor(frame_output_dir).extract_representative_frames(scene_video['path'], 'scene', 3)
+
+    assert result['analysis']['strategy'] in ('linear', 'seek')
+    assert result['analysis']['analysis_size'] == [160, 90]
+    assert result['analysis']['frames_analyzed'] > 0
+
+
+def test_batch_correlation_matches_compare_hist(scene_video):
+    frames = _read_frames(scene_video['path'])[::5]
+
+    scores = consecutive_changes(batch_histograms(frames), 'correl')
+
+    hists = [cv2.calcHist([f], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256]) for f in frames]
+    expected = [1 - cv2.compareHist(hists[i], hists[i - 1], cv2.HISTCMP_CORREL) for i in range(1, len(hists))]
+    # compareHist accumulates in float32, which shows at the cuts
+    assert np.allclose(scores, expected, atol=0.05)
+    assert list(np.argsort(scores)[-3:]) == list(np.argsort(expected)[-3:])
+
+
+@pytest.mark.parametrize('metric', CHANGE_METRICS)
+def test_every_metric_peaks_at_the_cuts(scene_video, metric):
+    frames = _read_frames(scene_video['path'])
+
+    scores = consecutive_changes(batch_histograms(frames, metric), metric)
+
+    # Score i compares frame i + 1 with frame i; cuts are at frames 90, 180 and 270
+    assert sorted(np.argsort(scores)[-3:] + 1) == [90, 180, 270]
+    with pytest.raises(ValueError):
+        consecutive_changes(batch_histograms(frames[:2], metric), 'euclid')
+
+
+def test_batcher_spans_batches():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, (10, 90, 160, 3), dtype=np.uint8)
+    batcher = FeatureBatcher(160, 90, batch_frames=4)
+    for frame in frames:
+        batcher.add(frame)
+
+    assert np.array_equal(batcher.histograms(), batch_histograms(frames))
+    assert np.array_equal(batcher.hashes(), batch_dhash(frames))
+    assert FeatureBatcher(160, 90).histograms().shape == (0, 512)
+    assert FeatureBatcher(160, 90).hashes().shape == (0,)
+
+
+def test_dhash_separates_scenes_not_reencodes(scene_video):
+    frames = _read_frames(scene_video['path'])
+    hashes = batch_dhash(frames)
+
+    # A JPEG round trip and a dimmer copy keep the picture's hash
+    _, jpeg = cv2.imencode('.jpg', frames[100], [cv2.IMWRITE_JPEG_QUALITY, 75])
+    recoded = cv2.convertScaleAbs(cv2.imdecode(jpeg, cv2.IMREAD_COLOR), alpha=0.9)
+    assert hamming_distances(batch_dhash(recoded[None]), hashes[100])[0] <= 8
+    # Frames of the other scenes are far apart
+    assert hamming_distances(hashes[[0, 180, 270]], hashes[100]).min() > 16
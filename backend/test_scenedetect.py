@@ -0,0 +1,31 @@
+import pytest
+
+import frame_extractor as frame_extractor_module
+from frameVideo import AdaptiveSceneDetector
+from frame_extractor import FrameExtractor
+
+
+def test_adaptive_method_extracts_scenedetect_cuts(scene_video, frame_output_dir):
+    pytest.importorskip('scenedetect')
+    extractor = FrameExtractor(frame_output_dir)
+
+    result = extractor.extract_representative_frames(scene_video['path'], method='adaptive', frame_count=3)
+
+    assert result['success']
+    assert result['extraction_method'] == 'adaptive'
+    assert [frame['timestamp'] for frame in result['frames']] == scene_video['cuts']
+    assert all(0 < frame['change_score'] < 1 for frame in result['frames'])
+    assert result['analysis']['strategy'] == 'scenedetect'
+    # PySceneDetect opens the video itself
+    assert result['decode_session']['open_count'] == 2
+
+
+def test_adaptive_method_falls_back_without_scenedetect(monkeypatch, scene_video, frame_output_dir):
+    detector = AdaptiveSceneDetector()
+    monkeypatch.setattr(detector, 'is_available', lambda: False)
+    monkeypatch.setattr(frame_extractor_module, 'adaptive_scene_detector', detector)
+    extractor = FrameExtractor(frame_output_dir)
+
+    assert extractor.resolve_method('adaptive', 600) == 'scene'
+    analysis = extractor.analyze_scene_changes(scene_video['path'], 3, 'scenedetect')
+    assert analysis['scan']['strategy'] != 'scenedetect'
@@ -0,0 +1,104 @@
+import itertools
+
+import cv2
+import numpy as np
+import pytest
+
+from frame_extractor import FrameExtractor
+from selection import min_spacing, select_dp, select_nms, select_scenes, suppress_duplicates
+from synthetic_media import make_scene_texture
+
+
+def _changes(pairs):
+    return [{'timestamp': t, 'change_score': s} for t, s in pairs]
+
+
+def test_nms_takes_strongest_and_suppresses_neighbours():
+    changes = _changes([(1, 0.2), (5, 0.9), (6, 0.8), (9, 0.1), (12, 0.7), (20, 0.3)])
+
+    selected = select_nms(changes, 3, spacing=4)
+
+    assert [s['timestamp'] for s in selected] == [5, 12, 20]
+    # Exactly spacing apart is allowed
+    assert [s['timestamp'] for s in select_nms(changes, 2, spacing=7)] == [5, 12]
+
+
+def test_dp_maximizes_total_score():
+    # Greedy takes 10 first, which blocks both 7 and 13
+    changes = _changes([(7, 0.8), (10, 1.0), (13, 0.8)])
+
+    assert [s['timestamp'] for s in select_nms(changes, 2, spacing=5)] == [10]
+    assert [s['timestamp'] for s in select_dp(changes, 2, spacing=5)] == [7, 13]
+
+
+def _is_spaced(times, spacing):
+    times = sorted(times)
+    return all(b - a >= spacing for a, b in zip(times, times[1:]))
+
+
+def test_dp_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        changes = _changes(zip(rng.uniform(0, 30, 9).round(1), rng.uniform(0, 1, 9)))
+        spacing = rng.uniform(0, 8)
+
+        best = max(
+            sum(changes[i]['change_score'] for i in combo)
+            for r in (1, 2, 3) for combo in itertools.combinations(range(9), r)
+            if _is_spaced([changes[i]['timestamp'] for i in combo], spacing)
+        )
+        selected = select_dp(changes, 3, spacing)
+
+        assert _is_spaced([s['timestamp'] for s in selected], spacing)
+        assert sum(s['change_score'] for s in selected) == pytest.approx(best)
+
+
+def test_spacing_scales_with_duration():
+    assert min_spacing(12, 3) == 2
+    assert min_spacing(7200, 4) == 900
+    with pytest.raises(ValueError):
+        select_scenes(_changes([(1, 1.0)]), 1, 10, selector='random')
+
+
+@pytest.mark.parametrize('selector', ['nms', 'dp'])
+def test_short_video_gets_every_cut(scene_video, frame_output_dir, selector):
+    extractor = FrameExtractor(frame_output_dir, selector=selector)
+
+    analysis = extractor.analyze_scene_changes(scene_video['path'], 3, 'sampled')
+
+    # All three cuts of the 12-second video, no time-based filler
+    assert [round(s['timestamp']) for s in analysis['scenes']] == [3, 6, 9]
+
+
+def test_duplicates_keep_the_strongest_candidate():
+    changes = [
+        {'timestamp': 1, 'change_score': 0.4, 'dhash': 0b1111},
+        {'timestamp': 2, 'change_score': 0.9, 'dhash': 0b0111},
+        {'timestamp': 3, 'change_score': 0.5, 'dhash': 0xFFFF0000},
+        {'timestamp': 4, 'change_score': 0.2},
+    ]
+
+    assert [c['timestamp'] for c in suppress_duplicates(changes, 2)] == [2, 3, 4]
+    assert suppress_duplicates(changes, -1) == changes
+
+
+def test_repeated_slides_are_selected_once(tmp_path, frame_output_dir):
+    # Slides A, B, A, B: three strong cuts, but only two different pictures
+    path = str(tmp_path / 'slides.mp4')
+    slides = [make_scene_texture(i, 320, 180) for i in (0, 1)]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 30, (320, 180))
+    for slide in (0, 1, 0, 1):
+        for _ in range(90):
+            writer.write(slides[slide])
+    writer.release()
+
+    analysis = FrameExtractor(frame_output_dir).analyze_scene_changes(path, 4, 'sampled')
+    unfiltered = FrameExtractor(frame_output_dir, duplicate_distance=-1).analyze_scene_changes(path, 4, 'sampled')
+
+    assert len(analysis['scenes']) == 2
+    assert len({int(s['timestamp'] // 3) % 2 for s in analysis['scenes']}) == 2
+    assert analysis['scan']['duplicates_suppressed'] > 0
+    assert len(unfiltered['scenes']) == 4
+    # No time-based filler repeating the slides either
+    result = FrameExtractor(frame_output_dir).extract_representative_frames(path, method='scene', frame_count=4)
+    assert result['frames_extracted'] == 2
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    calls = []
+    shared = []
+
+    def share(result):
+        shared.append(result)
+        return dict(result, copy=True)
+
+    flight = SingleFlight('test', share=share)
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'value': 42}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do('key', work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert len(shared) == 4
+    assert all(r['value'] == 42 for r in results)
+    assert sum(1 for r in results if r.get('copy')) == 4
+    assert flight.get_stats() == {'leaders': 1, 'followers': 4, 'failures': 0, 'in_flight': 0}
+
+
+def test_different_keys_run_separately_and_finished_keys_restart():
+    flight = SingleFlight('test')
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def scenario():
+        await asyncio.gather(flight.do('a', work), flight.do('b', work))
+        await flight.do('a', work)
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+
+
+def test_failure_reaches_every_waiter():
+    flight = SingleFlight('test')
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError('download failed')
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do('key', work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) and r.args == ('download failed',) for r in results)
+    # Each waiter raised its own instance, chained to the original failure
+    assert len({id(r) for r in results}) == 3
+    assert len({id(r.__cause__) for r in results}) == 1
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    released = []
+    flight = SingleFlight('test', share=lambda r: r, discard=released.append)
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 'video'
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do('key', work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do('key', work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == 'video'
+    # Only the follower was still waiting, so no result was left over
+    assert released == []
@@ -0,0 +1,74 @@
+import json
+import os
+
+from frame_extractor import FrameExtractor
+from storyboard import has_storyboard, select_storyboard_format
+from synthetic_media import serve_directory
+from video_cache import VideoCache
+from youtube_downloader import YouTubeDownloader
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'storyboard')
+URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+def _load_info():
+    """Saved info dict: 80s video, cuts at 20s, 45s and 60s, one thumbnail every 2s"""
+    with open(os.path.join(FIXTURE_DIR, 'info.json')) as f:
+        return json.load(f)
+
+
+def _sheet_paths(storyboard):
+    return [os.path.join(FIXTURE_DIR, fragment['url']) for fragment in storyboard['fragments']]
+
+
+def test_most_detailed_storyboard_is_selected():
+    info = _load_info()
+
+    assert select_storyboard_format(info)['format_id'] == 'sb0'
+    assert not has_storyboard({'formats': [f for f in info['formats'] if f['format_id'] == '18']})
+
+
+def test_storyboard_thumbnails_pick_scene_cuts(frame_output_dir):
+    info = _load_info()
+    storyboard = select_storyboard_format(info)
+    extractor = FrameExtractor(frame_output_dir)
+
+    plan = extractor.analyze_storyboard(_sheet_paths(storyboard), storyboard, info['duration'], 3)
+
+    assert plan['extraction_method'] == 'storyboard'
+    # First thumbnail after each cut
+    assert [target['timestamp'] for target in plan['targets']] == [20, 46, 60]
+    assert all(target['change_score'] > 0.5 for target in plan['targets'])
+    # Nothing is written until the winners are fetched at full quality
+    assert os.listdir(frame_output_dir) == []
+
+
+def test_auto_prefers_storyboard_for_long_videos(frame_output_dir):
+    extractor = FrameExtractor(frame_output_dir)
+
+    assert extractor.resolve_method('auto', 600, has_storyboard=True) == 'storyboard'
+    assert extractor.resolve_method('auto', 600) == 'scene'
+    assert extractor.resolve_method('auto', 60, has_storyboard=True) == 'time'
+    assert extractor.resolve_method('storyboard', 60) == 'scene'
+
+
+def test_download_storyboard_fetches_only_sprite_sheets(tmp_path):
+    info = _load_info()
+    downloader = YouTubeDownloader(str(tmp_path), video_cache=VideoCache(str(tmp_path / 'cache')))
+
+    with serve_directory(FIXTURE_DIR) as (base_url, _):
+        for fmt in info['formats']:
+            for fragment in fmt.get('fragments', []):
+                fragment['url'] = f"{base_url}/{fragment['url']}"
+        downloader.metadata_cache.put(info['id'], info)
+
+        result = downloader.download_storyboard(URL)
+
+    assert result['storyboard']['format_id'] == 'sb0'
+    assert len(result['sheets']) == 2
+    for sheet_path, name in zip(result['sheets'], ['M0.jpg', 'M1.jpg']):
+        with open(sheet_path, 'rb') as a, open(os.path.join(FIXTURE_DIR, name), 'rb') as b:
+            assert a.read() == b.read()
+
+    downloader.cleanup_download(result)
+    assert not any(os.path.exists(path) for path in result['sheets'])
@@ -0,0 +1,33 @@
+import os
+
+import cv2
+import numpy as np
+
+from frame_extractor import FrameExtractor
+
+
+def test_stream_extraction_matches_local_file(scene_video, media_server, frame_output_dir):
+    video_url, server = media_server
+    extractor = FrameExtractor(frame_output_dir)
+
+    streamed = extractor.extract_representative_frames(video_url, 'time', 4, output_name='streamed')
+    local = extractor.extract_representative_frames(scene_video['path'], 'time', 4, output_name='local')
+
+    assert streamed['success']
+    assert streamed['video_info']['total_frames'] == scene_video['total_frames']
+    assert [f['timestamp'] for f in streamed['frames']] == [f['timestamp'] for f in local['frames']]
+    for a, b in zip(streamed['frames'], local['frames']):
+        assert np.array_equal(cv2.imread(a['file_path']), cv2.imread(b['file_path']))
+
+    # The decoder seeks with range requests instead of reading the file front to back
+    assert server.range_requests > 0
+
+
+def test_stream_scene_detection_writes_only_frames(media_server, frame_output_dir):
+    video_url, _ = media_server
+    extractor = FrameExtractor(frame_output_dir)
+
+    result = extractor.extract_representative_frames(video_url, 'scene', 3, output_name='streamed')
+
+    assert result['success']
+    assert sorted(os.listdir(frame_output_dir)) == sorted(f['file_name'] for f in result['frames'])
@@ -0,0 +1,62 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from executor import ExtractionExecutor
+from structured_log import configure_logging, get_logger, get_request_id, is_sampled, request_context
+
+
+@pytest.fixture
+def log_output():
+    output = io.StringIO()
+    yield output
+    configure_logging()
+
+
+def test_records_carry_request_id_and_fields(log_output):
+    configure_logging(level='INFO', log_format='json', stream=log_output)
+    log = get_logger('test')
+
+    with request_context('req-1'):
+        log.info("Download complete", video_id='abc', file_size=1024)
+    log.debug("Not written below INFO")
+
+    records = [json.loads(line) for line in log_output.getvalue().splitlines()]
+    assert len(records) == 1
+    assert records[0]['request_id'] == 'req-1'
+    assert records[0]['level'] == 'info'
+    assert records[0]['logger'] == 'promptsnap.test'
+    assert records[0]['message'] == "Download complete"
+    assert (records[0]['video_id'], records[0]['file_size']) == ('abc', 1024)
+
+
+def test_sampling_keeps_whole_requests_and_all_warnings(log_output):
+    configure_logging(level='DEBUG', log_format='json', sample_rate=0.5, stream=log_output)
+    log = get_logger('test')
+    request_ids = [f"req-{i}" for i in range(200)]
+    dropped = next(r for r in request_ids if not is_sampled(r, 0.5))
+    kept = next(r for r in request_ids if is_sampled(r, 0.5))
+
+    for request_id in (dropped, kept):
+        with request_context(request_id):
+            log.debug("Frame extracted")
+            log.info("Download complete")
+            log.warning("Download attempt failed")
+
+    records = [(r['request_id'], r['level']) for r in map(json.loads, log_output.getvalue().splitlines())]
+    assert records == [(dropped, 'warning'), (kept, 'debug'), (kept, 'info'), (kept, 'warning')]
+    # Roughly the configured share of requests is kept
+    assert 60 < sum(is_sampled(r, 0.5) for r in request_ids) < 140
+
+
+def test_request_id_reaches_pool_workers():
+    executor = ExtractionExecutor(io_workers=1, cpu_workers=1, use_processes=True)
+
+    async def scenario():
+        with request_context('req-2'):
+            return await executor.run_cpu(get_request_id), await executor.run_io(get_request_id)
+
+    assert asyncio.run(scenario()) == ('req-2', 'req-2')
+    executor.shutdown()
@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+from frame_extractor import FrameExtractor
+from synthetic_media import SCENE_TINTS, write_synthetic_video
+
+
+def _scene_index(image_path):
+    mean_colour = cv2.imread(image_path).astype(np.float32).reshape(-1, 3).mean(axis=0)
+    return int(np.argmin([np.abs(mean_colour - np.array(t)).sum() for t in SCENE_TINTS]))
+
+
+def test_low_res_plan_drives_high_res_frames(tmp_path, frame_output_dir):
+    scenes = [12, 12, 12, 12]
+    low = write_synthetic_video(str(tmp_path / 'low.mp4'), scenes, fps=10, width=128, height=72)
+    high = write_synthetic_video(str(tmp_path / 'high.mp4'), scenes, fps=10, width=640, height=360)
+    extractor = FrameExtractor(frame_output_dir)
+
+    plan = extractor.plan_frame_timestamps(low['path'], 'scene', 3)
+
+    assert plan['extraction_method'] == 'scene'
+    assert plan['video_info']['width'] == 128
+    timestamps = [target['timestamp'] for target in plan['targets']]
+    for timestamp, cut in zip(timestamps, low['cuts']):
+        assert cut <= timestamp < cut + 0.5
+    assert all(target['change_score'] > 0.5 for target in plan['targets'])
+
+    result = extractor.extract_frames_at_timestamps(high['path'], plan['targets'], 'two_tier', method='scene')
+
+    assert result['success']
+    assert result['extraction_method'] == 'scene'
+    assert result['video_info']['width'] == 640
+    assert [f['timestamp'] for f in result['frames']] == timestamps
+    assert [f['change_score'] for f in result['frames']] == [t['change_score'] for t in plan['targets']]
+    # Every output frame shows the scene that starts at its cut
+    assert [_scene_index(f['file_path']) for f in result['frames']] == [1, 2, 3]
+    assert cv2.imread(result['frames'][0]['file_path']).shape[:2] == (360, 640)
+
+
+def test_plan_supplements_scarce_scenes_with_time_positions(scene_video, frame_output_dir):
+    extractor = FrameExtractor(frame_output_dir)
+
+    plan = extractor.plan_frame_timestamps(scene_video['path'], 'scene', 4)
+
+    timestamps = [target['timestamp'] for target in plan['targets']]
+    assert len(timestamps) == 4
+    assert timestamps == sorted(timestamps)
@@ -0,0 +1,140 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import video_cache as video_cache_module
+import youtube_downloader as downloader_module
+from video_cache import VideoCache
+from youtube_downloader import YouTubeDownloader
+
+
+def make_file(path, size):
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    return str(path)
+
+
+def test_hits_misses_and_bytes_served(tmp_path):
+    cache = VideoCache(str(tmp_path / 'cache'), max_bytes=10_000)
+    key = cache.make_key('dQw4w9WgXcQ', 'best[height<=360][ext=mp4]')
+
+    assert cache.acquire(key) is None
+    entry = cache.put(key, make_file(tmp_path / 'a.mp4', 1000), {'title': 'A'})
+    cache.release(key)
+
+    hit = cache.acquire(key)
+    assert hit['path'] == entry['path']
+    assert hit['metadata']['title'] == 'A'
+    cache.release(key)
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['bytes_served'] == 1000
+
+
+def test_lru_eviction_skips_leased_entries(tmp_path):
+    cache = VideoCache(str(tmp_path / 'cache'), max_bytes=2500)
+
+    cache.put('a', make_file(tmp_path / 'a.mp4', 1000))
+    cache.put('b', make_file(tmp_path / 'b.mp4', 1000))
+    cache.release('b')
+    # 'a' is still leased, so inserting 'c' must evict 'b' even though 'a' is older
+    cache.put('c', make_file(tmp_path / 'c.mp4', 1000))
+
+    assert cache.acquire('b') is None
+    assert cache.acquire('a') is not None
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_concurrent_puts_of_one_key_keep_one_entry(tmp_path, monkeypatch):
+    move = video_cache_module.shutil.move
+
+    def slow_move(source, destination):
+        # Keep every writer between its move and the insert at the same time
+        move(source, destination)
+        time.sleep(0.05)
+
+    monkeypatch.setattr(video_cache_module.shutil, 'move', slow_move)
+    cache = VideoCache(str(tmp_path / 'cache'), max_bytes=100_000)
+    sources = [make_file(tmp_path / f"{i}.mp4", 1000) for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        entries = list(pool.map(lambda source: cache.put('a', source), sources))
+
+    assert len({entry['path'] for entry in entries}) == 1
+    assert os.path.getsize(entries[0]['path']) == 1000
+    assert sorted(os.listdir(cache.cache_dir)) == ['a.json', 'a.mp4']
+    assert cache.get_stats()['insertions'] == 1
+
+
+def test_index_survives_restart(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    cache = VideoCache(cache_dir, max_bytes=10_000)
+    cache.put('a', make_file(tmp_path / 'a.mp4', 500), {'title': 'A', 'duration': 12})
+
+    reloaded = VideoCache(cache_dir, max_bytes=10_000)
+    entry = reloaded.acquire('a')
+    assert entry['size'] == 500
+    assert entry['metadata']['duration'] == 12
+
+
+def test_cached_download_skips_network(tmp_path, monkeypatch):
+    cache = VideoCache(str(tmp_path / 'cache'), max_bytes=10_000)
+    downloader = YouTubeDownloader(str(tmp_path / 'downloads'), video_cache=cache)
+    url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    key = cache.make_key('dQw4w9WgXcQ', downloader._get_format_selector('360p'))
+    cache.put(key, make_file(tmp_path / 'v.mp4', 2048), {'title': 'Cached', 'duration': 30})
+    cache.release(key)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError('network stage should be skipped')
+
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', no_network)
+
+    result = downloader.download_video(url, '360p')
+    assert result['cached'] is True
+    assert result['title'] == 'Cached'
+    assert os.path.exists(result['file_path'])
+
+    # Cleanup releases the lease but keeps the cached file
+    downloader.cleanup_download(result)
+    assert os.path.exists(result['file_path'])
+    assert cache.get_stats()['leased_entries'] == 0
+
+
+class FallbackYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL in the simple download fallback"""
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def extract_info(self, url, download=True):
+        path = make_file(self.opts['outtmpl'].replace('%(ext)s', 'mp4'), 1024)
+        return {'id': 'dQw4w9WgXcQ', 'title': 'Fallback', 'duration': 12,
+                'requested_downloads': [{'filepath': path}]}
+
+
+def test_simple_download_fallback_is_not_cached(tmp_path, monkeypatch):
+    cache = VideoCache(str(tmp_path / 'cache'), max_bytes=10_000)
+    downloader = YouTubeDownloader(str(tmp_path / 'downloads'), video_cache=cache)
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', FallbackYoutubeDL)
+
+    result = downloader._try_simple_download('https://www.youtube.com/watch?v=dQw4w9WgXcQ', '360p')
+    shared = downloader.share_download(result)
+
+    assert result.get('cache_key') is None
+    assert cache.get_stats()['entries'] == 0
+    # The coalesced copy keeps its own link to the video after the original is cleaned up
+    assert shared['file_path'] != result['file_path']
+    downloader.cleanup_download(result)
+    assert not os.path.exists(result['file_path'])
+    assert os.path.getsize(shared['file_path']) == 1024
+    downloader.cleanup_download(shared)
+    assert not os.path.exists(shared['file_path'])
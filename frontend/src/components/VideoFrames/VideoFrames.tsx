@@ -2,16 +2,42 @@
 
 import { useState, useCallback } from 'react';
 import Image from 'next/image';
-import { FrameExtractionResponse, FrameInfo, getFrameImageUrl } from '../../lib/frameExtraction';
+import {
+  ExtractionProgress,
+  ExtractionStage,
+  FrameExtractionResponse,
+  FrameInfo,
+  getFrameImageUrl
+} from '../../lib/frameExtraction';
 import styles from './VideoFrames.module.css';
 
 interface VideoFramesProps {
   extractionResult: FrameExtractionResponse | null;
   isLoading?: boolean;
   error?: string | null;
+  progress?: ExtractionProgress | null;
+  streamedFrames?: FrameInfo[];  // Frames already saved while extraction continues
 }
 
-export default function VideoFrames({ extractionResult, isLoading, error }: VideoFramesProps) {
+const STAGE_LABELS: Record<ExtractionStage, string> = {
+  metadata: 'Reading video information',
+  download: 'Downloading video',
+  analysis: 'Analyzing scenes',
+  encode: 'Saving frames',
+};
+
+function describeProgress(progress?: ExtractionProgress | null): string {
+  if (!progress) {
+    return 'Downloading YouTube video and generating representative images.';
+  }
+  const label = STAGE_LABELS[progress.stage];
+  if (progress.status === 'running' && progress.progress !== undefined) {
+    return `${label}... ${Math.round(progress.progress * 100)}%`;
+  }
+  return `${label}...`;
+}
+
+export default function VideoFrames({ extractionResult, isLoading, error, progress, streamedFrames }: VideoFramesProps) {
   const [selectedFrame, setSelectedFrame] = useState<FrameInfo | null>(null);
   const [showPromptModal, setShowPromptModal] = useState<FrameInfo | null>(null);
   const [imageErrors, setImageErrors] = useState<Set<string>>(new Set());
@@ -147,13 +173,15 @@ export default function VideoFrames({ extractionResult, isLoading, error }: Vide
     }
   };
 
-  if (isLoading) {
+  const isStreaming = !!isLoading && !!streamedFrames && streamedFrames.length > 0;
+
+  if (isLoading && !isStreaming) {
     return (
       <div className={styles.container}>
         <div className={styles.loading}>
           <div className={styles.spinner}></div>
           <p>Extracting frames...</p>
-          <small>Downloading YouTube video and generating representative images.</small>
+          <small>{describeProgress(progress)}</small>
         </div>
       </div>
     );
@@ -170,11 +198,12 @@ export default function VideoFrames({ extractionResult, isLoading, error }: Vide
     );
   }
 
-  if (!extractionResult || !extractionResult.success || !extractionResult.frames) {
+  if (!isStreaming && (!extractionResult || !extractionResult.success || !extractionResult.frames)) {
     return null;
   }
 
-  const { video_title, video_info, extraction_method, extraction_time, frames } = extractionResult;
+  const { video_title, video_info, extraction_method, extraction_time } = extractionResult || {};
+  const frames = (isStreaming ? streamedFrames : extractionResult?.frames) || [];
 
   return (
     <div className={styles.container}>
@@ -251,6 +280,12 @@ export default function VideoFrames({ extractionResult, isLoading, error }: Vide
                     <span>{(frame.change_score * 100).toFixed(1)}%</span>
                   </div>
                 )}
+                {frame.cluster_size && (
+                  <div className={styles.infoRow}>
+                    <span className={styles.label}>Cluster Size:</span>
+                    <span>{frame.cluster_size}</span>
+                  </div>
+                )}
                 
                 <button
                   className={styles.promptBtn}
@@ -275,10 +310,16 @@ export default function VideoFrames({ extractionResult, isLoading, error }: Vide
 
       {/* Summary info */}
       <div className={styles.summary}>
-        <p>
-          Total {frames.length} frames extracted • 
-          Total size: {formatFileSize(extractionResult.total_size || 0)}
-        </p>
+        {isStreaming ? (
+          <p>
+            {frames.length} frames so far • {describeProgress(progress)}
+          </p>
+        ) : (
+          <p>
+            Total {frames.length} frames extracted • 
+            Total size: {formatFileSize(extractionResult?.total_size || 0)}
+          </p>
+        )}
       </div>
 
       {/* Modal - view selected frame in large size */}
@@ -320,6 +361,11 @@ export default function VideoFrames({ extractionResult, isLoading, error }: Vide
                     <strong>Change Score:</strong> {(selectedFrame.change_score * 100).toFixed(1)}%
                   </div>
                 )}
+                {selectedFrame.cluster_size && (
+                  <div>
+                    <strong>Cluster Size:</strong> {selectedFrame.cluster_size}
+                  </div>
+                )}
               </div>
               
               <button
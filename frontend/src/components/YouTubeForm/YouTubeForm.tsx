@@ -3,7 +3,13 @@
 import { useState } from 'react';
 import YouTubePlayer from '../YouTubePlayer/YouTubePlayer';
 import VideoFrames from '../VideoFrames/VideoFrames';
-import { extractFramesFromYouTube, isValidYouTubeUrl, FrameExtractionResponse } from '../../lib/frameExtraction';
+import {
+  extractFramesStream,
+  isValidYouTubeUrl,
+  ExtractionProgress,
+  FrameExtractionResponse,
+  FrameInfo
+} from '../../lib/frameExtraction';
 import styles from './YouTubeForm.module.css';
 
 export default function YouTubeForm() {
@@ -14,8 +20,10 @@ export default function YouTubeForm() {
   const [isExtracting, setIsExtracting] = useState(false);
   const [extractionResult, setExtractionResult] = useState<FrameExtractionResponse | null>(null);
   const [extractionError, setExtractionError] = useState<string | null>(null);
+  const [extractionProgress, setExtractionProgress] = useState<ExtractionProgress | null>(null);
+  const [streamedFrames, setStreamedFrames] = useState<FrameInfo[]>([]);
   const [quality, setQuality] = useState<'144p' | '240p' | '360p' | '480p' | '720p' | '1080p'>('360p');
-  const [method, setMethod] = useState<'time' | 'scene' | 'auto'>('auto');
+  const [method, setMethod] = useState<'time' | 'scene' | 'adaptive' | 'cluster' | 'storyboard' | 'auto'>('auto');
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
@@ -38,14 +46,21 @@ export default function YouTubeForm() {
     setIsExtracting(true);
     setExtractionError(null);
     setExtractionResult(null);
+    setExtractionProgress(null);
+    setStreamedFrames([]);
 
     try {
-      const result = await extractFramesFromYouTube({
-        url: url.trim(),
-        quality,
-        method,
-        frame_count: 4
-      });
+      // Frames show up one by one while the rest are still being extracted
+      const result = await extractFramesStream(
+        {
+          url: url.trim(),
+          quality,
+          method,
+          frame_count: 4
+        },
+        setExtractionProgress,
+        (frame) => setStreamedFrames(prev => [...prev, frame])
+      );
 
       setExtractionResult(result);
     } catch (error) {
@@ -61,6 +76,8 @@ export default function YouTubeForm() {
     setVideoUrl('');
     setExtractionResult(null);
     setExtractionError(null);
+    setExtractionProgress(null);
+    setStreamedFrames([]);
   };
 
   const isValidUrl = url.trim() && isValidYouTubeUrl(url.trim());
@@ -117,6 +134,9 @@ export default function YouTubeForm() {
               <option value="auto">Auto Select</option>
               <option value="time">Time-based (Even Distribution)</option>
               <option value="scene">Scene-based (Smart)</option>
+              <option value="adaptive">Adaptive (PySceneDetect)</option>
+              <option value="cluster">Cluster-based (Diverse)</option>
+              <option value="storyboard">Storyboard (Fast, Smart)</option>
             </select>
           </div>
         </div>
@@ -164,6 +184,8 @@ export default function YouTubeForm() {
         extractionResult={extractionResult}
         isLoading={isExtracting}
         error={extractionError}
+        progress={extractionProgress}
+        streamedFrames={streamedFrames}
       />
 
       {/* Help section */}
@@ -5,6 +5,7 @@ export interface FrameInfo {
   file_name: string;
   file_size: number;
   change_score?: number;
+  cluster_size?: number;
 }
 
 export interface VideoInfo {
@@ -19,7 +20,7 @@ export interface VideoInfo {
 export interface FrameExtractionRequest {
   url: string;
   quality?: '144p' | '240p' | '360p' | '480p' | '720p' | '1080p';
-  method?: 'time' | 'scene' | 'auto';
+  method?: 'time' | 'scene' | 'adaptive' | 'cluster' | 'storyboard' | 'auto';
   frame_count?: number;
 }
 
@@ -35,6 +36,22 @@ export interface FrameExtractionResponse {
   total_size?: number;
 }
 
+export type ExtractionStage = 'metadata' | 'download' | 'analysis' | 'encode';
+
+export interface ExtractionProgress {
+  stage: ExtractionStage;
+  status: 'running' | 'done' | 'failed';
+  progress?: number; // Finished share of the stage (downloads only)
+}
+
+// One line of the /frame/extract-stream response
+export type ExtractionEvent =
+  | { type: 'stage'; stage: ExtractionStage; status: 'running' | 'done' | 'failed' }
+  | { type: 'progress'; stage: ExtractionStage; progress: number; downloaded_bytes?: number; total_bytes?: number }
+  | { type: 'frame'; frame: FrameInfo }
+  | { type: 'result'; result: FrameExtractionResponse }
+  | { type: 'error'; status_code: number; detail: string; retry_after?: number };
+
 // Backend API base URL
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -70,6 +87,74 @@ export async function extractFramesFromYouTube(
   }
 }
 
+/**
+ * Extract frames from YouTube URL, reporting progress and each frame as soon as it is saved
+ */
+export async function extractFramesStream(
+  request: FrameExtractionRequest,
+  onProgress: (progress: ExtractionProgress) => void,
+  onFrame: (frame: FrameInfo) => void
+): Promise<FrameExtractionResponse> {
+  try {
+    const response = await fetch(`${API_BASE_URL}/frame/extract-stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        url: request.url,
+        quality: request.quality || '360p',
+        method: request.method || 'auto',
+        frame_count: request.frame_count || 4,
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || `HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    // Newline-delimited JSON: one event per line
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      buffer += decoder.decode(value, { stream: !done });
+
+      const lines = buffer.split('\n');
+      buffer = lines.pop() || '';
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const event: ExtractionEvent = JSON.parse(line);
+        switch (event.type) {
+          case 'stage':
+            onProgress({ stage: event.stage, status: event.status });
+            break;
+          case 'progress':
+            onProgress({ stage: event.stage, status: 'running', progress: event.progress });
+            break;
+          case 'frame':
+            onFrame(event.frame);
+            break;
+          case 'result':
+            return event.result;
+          case 'error':
+            throw new Error(event.detail);
+        }
+      }
+
+      if (done) {
+        throw new Error('Extraction stream ended without a result.');
+      }
+    }
+  } catch (error) {
+    console.error('Frame extraction stream error:', error);
+    throw error;
+  }
+}
+
 /**
  * Generate frame image file URL
  */